@@ -2,18 +2,18 @@
 import os
 
 from aws_cdk import App, Environment
-from boto3 import client, session
 
 from cdk.demo.stack import ServiceStack
 from cdk.demo.utils import get_stack_name
 
-account = client('sts').get_caller_identity()['Account']
-region = session.Session().region_name
+# the CDK CLI resolves the target account and region from the caller's credentials, synth itself doesn't call AWS
+account = os.environ.get('AWS_DEFAULT_ACCOUNT', os.environ.get('CDK_DEFAULT_ACCOUNT'))
+region = os.environ.get('AWS_DEFAULT_REGION', os.environ.get('CDK_DEFAULT_REGION'))
 app = App()
 my_stack = ServiceStack(
     scope=app,
     id=get_stack_name(),
-    env=Environment(account=os.environ.get('AWS_DEFAULT_ACCOUNT', account), region=os.environ.get('AWS_DEFAULT_REGION', region)),
+    env=Environment(account=account, region=region),
 )
 
 app.synth()
@@ -1,9 +1,35 @@
 from functools import lru_cache
 
-from catalog_backend.dal.db_handler import DalHandler
+from catalog_backend.dal.db_handler import DalHandler, _SingletonMeta
+from catalog_backend.dal.dynamo_client_dal_handler import DynamoClientDalHandler
 from catalog_backend.dal.dynamo_dal_handler import DynamoDalHandler
+from catalog_backend.dal.dynamo_views_dal_handler import DynamoViewsDalHandler
+from catalog_backend.dal.views_db_handler import ViewsDalHandler
 
 
 @lru_cache
-def get_dal_handler(table_name: str) -> DalHandler:
-    return DynamoDalHandler(table_name)
+def get_dal_handler(
+    table_name: str,
+    shard_count: int = 1,
+    compact_items: bool = False,
+    low_level_client: bool = False,
+    history_retention_days: int = 0,
+    aggregates_enabled: bool = False,
+) -> DalHandler:
+    dal_handler_cls = DynamoClientDalHandler if low_level_client else DynamoDalHandler
+    return dal_handler_cls(table_name, shard_count, compact_items, history_retention_days, aggregates_enabled)
+
+
+@lru_cache
+def get_views_dal_handler(table_name: str) -> ViewsDalHandler:
+    return DynamoViewsDalHandler(table_name)
+
+
+def reset_dal_handlers() -> None:
+    """Drops the cached handlers and their boto3 clients, the next call opens new connections with the current credentials."""
+    get_dal_handler.cache_clear()
+    get_views_dal_handler.cache_clear()
+    _SingletonMeta._instances.clear()
+    DynamoDalHandler._get_db_handler.cache_clear()
+    DynamoClientDalHandler._get_db_client.cache_clear()
+    DynamoViewsDalHandler._get_db_handler.cache_clear()
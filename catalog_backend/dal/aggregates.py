@@ -0,0 +1,80 @@
+from collections import Counter
+from typing import Any, Iterable, Optional
+
+from catalog_backend.dal.models.db import DeploymentCounts, ProductEntry
+
+# counters of live deployments live in the '<partition key>#aggregates[#<counter shard>]' partitions of every shard
+# sort keys: 'total', 'product#<name>', 'version#<version>#<name>', 'account#<account id>', 'region#<region>'
+AGGREGATES_SUFFIX = '#aggregates'
+COUNT_ATTRIBUTE = 'count'
+# every product write adds to one randomly picked copy of its counters, so concurrent writers rarely conflict on the same counter items.
+# a count is the sum of its copies, the number of copies may grow but not shrink without migrating the counters
+COUNTER_SHARDS = 8
+_SEPARATOR = '#'
+# the version key holds two values, the separator is escaped in both so either may contain it. keys of values without '#' or '%' are unchanged
+_ESCAPES = (('%', '%25'), (_SEPARATOR, '%23'))
+
+
+def aggregates_partition(shard_key: str, counter_shard: int = 0) -> str:
+    # the first copy keeps the partition counters were written to before they were sharded
+    return f'{shard_key}{AGGREGATES_SUFFIX}' + (f'{_SEPARATOR}{counter_shard}' if counter_shard else '')
+
+
+def aggregates_partitions(shard_key: str) -> list[str]:
+    return [aggregates_partition(shard_key, counter_shard) for counter_shard in range(COUNTER_SHARDS)]
+
+
+def _escape(value: str) -> str:
+    for raw, escaped in _ESCAPES:
+        value = value.replace(raw, escaped)
+    return value
+
+
+def _unescape(value: str) -> str:
+    for raw, escaped in reversed(_ESCAPES):
+        value = value.replace(escaped, raw)
+    return value
+
+
+def counter_keys(entry: ProductEntry) -> list[str]:
+    return [
+        'total',
+        f'product{_SEPARATOR}{entry.name}',
+        f'version{_SEPARATOR}{_escape(entry.version)}{_SEPARATOR}{_escape(entry.name)}',
+        f'account{_SEPARATOR}{entry.account_id}',
+        f'region{_SEPARATOR}{entry.region}',
+    ]
+
+
+def counter_deltas(previous: Optional[ProductEntry], current: Optional[ProductEntry]) -> dict[str, int]:
+    """Counter changes of replacing 'previous' with 'current', counters an update doesn't move are left out."""
+    deltas: Counter[str] = Counter()
+    for entry, delta in ((previous, -1), (current, 1)):
+        if entry:
+            deltas.update(dict.fromkeys(counter_keys(entry), delta))
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def build_counts(items: Iterable[dict[str, Any]]) -> DeploymentCounts:
+    """Sums the counter items of every shard and counter copy."""
+    counts = DeploymentCounts()
+    for item in items:
+        count = int(item[COUNT_ATTRIBUTE])
+        dimension, _, value = item['product_stack_id'].partition(_SEPARATOR)
+        if dimension == 'total':
+            counts.total += count
+        elif dimension == 'version':
+            version, name = map(_unescape, value.split(_SEPARATOR))
+            versions = counts.versions.setdefault(name, {})
+            versions[version] = versions.get(version, 0) + count
+        else:
+            breakdown = {'product': counts.products, 'account': counts.accounts, 'region': counts.regions}[dimension]
+            breakdown[value] = breakdown.get(value, 0) + count
+    # counters of values without live deployments stay at 0
+    counts.products = {name: count for name, count in counts.products.items() if count}
+    counts.accounts = {account: count for account, count in counts.accounts.items() if count}
+    counts.regions = {region: count for region, count in counts.regions.items() if count}
+    counts.versions = {
+        name: {version: count for version, count in versions.items() if count} for name, versions in counts.versions.items() if any(versions.values())
+    }
+    return counts
@@ -0,0 +1,133 @@
+import re
+from typing import Any, Optional
+
+from catalog_backend.dal.models.db import ProductEntry
+
+# compact item layout, version 1:
+# product_stack_id: '<account>/<stack uuid>', the table's sort key attribute name can't change
+# v: codec version, a: account id when it differs from the stack account, s: stack name, p: ARN partition when not 'aws'
+# sr: stack region when it differs from the product region
+# n, r: product name and region, a dictionary index (number) or the raw value (string) when not in the dictionary
+# pv: product version, c: consumer name, t: created at
+CODEC_VERSION = 1
+# optimistic concurrency token of counted writes in both layouts, a millisecond timestamp that increases with every write of the item,
+# decoding ignores it
+REVISION_ATTRIBUTE = 'rev'
+
+# dictionaries are append-only, an index must never change meaning once items were written with it
+REGIONS = (
+    'us-east-1',
+    'us-east-2',
+    'us-west-1',
+    'us-west-2',
+    'eu-west-1',
+    'eu-west-2',
+    'eu-west-3',
+    'eu-central-1',
+    'eu-central-2',
+    'eu-north-1',
+    'eu-south-1',
+    'eu-south-2',
+    'ap-south-1',
+    'ap-south-2',
+    'ap-southeast-1',
+    'ap-southeast-2',
+    'ap-southeast-3',
+    'ap-southeast-4',
+    'ap-northeast-1',
+    'ap-northeast-2',
+    'ap-northeast-3',
+    'ap-east-1',
+    'ca-central-1',
+    'ca-west-1',
+    'sa-east-1',
+    'me-south-1',
+    'me-central-1',
+    'af-south-1',
+    'il-central-1',
+)
+PRODUCT_NAMES = (
+    'CI/CD IAM Role Product',
+    'WAF Rules Product',
+    'Orders Service Cross Account Access',
+)
+
+_STACK_ARN = re.compile(r'arn:(?P<partition>[\w-]+):cloudformation:(?P<region>[\w-]+):(?P<account>\d{12}):stack/(?P<name>[^/]+)/(?P<uuid>[^/]+)')
+# Service Catalog names provisioned product stacks 'SC-<account>-<provisioned product id>'
+_SERVICE_CATALOG_PREFIX = 'SC-{account}-'
+_SERVICE_CATALOG_MARKER = '~'
+_REGION_INDEX = {region: index for index, region in enumerate(REGIONS)}
+_PRODUCT_NAME_INDEX = {name: index for index, name in enumerate(PRODUCT_NAMES)}
+
+
+def _encode_value(value: str, index: dict[str, int]) -> Any:
+    return index.get(value, value)
+
+
+def _decode_value(value: Any, dictionary: tuple[str, ...]) -> str:
+    return value if isinstance(value, str) else dictionary[int(value)]
+
+
+def compact_sort_key(product_stack_id: str) -> Optional[str]:
+    """The compact sort key of a stack ARN, None when the stack id is not a CloudFormation stack ARN and must be stored as is."""
+    match = _STACK_ARN.fullmatch(product_stack_id)
+    return f'{match["account"]}/{match["uuid"]}' if match else None
+
+
+def revision(item: Optional[dict[str, Any]]) -> int:
+    """The revision of a stored item in either layout, 0 for items written before revisions, see REVISION_ATTRIBUTE."""
+    return int(item.get(REVISION_ATTRIBUTE, 0)) if item else 0
+
+
+def encode(entry: ProductEntry) -> dict[str, Any]:
+    match = _STACK_ARN.fullmatch(entry.product_stack_id)
+    if not match:
+        return entry.model_dump()  # legacy layout
+
+    account = match['account']
+    stack_name = match['name']
+    service_catalog_prefix = _SERVICE_CATALOG_PREFIX.format(account=account)
+    if stack_name.startswith(service_catalog_prefix):
+        stack_name = _SERVICE_CATALOG_MARKER + stack_name[len(service_catalog_prefix) :]
+    item: dict[str, Any] = {
+        'portfolio_id': entry.portfolio_id,
+        'product_stack_id': f'{account}/{match["uuid"]}',
+        'v': CODEC_VERSION,
+        's': stack_name,
+        'n': _encode_value(entry.name, _PRODUCT_NAME_INDEX),
+        'r': _encode_value(entry.region, _REGION_INDEX),
+        'pv': entry.version,
+        'c': entry.consumer_name,
+        't': entry.created_at,
+    }
+    if entry.account_id != account:
+        item['a'] = entry.account_id
+    if match['region'] != entry.region:
+        item['sr'] = _encode_value(match['region'], _REGION_INDEX)
+    if match['partition'] != 'aws':
+        item['p'] = match['partition']
+    return item
+
+
+def decode(item: dict[str, Any]) -> ProductEntry:
+    if 'v' not in item:
+        return ProductEntry.model_validate(item)  # legacy layout
+    if int(item['v']) != CODEC_VERSION:
+        raise ValueError(f'unsupported item codec version {item["v"]}')
+
+    account, stack_uuid = item['product_stack_id'].split('/', 1)
+    region = _decode_value(item['r'], REGIONS)
+    stack_region = _decode_value(item['sr'], REGIONS) if 'sr' in item else region
+    stack_name = item['s']
+    if stack_name.startswith(_SERVICE_CATALOG_MARKER):
+        stack_name = _SERVICE_CATALOG_PREFIX.format(account=account) + stack_name[len(_SERVICE_CATALOG_MARKER) :]
+    return ProductEntry(
+        portfolio_id=item['portfolio_id'],
+        product_stack_id=f'arn:{item.get("p", "aws")}:cloudformation:{stack_region}:{account}:stack/{stack_name}/{stack_uuid}',
+        name=_decode_value(item['n'], PRODUCT_NAMES),
+        version=item['pv'],
+        account_id=item.get('a', account),
+        consumer_name=item['c'],
+        region=region,
+        created_at=int(item['t']),
+    )
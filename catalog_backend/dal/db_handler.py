@@ -1,4 +1,7 @@
 from abc import ABC, ABCMeta, abstractmethod
+from typing import Optional
+
+from catalog_backend.dal.models.db import DeploymentCounts, ProductChange, ProductEntry
 
 
 class _SingletonMeta(ABCMeta):
@@ -12,6 +15,10 @@ class _SingletonMeta(ABCMeta):
 
 # data access handler / integration later adapter class
 class DalHandler(ABC, metaclass=_SingletonMeta):
+    def warm_up(self) -> None:
+        """Opens the handler's connections ahead of the first request, a no-op for handlers without any."""
+        return None
+
     @abstractmethod
     def add_product_deployment(
         self,
@@ -42,3 +49,30 @@ class DalHandler(ABC, metaclass=_SingletonMeta):
         consumer_name: str,
         region: str,
     ) -> None: ...  # pragma: no cover
+
+    @abstractmethod
+    def list_product_deployments(
+        self,
+        portfolio_id: str,
+        limit: int = 100,
+        next_token: Optional[str] = None,
+    ) -> tuple[list[ProductEntry], Optional[str]]: ...  # pragma: no cover
+
+    @abstractmethod
+    def list_product_history(
+        self,
+        portfolio_id: str,
+        product_stack_id: str,
+        limit: int = 100,
+    ) -> list[ProductChange]: ...  # pragma: no cover
+
+    @abstractmethod
+    def list_recent_changes(
+        self,
+        portfolio_id: str,
+        since_ms: int,
+        limit: int = 100,
+    ) -> list[ProductChange]: ...  # pragma: no cover
+
+    @abstractmethod
+    def get_deployment_counts(self, portfolio_id: str) -> DeploymentCounts: ...  # pragma: no cover
@@ -0,0 +1,103 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+import boto3
+from cachetools import TTLCache, cached
+from mypy_boto3_dynamodb.client import DynamoDBClient
+from pydantic import BaseModel
+
+from catalog_backend.dal import codec
+from catalog_backend.dal.dynamo_dal_handler import DynamoDalHandler
+from catalog_backend.dal.models.db import ProductEntry
+from catalog_backend.handlers.utils.api_calls import account_api_calls
+from catalog_backend.handlers.utils.observability import logger
+
+# python value to DynamoDB wire format AttributeValue, looked up by exact type so bool doesn't serialize as a number
+_TO_WIRE: dict[type, Callable[[Any], dict]] = {
+    str: lambda value: {'S': value},
+    int: lambda value: {'N': str(value)},
+    Decimal: lambda value: {'N': str(value)},
+    bool: lambda value: {'BOOL': value},
+}
+_FROM_WIRE: dict[str, Callable[[Any], Any]] = {
+    'S': lambda value: value,
+    'N': lambda value: int(value) if value.lstrip('-').isdigit() else Decimal(value),
+    'BOOL': lambda value: value,
+}
+_QUERY_NAMES = {'#pk': 'portfolio_id'}
+
+
+@lru_cache
+def _field_serializers(model: type[BaseModel]) -> tuple[tuple[str, Callable[[Any], dict]], ...]:
+    # resolved once per model, pydantic strips the Annotated constraints so the annotation is the plain python type
+    return tuple((name, _TO_WIRE[field.annotation]) for name, field in model.model_fields.items())  # type: ignore[index]
+
+
+def to_wire(item: dict[str, Any]) -> dict[str, dict]:
+    return {name: _TO_WIRE[type(value)](value) for name, value in item.items()}
+
+
+def entry_to_wire(entry: ProductEntry) -> dict[str, dict]:
+    # reads the validated attributes directly instead of going through model_dump
+    return {name: serialize(getattr(entry, name)) for name, serialize in _field_serializers(ProductEntry)}
+
+
+def from_wire(item: dict[str, dict]) -> dict[str, Any]:
+    return {name: _FROM_WIRE[value_type](value) for name, attribute in item.items() for value_type, value in attribute.items()}
+
+
+class DynamoClientDalHandler(DynamoDalHandler):
+    """
+    Same item layouts and scatter-gather reads as DynamoDalHandler, on the low-level client.
+    Items are sent and received in wire format, query results are only decoded once they are returned to the caller.
+    """
+
+    # cache dynamodb connection data for no longer than 5 minutes
+    @cached(cache=TTLCache(maxsize=1, ttl=300))
+    def _get_db_client(self) -> DynamoDBClient:
+        logger.info('opening low level connection to dynamodb', table_name=self.table_name)
+        return account_api_calls(boto3.client('dynamodb'))
+
+    def _client(self) -> DynamoDBClient:
+        return self._get_db_client()
+
+    def _to_item(self, values: dict[str, Any]) -> dict[str, dict]:
+        return to_wire(values)
+
+    def _from_item(self, item: dict[str, dict]) -> dict[str, Any]:
+        return from_wire(item)
+
+    def _encode(self, entry: ProductEntry) -> dict[str, dict]:
+        return to_wire(codec.encode(entry)) if self.compact_items else entry_to_wire(entry)
+
+    def _put_item(self, entry: ProductEntry, return_old: bool = False) -> bool:
+        response = self._get_db_client().put_item(
+            TableName=self.table_name, Item=self._encode(entry), **({'ReturnValues': 'ALL_OLD'} if return_old else {})
+        )
+        return 'Attributes' in response
+
+    def _delete_item(self, key: dict, return_old: bool = False) -> bool:
+        response = self._get_db_client().delete_item(
+            TableName=self.table_name, Key=to_wire(key), **({'ReturnValues': 'ALL_OLD'} if return_old else {})
+        )
+        return 'Attributes' in response
+
+    def _query_shard(self, shard_key: str, cursor: Optional[str], limit: int) -> tuple[list[dict], bool]:
+        params: dict = {
+            'TableName': self.table_name,
+            'KeyConditionExpression': '#pk = :pk',
+            'ExpressionAttributeNames': _QUERY_NAMES,
+            'ExpressionAttributeValues': {':pk': {'S': shard_key}},
+            'Limit': limit,
+        }
+        if cursor:
+            params['ExclusiveStartKey'] = {'portfolio_id': {'S': shard_key}, 'product_stack_id': {'S': cursor}}
+        response = self._get_db_client().query(**params)
+        return response.get('Items', []), 'LastEvaluatedKey' in response
+
+    def _sort_key(self, item: dict) -> str:
+        return item['product_stack_id']['S']
+
+    def _decode_item(self, item: dict, portfolio_id: str) -> ProductEntry:
+        return codec.decode({**from_wire(item), 'portfolio_id': portfolio_id})
@@ -1,30 +1,239 @@
+import base64
+import heapq
+import itertools
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import Any, Optional
 
 import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
 from cachetools import TTLCache, cached
 from mypy_boto3_dynamodb import DynamoDBServiceResource
 from mypy_boto3_dynamodb.service_resource import Table
 from pydantic import ValidationError
 
+from catalog_backend.dal import codec
+from catalog_backend.dal.aggregates import COUNT_ATTRIBUTE, COUNTER_SHARDS, aggregates_partition, aggregates_partitions, build_counts, counter_deltas
 from catalog_backend.dal.db_handler import DalHandler
-from catalog_backend.dal.models.db import ProductEntry
+from catalog_backend.dal.history import (
+    EVENT_SEPARATOR,
+    RECENT_CHANGES_INDEX,
+    RECENT_PARTITION_KEY,
+    RECENT_SORT_KEY,
+    decode_change,
+    history_item,
+    history_partition,
+    hour_buckets,
+    recent_partition,
+    timestamp_key,
+)
+from catalog_backend.dal.models.db import DeploymentCounts, ProductChange, ProductEntry
+from catalog_backend.dal.sharding import partition_key, partition_keys
+from catalog_backend.handlers.utils.api_calls import account_api_calls
 from catalog_backend.handlers.utils.observability import logger, tracer
 
+# upper bound of concurrent shard queries of a single scatter-gather read
+_MAX_SCATTER_WORKERS = 16
+# recent changes read one index partition per shard and hour, older changes are only kept for the history of a stack
+_MAX_RECENT_CHANGES_HOURS = 7 * 24
+# counted writes are conditioned on the item they replace, a concurrent change of the same product or of the same counter copy cancels the
+# transaction, botocore doesn't retry cancelled transactions
+_MAX_COUNTED_WRITE_ATTEMPTS = 6
+_COUNTED_WRITE_BACKOFF_BASE_SECONDS = 0.05
+_COUNTED_WRITE_BACKOFF_CAP_SECONDS = 1
+_COUNTERS_PAGE_SIZE = 1000
+_ABSENT_CONDITION = {'ConditionExpression': 'attribute_not_exists(#pk)', 'ExpressionAttributeNames': {'#pk': 'portfolio_id'}}
+
+
+def _is_write_conflict(exc: ClientError) -> bool:
+    reasons = exc.response.get('CancellationReasons', [])  # type: ignore[typeddict-item]
+    return exc.response['Error']['Code'] == 'TransactionCanceledException' and any(
+        reason.get('Code') in ('ConditionalCheckFailed', 'TransactionConflict') for reason in reasons
+    )
+
 
 class DynamoDalHandler(DalHandler):
-    def __init__(self, table_name: str):
+    def __init__(
+        self, table_name: str, shard_count: int = 1, compact_items: bool = False, history_retention_days: int = 0, aggregates_enabled: bool = False
+    ):
         self.table_name = table_name
+        self.shard_count = shard_count
+        self.compact_items = compact_items
+        # days to keep the history events of every lifecycle transition, 0 only keeps the current item
+        self.history_retention_days = history_retention_days
+        # maintain live deployment counters in the same transaction as every product write
+        self.aggregates_enabled = aggregates_enabled
 
     # cache dynamodb connection data for no longer than 5 minutes
     @cached(cache=TTLCache(maxsize=1, ttl=300))
     def _get_db_handler(self, table_name: str) -> Table:
         logger.info('opening connection to dynamodb table', table_name=table_name)
         dynamodb: DynamoDBServiceResource = boto3.resource('dynamodb')
+        account_api_calls(dynamodb.meta.client)
         return dynamodb.Table(table_name)
 
+    def warm_up(self) -> None:
+        # a presigned URL builds and signs a request locally: creates the client, resolves its endpoint and loads credentials, without calling DynamoDB
+        self._client().generate_presigned_url('describe_table', Params={'TableName': self.table_name})
+
+    def _sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
     def _get_unix_time(self) -> int:
         return int(datetime.now(timezone.utc).timestamp())
 
+    def _get_unix_time_ms(self) -> int:
+        return int(datetime.now(timezone.utc).timestamp() * 1000)
+
+    def _client(self) -> Any:
+        # the table's client is thread safe and (de)serializes python values, the table resource itself is not thread safe
+        return self._get_db_handler(self.table_name).meta.client
+
+    def _to_item(self, values: dict[str, Any]) -> Any:
+        return values
+
+    def _from_item(self, item: Any) -> dict[str, Any]:
+        return item
+
+    def _encode(self, entry: ProductEntry) -> Any:
+        return codec.encode(entry) if self.compact_items else entry.model_dump()
+
+    def _legacy_key(self, portfolio_id: str, product_stack_id: str) -> dict:
+        return {'portfolio_id': partition_key(portfolio_id, product_stack_id, self.shard_count), 'product_stack_id': product_stack_id}
+
+    def _compact_key(self, portfolio_id: str, product_stack_id: str) -> Optional[dict]:
+        sort_key = codec.compact_sort_key(product_stack_id) if self.compact_items else None
+        return {**self._legacy_key(portfolio_id, product_stack_id), 'product_stack_id': sort_key} if sort_key else None
+
+    def _put_item(self, entry: ProductEntry, return_old: bool = False) -> bool:
+        # returns whether an existing item was replaced, only known when return_old is set
+        table: Table = self._get_db_handler(self.table_name)
+        response = table.put_item(Item=self._encode(entry), **({'ReturnValues': 'ALL_OLD'} if return_old else {}))
+        return 'Attributes' in response
+
+    def _delete_item(self, key: dict, return_old: bool = False) -> bool:
+        table: Table = self._get_db_handler(self.table_name)
+        response = table.delete_item(Key=key, **({'ReturnValues': 'ALL_OLD'} if return_old else {}))
+        return 'Attributes' in response
+
+    def _query_shard(self, shard_key: str, cursor: Optional[str], limit: int) -> tuple[list[dict], bool]:
+        params: dict = {'TableName': self.table_name, 'KeyConditionExpression': Key('portfolio_id').eq(shard_key), 'Limit': limit}
+        if cursor:
+            params['ExclusiveStartKey'] = {'portfolio_id': shard_key, 'product_stack_id': cursor}
+        response = self._client().query(**params)
+        return response.get('Items', []), 'LastEvaluatedKey' in response
+
+    def _query_newest(self, key_condition: str, names: dict[str, str], values: dict[str, Any], limit: int, index: Optional[str] = None) -> list[dict]:
+        params: dict = {
+            'TableName': self.table_name,
+            'KeyConditionExpression': key_condition,
+            'ExpressionAttributeNames': names,
+            'ExpressionAttributeValues': self._to_item(values),
+            'ScanIndexForward': False,
+            'Limit': limit,
+        }
+        if index:
+            params['IndexName'] = index
+        response = self._client().query(**params)
+        return [self._from_item(item) for item in response.get('Items', [])]
+
+    def _write_with_history(
+        self, portfolio_id: str, product_stack_id: str, event: str, changed_at_ms: int, current: Optional[ProductEntry], deletes: list[dict]
+    ) -> None:
+        # the current item and the history event are written in one transaction, which costs twice the write units of its items
+        shard_key = partition_key(portfolio_id, product_stack_id, self.shard_count)
+        event_item = history_item(shard_key, product_stack_id, event, changed_at_ms, self.history_retention_days, current)
+        puts = [self._to_item(event_item)] + ([self._encode(current)] if current else [])
+        transact_items: list[dict] = [{'Put': {'TableName': self.table_name, 'Item': item}} for item in puts]
+        transact_items += [{'Delete': {'TableName': self.table_name, 'Key': self._to_item(key)}} for key in deletes]
+        self._client().transact_write_items(TransactItems=transact_items)
+
+    def _get_item(self, key: dict) -> Optional[dict[str, Any]]:
+        response = self._client().get_item(TableName=self.table_name, Key=self._to_item(key), ConsistentRead=True)
+        return self._from_item(response['Item']) if 'Item' in response else None
+
+    def _read_current(self, portfolio_id: str, product_stack_id: str) -> tuple[Optional[dict], Optional[dict[str, Any]]]:
+        # key and item of the current product entry, in whichever layout it was written
+        for key in (self._compact_key(portfolio_id, product_stack_id), self._legacy_key(portfolio_id, product_stack_id)):
+            if key and (item := self._get_item(key)):
+                return key, item
+        return None, None
+
+    def _unchanged_condition(self, item: dict[str, Any]) -> dict:
+        # optimistic concurrency, applies only if the item wasn't replaced or deleted since it was read.
+        # items written before revisions get one with their first counted write, which fails any other writer that read them
+        names = {'#pk': 'portfolio_id', '#rev': codec.REVISION_ATTRIBUTE}
+        if not codec.revision(item):
+            return {'ConditionExpression': 'attribute_exists(#pk) AND attribute_not_exists(#rev)', 'ExpressionAttributeNames': names}
+        return {
+            'ConditionExpression': 'attribute_exists(#pk) AND #rev = :rev',
+            'ExpressionAttributeNames': names,
+            'ExpressionAttributeValues': self._to_item({':rev': codec.revision(item)}),
+        }
+
+    def _write_counted(self, portfolio_id: str, product_stack_id: str, event: str, changed_at_ms: int, current: Optional[ProductEntry]) -> None:
+        # counters move by the difference between the replaced or deleted entry and the new one, so the entry is read first
+        shard_key = partition_key(portfolio_id, product_stack_id, self.shard_count)
+        target_key = self._compact_key(portfolio_id, product_stack_id) or self._legacy_key(portfolio_id, product_stack_id)
+        for attempt in range(1, _MAX_COUNTED_WRITE_ATTEMPTS + 1):
+            previous_key, previous_item = self._read_current(portfolio_id, product_stack_id)
+            previous = codec.decode({**previous_item, 'portfolio_id': portfolio_id}) if previous_item else None
+            transact_items: list[dict] = []
+            if current:
+                condition = self._unchanged_condition(previous_item) if previous_item and previous_key == target_key else _ABSENT_CONDITION
+                # strictly increasing even for writes within the same millisecond
+                revision = self._to_item({codec.REVISION_ATTRIBUTE: max(changed_at_ms, codec.revision(previous_item) + 1)})
+                transact_items.append({'Put': {'TableName': self.table_name, 'Item': {**self._encode(current), **revision}, **condition}})
+            if previous_item and previous_key and (current is None or previous_key != target_key):
+                delete = {'TableName': self.table_name, 'Key': self._to_item(previous_key), **self._unchanged_condition(previous_item)}
+                transact_items.append({'Delete': delete})
+            if self.history_retention_days:
+                event_item = history_item(shard_key, product_stack_id, event, changed_at_ms, self.history_retention_days, current)
+                transact_items.append({'Put': {'TableName': self.table_name, 'Item': self._to_item(event_item)}})
+            counters_partition = aggregates_partition(shard_key, random.randrange(COUNTER_SHARDS))
+            for counter_key, delta in counter_deltas(previous, current).items():
+                update = {
+                    'TableName': self.table_name,
+                    'Key': self._to_item({'portfolio_id': counters_partition, 'product_stack_id': counter_key}),
+                    'UpdateExpression': 'ADD #count :delta',
+                    'ExpressionAttributeNames': {'#count': COUNT_ATTRIBUTE},
+                    'ExpressionAttributeValues': self._to_item({':delta': delta}),
+                }
+                transact_items.append({'Update': update})
+            if not transact_items:
+                logger.info('product deployment does not exist, nothing to write')
+                return
+            try:
+                self._client().transact_write_items(TransactItems=transact_items)
+                return
+            except ClientError as exc:
+                if attempt == _MAX_COUNTED_WRITE_ATTEMPTS or not _is_write_conflict(exc):
+                    raise
+                # exponential backoff with full jitter, so writers that conflicted don't retry in lockstep
+                delay = random.uniform(0, min(_COUNTED_WRITE_BACKOFF_CAP_SECONDS, _COUNTED_WRITE_BACKOFF_BASE_SECONDS * 2**attempt))
+                logger.warning('product deployment or its counters changed concurrently, retrying', attempt=attempt, delay_seconds=round(delay, 3))
+                self._sleep(delay)
+
+    def _query_partition(self, partition: str) -> list[dict[str, Any]]:
+        items: list[dict[str, Any]] = []
+        cursor = None
+        while True:
+            page, has_more = self._query_shard(partition, cursor, _COUNTERS_PAGE_SIZE)
+            items.extend(self._from_item(item) for item in page)
+            if not has_more or not page:
+                return items
+            cursor = self._sort_key(page[-1])
+
+    def _sort_key(self, item: dict) -> str:
+        return item['product_stack_id']
+
+    def _decode_item(self, item: dict, portfolio_id: str) -> ProductEntry:
+        return codec.decode({**item, 'portfolio_id': portfolio_id})
+
     @tracer.capture_method(capture_response=False)
     def add_product_deployment(
         self,
@@ -37,19 +246,24 @@ class DynamoDalHandler(DalHandler):
         region: str,
     ) -> None:
         logger.info('trying to save product deployment')
+        changed_at_ms = self._get_unix_time_ms()
         try:
             entry = ProductEntry(
-                portfolio_id=portfolio_id,
+                portfolio_id=partition_key(portfolio_id, product_stack_id, self.shard_count),
                 product_stack_id=product_stack_id,
                 name=product_name,
                 version=product_version,
                 account_id=account_id,
                 consumer_name=consumer_name,
                 region=region,
-                created_at=self._get_unix_time(),
+                created_at=changed_at_ms // 1000,
             )
-            table: Table = self._get_db_handler(self.table_name)
-            table.put_item(Item=entry.model_dump())
+            if self.aggregates_enabled:
+                self._write_counted(portfolio_id, product_stack_id, 'Create', changed_at_ms, entry)
+            elif self.history_retention_days:
+                self._write_with_history(portfolio_id, product_stack_id, 'Create', changed_at_ms, entry, deletes=[])
+            else:
+                self._put_item(entry)
         except ValidationError as exc:  # pragma: no cover
             logger.exception('failed to create product deployment')
             raise exc
@@ -64,8 +278,16 @@ class DynamoDalHandler(DalHandler):
     ) -> None:
         logger.info('trying to delete product deployment')
         try:
-            table: Table = self._get_db_handler(self.table_name)
-            table.delete_item(Key={'portfolio_id': portfolio_id, 'product_stack_id': product_stack_id})
+            compact_key = self._compact_key(portfolio_id, product_stack_id)
+            legacy_key = self._legacy_key(portfolio_id, product_stack_id)
+            if self.aggregates_enabled:
+                self._write_counted(portfolio_id, product_stack_id, 'Delete', self._get_unix_time_ms(), None)
+            elif self.history_retention_days:
+                deletes = [compact_key, legacy_key] if compact_key else [legacy_key]
+                self._write_with_history(portfolio_id, product_stack_id, 'Delete', self._get_unix_time_ms(), None, deletes)
+            # items written before compact items were enabled are stored under the legacy key
+            elif not compact_key or not self._delete_item(compact_key, return_old=True):
+                self._delete_item(legacy_key)
         except Exception as exc:
             logger.exception('failed to delete product deployment')
             raise exc
@@ -83,21 +305,150 @@ class DynamoDalHandler(DalHandler):
         region: str,
     ) -> None:
         logger.info('trying to update product deployment')
+        changed_at_ms = self._get_unix_time_ms()
         try:
             entry = ProductEntry(
-                portfolio_id=portfolio_id,
+                portfolio_id=partition_key(portfolio_id, product_stack_id, self.shard_count),
                 product_stack_id=product_stack_id,
                 name=product_name,
                 version=product_version,
                 account_id=account_id,
                 consumer_name=consumer_name,
                 region=region,
-                created_at=self._get_unix_time(),
+                created_at=changed_at_ms // 1000,
             )
-            table: Table = self._get_db_handler(self.table_name)
+            compact = self._compact_key(portfolio_id, product_stack_id) is not None
+            if self.aggregates_enabled:
+                self._write_counted(portfolio_id, product_stack_id, 'Update', changed_at_ms, entry)
+            elif self.history_retention_days:
+                # a transaction can't return the replaced item, the legacy copy is always deleted along with it
+                deletes = [self._legacy_key(portfolio_id, product_stack_id)] if compact else []
+                self._write_with_history(portfolio_id, product_stack_id, 'Update', changed_at_ms, entry, deletes)
             # overwrite the entry if it exists
-            table.put_item(Item=entry.model_dump())
+            elif not self._put_item(entry, return_old=compact) and compact:
+                # first write in the compact layout, drop the item in the legacy layout so the product isn't listed twice
+                self._delete_item(self._legacy_key(portfolio_id, product_stack_id))
         except ValidationError as exc:
             logger.exception('failed to update product deployment')
             raise exc
         logger.info('finished update product deployment successfully')
+
+    @staticmethod
+    def _encode_token(cursors: dict[str, Optional[str]]) -> Optional[str]:
+        return base64.urlsafe_b64encode(json.dumps(cursors).encode()).decode() if cursors else None
+
+    @staticmethod
+    def _decode_token(next_token: str) -> dict[str, Optional[str]]:
+        try:
+            return json.loads(base64.urlsafe_b64decode(next_token.encode()))
+        except ValueError as exc:
+            logger.exception('invalid pagination token')
+            raise ValueError('invalid pagination token') from exc
+
+    @tracer.capture_method(capture_response=False)
+    def list_product_deployments(
+        self,
+        portfolio_id: str,
+        limit: int = 100,
+        next_token: Optional[str] = None,
+    ) -> tuple[list[ProductEntry], Optional[str]]:
+        """
+        Queries all shards of the portfolio in parallel and merges them by product_stack_id.
+        The pagination token holds the last returned sort key of every shard that has more items.
+        """
+        logger.info('trying to list product deployments', shard_count=self.shard_count)
+        cursors = self._decode_token(next_token) if next_token else dict.fromkeys(partition_keys(portfolio_id, self.shard_count))
+        with ThreadPoolExecutor(max_workers=max(1, min(len(cursors), _MAX_SCATTER_WORKERS))) as executor:
+            # every shard returns at most 'limit' items, enough to fill the merged page in any distribution
+            futures = {shard_key: executor.submit(self._query_shard, shard_key, cursor, limit) for shard_key, cursor in cursors.items()}
+            pages = {shard_key: future.result() for shard_key, future in futures.items()}
+
+        merged = heapq.merge(*[[(self._sort_key(item), shard_key, item) for item in items] for shard_key, (items, _) in pages.items()])
+        entries: list[ProductEntry] = []
+        consumed: dict[str, int] = dict.fromkeys(pages, 0)
+        for sort_key, shard_key, item in merged:
+            if len(entries) == limit:
+                break
+            entries.append(self._decode_item(item, portfolio_id))
+            cursors[shard_key] = sort_key
+            consumed[shard_key] += 1
+
+        # a shard is done once all of its items were returned and DynamoDB has no more
+        next_cursors = {
+            shard_key: cursors[shard_key] for shard_key, (items, has_more) in pages.items() if has_more or consumed[shard_key] < len(items)
+        }
+        logger.info('finished list product deployments successfully', count=len(entries))
+        return entries, self._encode_token(next_cursors)
+
+    @tracer.capture_method(capture_response=False)
+    def list_product_history(
+        self,
+        portfolio_id: str,
+        product_stack_id: str,
+        limit: int = 100,
+    ) -> list[ProductChange]:
+        """The lifecycle transitions of a product stack that are still retained, newest first."""
+        logger.info('trying to list product history')
+        shard_key = partition_key(portfolio_id, product_stack_id, self.shard_count)
+        items = self._query_newest(
+            '#pk = :pk AND begins_with(#sk, :stack)',
+            {'#pk': 'portfolio_id', '#sk': 'product_stack_id'},
+            {':pk': history_partition(shard_key), ':stack': f'{product_stack_id}{EVENT_SEPARATOR}'},
+            limit,
+        )
+        logger.info('finished list product history successfully', count=len(items))
+        return [decode_change(item, portfolio_id) for item in items]
+
+    @tracer.capture_method(capture_response=False)
+    def list_recent_changes(
+        self,
+        portfolio_id: str,
+        since_ms: int,
+        limit: int = 100,
+    ) -> list[ProductChange]:
+        """
+        Lifecycle transitions across the portfolio since a unix time in milliseconds, newest first.
+        Reads the hour buckets of every shard from the recent changes index in parallel and merges them by time.
+        """
+        now_ms = self._get_unix_time_ms()
+        if since_ms < now_ms - _MAX_RECENT_CHANGES_HOURS * 3600 * 1000:
+            logger.error('recent changes lookback is too long', since_ms=since_ms)
+            raise ValueError(f'recent changes are limited to the last {_MAX_RECENT_CHANGES_HOURS} hours')
+
+        recent_keys = [
+            recent_partition(shard_key, bucket)
+            for shard_key in partition_keys(portfolio_id, self.shard_count)
+            for bucket in hour_buckets(since_ms, now_ms)
+        ]
+        logger.info('trying to list recent changes', partitions=len(recent_keys))
+        names = {'#pk': RECENT_PARTITION_KEY, '#sk': RECENT_SORT_KEY}
+        since_key = timestamp_key(since_ms)
+        with ThreadPoolExecutor(max_workers=max(1, min(len(recent_keys), _MAX_SCATTER_WORKERS))) as executor:
+            pages = list(
+                executor.map(
+                    lambda recent_key: self._query_newest(
+                        '#pk = :pk AND #sk >= :since', names, {':pk': recent_key, ':since': since_key}, limit, RECENT_CHANGES_INDEX
+                    ),
+                    recent_keys,
+                )
+            )
+
+        merged = heapq.merge(*pages, key=lambda item: item[RECENT_SORT_KEY], reverse=True)
+        changes = [decode_change(item, portfolio_id) for item in itertools.islice(merged, limit)]
+        logger.info('finished list recent changes successfully', count=len(changes))
+        return changes
+
+    @tracer.capture_method(capture_response=False)
+    def get_deployment_counts(self, portfolio_id: str) -> DeploymentCounts:
+        """
+        Live deployments of the portfolio in total and per product, version, account and region, summed from the counter items.
+        Not a single item read: it queries the COUNTER_SHARDS counter partitions of every shard, COUNTER_SHARDS * shard_count paginated queries,
+        and reads one item per distinct product, version, account and region of every partition, in parallel.
+        """
+        logger.info('trying to get deployment counts')
+        partitions = [partition for shard_key in partition_keys(portfolio_id, self.shard_count) for partition in aggregates_partitions(shard_key)]
+        with ThreadPoolExecutor(max_workers=max(1, min(len(partitions), _MAX_SCATTER_WORKERS))) as executor:
+            pages = list(executor.map(self._query_partition, partitions))
+        counts = build_counts(itertools.chain.from_iterable(pages))
+        logger.info('finished get deployment counts successfully', total=counts.total)
+        return counts
@@ -0,0 +1,102 @@
+from typing import Any, Optional
+
+import boto3
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+from cachetools import TTLCache, cached
+from mypy_boto3_dynamodb import DynamoDBServiceResource
+from mypy_boto3_dynamodb.service_resource import Table
+
+from catalog_backend.dal.models.db import ProductEntry
+from catalog_backend.dal.views_db_handler import ViewsDalHandler
+from catalog_backend.handlers.utils.observability import logger, tracer
+
+# stream records can be delivered more than once, a view item only changes for a later record of the product item it mirrors
+_NEWER_RECORD_CONDITION = 'attribute_not_exists(#sequence) OR #sequence < :sequence'
+# stream sequence numbers have up to 40 digits, more than a DynamoDB number holds, they're stored as zero padded strings that sort the same
+_SEQUENCE_DIGITS = 40
+_VIEW_ATTRIBUTES = ('view_id', 'item_id', 'sequence')
+# a removed view item is replaced by a deleted marker holding the sequence number and time of the removing record,
+# so a late or replayed record of the deleted product fails the condition above instead of recreating the item.
+# markers expire once no record they guard against can still be delivered, stream records are retried for up to 24 hours
+DELETED_ATTRIBUTE = 'deleted'
+TTL_ATTRIBUTE = 'expires_at'
+_DELETED_MARKER_RETENTION_SECONDS = 2 * 24 * 60 * 60
+
+
+class DynamoViewsDalHandler(ViewsDalHandler):
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+
+    # cache dynamodb connection data for no longer than 5 minutes
+    @cached(cache=TTLCache(maxsize=1, ttl=300))
+    def _get_db_handler(self, table_name: str) -> Table:
+        logger.info('opening connection to dynamodb table', table_name=table_name)
+        dynamodb: DynamoDBServiceResource = boto3.resource('dynamodb')
+        return dynamodb.Table(table_name)
+
+    @staticmethod
+    def _sequence(sequence_number: str) -> str:
+        return sequence_number.zfill(_SEQUENCE_DIGITS)
+
+    def _newer_record(self, sequence_number: str) -> dict[str, Any]:
+        return {
+            'ConditionExpression': _NEWER_RECORD_CONDITION,
+            'ExpressionAttributeNames': {'#sequence': 'sequence'},
+            'ExpressionAttributeValues': {':sequence': self._sequence(sequence_number)},
+        }
+
+    @staticmethod
+    def _is_stale(exc: ClientError) -> bool:
+        return exc.response['Error']['Code'] == 'ConditionalCheckFailedException'
+
+    @tracer.capture_method(capture_response=False)
+    def upsert_view_item(self, view_id: str, item_id: str, entry: ProductEntry, sequence_number: str) -> bool:
+        table: Table = self._get_db_handler(self.table_name)
+        item = {**entry.model_dump(), 'view_id': view_id, 'item_id': item_id, 'sequence': self._sequence(sequence_number)}
+        try:
+            table.put_item(Item=item, **self._newer_record(sequence_number))
+        except ClientError as exc:
+            if not self._is_stale(exc):
+                raise
+            logger.info('view item is already up to date', view_id=view_id, sequence_number=sequence_number)
+            return False
+        return True
+
+    @tracer.capture_method(capture_response=False)
+    def delete_view_item(self, view_id: str, item_id: str, sequence_number: str, changed_at: int) -> bool:
+        table: Table = self._get_db_handler(self.table_name)
+        marker = {
+            'view_id': view_id,
+            'item_id': item_id,
+            'sequence': self._sequence(sequence_number),
+            DELETED_ATTRIBUTE: True,
+            'changed_at': changed_at,
+            TTL_ATTRIBUTE: changed_at + _DELETED_MARKER_RETENTION_SECONDS,
+        }
+        try:
+            table.put_item(Item=marker, **self._newer_record(sequence_number))
+        except ClientError as exc:
+            if not self._is_stale(exc):
+                raise
+            logger.info('view item was changed by a later record', view_id=view_id, sequence_number=sequence_number)
+            return False
+        return True
+
+    @tracer.capture_method(capture_response=False)
+    def list_view_items(self, view_id: str) -> list[ProductEntry]:
+        table: Table = self._get_db_handler(self.table_name)
+        entries: list[ProductEntry] = []
+        start_key: Optional[dict] = None
+        while True:
+            params: dict = {'KeyConditionExpression': Key('view_id').eq(view_id), 'FilterExpression': Attr(DELETED_ATTRIBUTE).not_exists()}
+            if start_key:
+                params['ExclusiveStartKey'] = start_key
+            response = table.query(**params)
+            entries.extend(
+                ProductEntry.model_validate({name: value for name, value in item.items() if name not in _VIEW_ATTRIBUTES})
+                for item in response.get('Items', [])
+            )
+            start_key = response.get('LastEvaluatedKey')
+            if not start_key:
+                return entries
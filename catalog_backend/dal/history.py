@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from catalog_backend.dal.models.db import ProductChange, ProductEntry
+
+# history items of a stack are immutable and live in the '<partition key>#history' partition next to the current items,
+# sort key '<product_stack_id>#<changed at ms>' keeps the transitions of a stack together and in order
+HISTORY_SUFFIX = '#history'
+EVENT_SEPARATOR = '#'
+# sparse global secondary index, only history items carry its keys
+RECENT_CHANGES_INDEX = 'recent_changes'
+RECENT_PARTITION_KEY = 'recent_pk'  # '<partition key>#<hour bucket>', one index partition per shard and hour
+RECENT_SORT_KEY = 'recent_sk'  # '<changed at ms>#<product_stack_id>'
+TTL_ATTRIBUTE = 'expires_at'
+_HOUR_BUCKET_FORMAT = '%Y%m%d%H'
+_TIMESTAMP_WIDTH = 13  # zero padded milliseconds sort lexicographically
+
+
+def hour_bucket(changed_at_ms: int) -> str:
+    return datetime.fromtimestamp(changed_at_ms / 1000, timezone.utc).strftime(_HOUR_BUCKET_FORMAT)
+
+
+def hour_buckets(since_ms: int, until_ms: int) -> list[str]:
+    """All hour buckets between two points in time, oldest first."""
+    hour = datetime.fromtimestamp(since_ms / 1000, timezone.utc).replace(minute=0, second=0, microsecond=0)
+    until = datetime.fromtimestamp(until_ms / 1000, timezone.utc)
+    buckets = []
+    while hour <= until:
+        buckets.append(hour.strftime(_HOUR_BUCKET_FORMAT))
+        hour += timedelta(hours=1)
+    return buckets
+
+
+def timestamp_key(changed_at_ms: int) -> str:
+    return f'{changed_at_ms:0{_TIMESTAMP_WIDTH}d}'
+
+
+def history_partition(shard_key: str) -> str:
+    return f'{shard_key}{HISTORY_SUFFIX}'
+
+
+def recent_partition(shard_key: str, bucket: str) -> str:
+    return f'{shard_key}{EVENT_SEPARATOR}{bucket}'
+
+
+def history_item(
+    shard_key: str, product_stack_id: str, event: str, changed_at_ms: int, retention_days: int, entry: Optional[ProductEntry] = None
+) -> dict[str, Any]:
+    item: dict[str, Any] = {
+        'portfolio_id': history_partition(shard_key),
+        'product_stack_id': f'{product_stack_id}{EVENT_SEPARATOR}{timestamp_key(changed_at_ms)}',
+        'event': event,
+        'changed_at': changed_at_ms,
+        TTL_ATTRIBUTE: changed_at_ms // 1000 + retention_days * 24 * 3600,
+        RECENT_PARTITION_KEY: recent_partition(shard_key, hour_bucket(changed_at_ms)),
+        RECENT_SORT_KEY: f'{timestamp_key(changed_at_ms)}{EVENT_SEPARATOR}{product_stack_id}',
+    }
+    # a delete records the transition only, the deleted state is the previous event of the stack
+    if entry:
+        item.update(entry.model_dump(include={'name', 'version', 'account_id', 'consumer_name', 'region'}))
+    return item
+
+
+def decode_change(item: dict[str, Any], portfolio_id: str) -> ProductChange:
+    product_stack_id = item['product_stack_id'].rsplit(EVENT_SEPARATOR, 1)[0]
+    return ProductChange.model_validate(
+        {**item, 'portfolio_id': portfolio_id, 'product_stack_id': product_stack_id, 'changed_at': int(item['changed_at'])}
+    )
@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Literal, Optional
 
 from pydantic import BaseModel, Field, PositiveInt
 
@@ -12,3 +12,38 @@ class ProductEntry(BaseModel):
     consumer_name: Annotated[str, Field(min_length=1, max_length=40)]
     region: Annotated[str, Field(min_length=1, max_length=20)]
     created_at: PositiveInt
+
+
+class ProductChange(BaseModel):
+    portfolio_id: Annotated[str, Field(min_length=1, max_length=40)]
+    product_stack_id: Annotated[str, Field(min_length=1, max_length=200)]
+    event: Literal['Create', 'Update', 'Delete']
+    changed_at: PositiveInt  # unix time in milliseconds
+    # state after the transition, not set for deletes
+    name: Optional[str] = None
+    version: Optional[str] = None
+    account_id: Optional[str] = None
+    consumer_name: Optional[str] = None
+    region: Optional[str] = None
+
+
+class DeploymentCounts(BaseModel):
+    # live product deployments of a portfolio
+    total: int = 0
+    products: dict[str, int] = Field(default_factory=dict)  # product name to count
+    versions: dict[str, dict[str, int]] = Field(default_factory=dict)  # product name to product version to count
+    accounts: dict[str, int] = Field(default_factory=dict)
+    regions: dict[str, int] = Field(default_factory=dict)
+
+
+class AccountSummary(BaseModel):
+    account_id: str
+    total: int = 0
+    products: dict[str, dict[str, int]] = Field(default_factory=dict)  # product name to product version to count
+    regions: dict[str, int] = Field(default_factory=dict)
+
+
+class VersionAdoption(BaseModel):
+    product_name: str
+    total: int = 0
+    versions: dict[str, int] = Field(default_factory=dict)  # product version to count
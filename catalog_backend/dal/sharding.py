@@ -0,0 +1,32 @@
+import hashlib
+
+SHARD_SEPARATOR = '#'
+
+
+def shard_of(product_stack_id: str, shard_count: int) -> int:
+    # a stable hash, Python's hash() is salted per process
+    return int(hashlib.md5(product_stack_id.encode(), usedforsecurity=False).hexdigest()[:8], 16) % shard_count
+
+
+def partition_key(portfolio_id: str, product_stack_id: str, shard_count: int) -> str:
+    # a single shard keeps the original, unsharded key layout
+    if shard_count <= 1:
+        return portfolio_id
+    return f'{portfolio_id}{SHARD_SEPARATOR}{shard_of(product_stack_id, shard_count)}'
+
+
+def partition_keys(portfolio_id: str, shard_count: int) -> list[str]:
+    if shard_count <= 1:
+        return [portfolio_id]
+    return [f'{portfolio_id}{SHARD_SEPARATOR}{shard}' for shard in range(shard_count)]
+
+
+def portfolio_of(partition_key: str) -> str:
+    # portfolio ids never contain the separator, shard numbers and the history suffix follow it
+    return partition_key.split(SHARD_SEPARATOR, 1)[0]
+
+
+def is_product_partition(partition_key: str) -> bool:
+    # history and aggregates partitions carry a suffix after the portfolio id and shard
+    _, _, shard = partition_key.partition(SHARD_SEPARATOR)
+    return not shard or shard.isdigit()
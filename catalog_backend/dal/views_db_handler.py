@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+
+from catalog_backend.dal.db_handler import _SingletonMeta
+from catalog_backend.dal.models.db import ProductEntry
+
+
+# materialised views data access handler, every view is a partition of membership items, one per product deployment
+class ViewsDalHandler(ABC, metaclass=_SingletonMeta):
+    @abstractmethod
+    def upsert_view_item(self, view_id: str, item_id: str, entry: ProductEntry, sequence_number: str) -> bool: ...  # pragma: no cover
+
+    @abstractmethod
+    def delete_view_item(self, view_id: str, item_id: str, sequence_number: str, changed_at: int) -> bool: ...  # pragma: no cover
+
+    @abstractmethod
+    def list_view_items(self, view_id: str) -> list[ProductEntry]: ...  # pragma: no cover
@@ -0,0 +1,34 @@
+from typing import Any, Dict
+
+from aws_lambda_env_modeler import init_environment_variables
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from pydantic import ValidationError
+
+from catalog_backend.handlers.models.env_vars import Observability
+from catalog_backend.handlers.utils.observability import logger, metrics, tracer
+from catalog_backend.logic.dlq_redrive import redrive_dlq
+from catalog_backend.models.input import RedriveRequestModel
+
+
+@init_environment_variables(model=Observability)
+@logger.inject_lambda_context()
+@metrics.log_metrics
+@tracer.capture_lambda_handler(capture_response=False)
+def handle_dlq_redrive(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """
+    Operator invoked, replays failed custom resource requests from a lane DLQ back to its source queue.
+    Requests whose CloudFormation ResponseURL already expired are dropped, nobody is waiting for their response anymore.
+    """
+    logger.info('processing dlq redrive request', event=event)
+    try:
+        request = RedriveRequestModel.model_validate(event)
+    except ValidationError:
+        logger.exception('invalid dlq redrive request')
+        raise
+
+    report = redrive_dlq(request=request, remaining_time_ms=context.get_remaining_time_in_millis)
+    metrics.add_metric(name='RedrivenMessages', unit=MetricUnit.Count, value=report.replayed)
+    metrics.add_metric(name='RedriveExpiredMessages', unit=MetricUnit.Count, value=report.expired)
+    metrics.add_metric(name='RedriveFailedMessages', unit=MetricUnit.Count, value=report.failed)
+    return report.model_dump()
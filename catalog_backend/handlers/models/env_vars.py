@@ -1,4 +1,4 @@
-from typing import Annotated, Literal
+from typing import Annotated, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -14,3 +14,22 @@ class VisibilityEnvVars(Observability):
     PORTFOLIO_ID: Annotated[str, Field(min_length=1)]
     SERVICE_ROLE_NAME: Annotated[str, Field(min_length=1)]
     SERVICE_ROLE_ARN: Annotated[str, Field(min_length=1)]
+    TABLE_SHARD_COUNT: Annotated[int, Field(ge=1, le=100)] = 1  # write shards per portfolio partition, 1 keeps the unsharded key layout
+    TABLE_COMPACT_ITEMS: bool = False  # write product entries with the compact item codec, both layouts are always readable
+    TABLE_LOW_LEVEL_CLIENT: bool = False  # access the table with the low-level client DAL instead of the Table resource
+    TABLE_HISTORY_RETENTION_DAYS: Annotated[int, Field(ge=0)] = 0  # keep an event item per lifecycle transition, 0 disables the history
+    TABLE_AGGREGATES_ENABLED: bool = False  # maintain live deployment counters transactionally with every product write
+    CAPTURE_SINK: Optional[str] = None  # 'log' or a JSONL file path, enables capturing sanitized SQS events for replay
+    CAPTURE_SALT: str = ''  # keys the pseudonyms of scrubbed ARNs and account ids
+    PROFILER_SAMPLE_RATE: Annotated[float, Field(ge=0, le=1)] = 0  # fraction of invocations to profile, 0 disables the profiler
+    PROFILER_TOP_N: Annotated[int, Field(ge=1)] = 25  # functions listed in the logged profile summary
+    PROFILER_DUMP_DIR: Optional[str] = None  # e.g. '/tmp', saves the full cProfile output per sampled invocation
+    API_CALLS_SAMPLE_RATE: Annotated[float, Field(ge=0, le=1)] = 0  # fraction of invocations emitting per-operation call metrics, 0 disables them
+    MEMORY_TRACKING_ENABLED: bool = False  # logs the tracemalloc peak and allocation hotspots of every invocation
+    MEMORY_TOP_N: Annotated[int, Field(ge=1)] = 10  # allocation sites listed in the logged memory summary
+    TRUST_POLICY_QUOTA: Annotated[int, Field(gt=0)] = 2048  # the account's role trust policy length quota, headroom is reported against it
+    PREWARM_ON_INIT: bool = False  # builds the event models and opens the clients during the init phase, see handlers.utils.init_phase
+
+
+class ViewsEnvVars(Observability):
+    VIEWS_TABLE_NAME: Annotated[str, Field(min_length=1)]
@@ -6,20 +6,30 @@ from aws_lambda_env_modeler import get_environment_variables, init_environment_v
 from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.utilities.parser.models import SqsModel
 from aws_lambda_powertools.utilities.typing import LambdaContext
-from crhelper import CfnResource
 
 from catalog_backend.handlers.models.env_vars import VisibilityEnvVars
+from catalog_backend.handlers.utils.api_calls import AccountedCfnResource, report_api_calls
+from catalog_backend.handlers.utils.capture import capture_events
+from catalog_backend.handlers.utils.init_phase import initialize
+from catalog_backend.handlers.utils.latency import record_end_to_end_latency
+from catalog_backend.handlers.utils.memory import track_memory
 from catalog_backend.handlers.utils.observability import logger, metrics, tracer
+from catalog_backend.handlers.utils.profiler import profile_invocations
 from catalog_backend.logic.product_lifecycle import delete_product, provision_product, update_product
 from catalog_backend.models.input import ProductCreateEventModel, ProductDeleteEventModel, ProductUpdateEventModel
 
-CFN_RESOURCE = CfnResource(json_logging=False, log_level='INFO', boto_level='CRITICAL', sleep_on_delete=0)
+CFN_RESOURCE = AccountedCfnResource(json_logging=False, log_level='INFO', boto_level='CRITICAL', sleep_on_delete=0)
+initialize()  # with PREWARM_ON_INIT set, the first invocation's one time work runs here, during the init phase or before a SnapStart snapshot
 
 
 @init_environment_variables(model=VisibilityEnvVars)
 @logger.inject_lambda_context()
 @metrics.log_metrics
 @tracer.capture_lambda_handler(capture_response=False)
+@capture_events
+@profile_invocations
+@track_memory
+@report_api_calls
 def handle_product_event(event: Dict[str, Any], context: LambdaContext) -> None:
     logger.info('processing product SQS event', event=event)
     try:
@@ -29,6 +39,8 @@ def handle_product_event(event: Dict[str, Any], context: LambdaContext) -> None:
             record_body = json.loads(record.body)  # type: ignore
             logger.info('processing product SQS body', record_body=record_body)
             CFN_RESOURCE(record_body, context)
+            # crhelper has sent the custom resource response, successful or failed, by the time it returns
+            record_end_to_end_latency(record, record_body.get('RequestType', 'Unknown'))
     except Exception as ex:
         logger.exception('failed to process product SQS event')
         CFN_RESOURCE.init_failure(ex)
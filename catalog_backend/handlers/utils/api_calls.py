@@ -0,0 +1,139 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator
+
+from aws_lambda_env_modeler import get_environment_variables
+from aws_lambda_powertools.metrics import EphemeralMetrics, MetricUnit
+from crhelper import CfnResource
+from crhelper.utils import _send_response
+
+from catalog_backend.handlers.models.env_vars import VisibilityEnvVars
+from catalog_backend.handlers.utils.observability import logger, metrics
+
+CFN_RESPONSE_OPERATION = 'CloudFormation.ResponseURL'
+_STARTED_AT = 'api_call_started_at'
+_OPERATION = 'api_call_operation'
+
+
+class ApiCallLedger:
+    """Counts the AWS calls made while it's active: calls, retry attempts, errors and latency per operation, e.g. 'IAM.GetRole'."""
+
+    def __init__(self) -> None:
+        self.operations: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()  # the DAL's scatter-gather reads call DynamoDB from a thread pool
+
+    def record(self, operation: str, latency_ms: float, attempts: int = 1, error: str = '') -> None:
+        with self._lock:
+            totals = self.operations.setdefault(operation, {'calls': 0, 'attempts': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            totals['calls'] += 1
+            totals['attempts'] += attempts
+            totals['errors'] += 1 if error else 0
+            totals['total_ms'] = round(totals['total_ms'] + latency_ms, 3)
+            totals['max_ms'] = max(totals['max_ms'], round(latency_ms, 3))
+
+    def calls(self, operation: str) -> int:
+        return self.operations.get(operation, {}).get('calls', 0)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(totals['calls'] for totals in self.operations.values())
+
+    def counts(self) -> dict[str, int]:
+        return {operation: totals['calls'] for operation, totals in sorted(self.operations.items())}
+
+
+# every active ledger records every call, so a test can track calls around a handler that tracks its own invocation
+_active_ledgers: list[ApiCallLedger] = []
+
+
+def _record(operation: str, latency_ms: float, attempts: int = 1, error: str = '') -> None:
+    for ledger in list(_active_ledgers):
+        ledger.record(operation, latency_ms, attempts, error)
+
+
+@contextmanager
+def track_api_calls() -> Iterator[ApiCallLedger]:
+    ledger = ApiCallLedger()
+    _active_ledgers.append(ledger)
+    try:
+        yield ledger
+    finally:
+        _active_ledgers.remove(ledger)
+
+
+def _before_call(model: Any, context: dict, **kwargs: Any) -> None:
+    context[_OPERATION] = f'{model.service_model.service_id}.{model.name}'
+    context[_STARTED_AT] = time.perf_counter()
+
+
+def _after_call(parsed: dict, context: dict, **kwargs: Any) -> None:
+    if _STARTED_AT in context:
+        # botocore's retries happen inside a single call, its response metadata counts them
+        attempts = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0) + 1
+        _record(context[_OPERATION], (time.perf_counter() - context.pop(_STARTED_AT)) * 1000, attempts, parsed.get('Error', {}).get('Code', ''))
+
+
+def _after_call_error(exception: Exception, context: dict, **kwargs: Any) -> None:
+    # connection and timeout errors never reach after-call
+    if _STARTED_AT in context:
+        _record(context[_OPERATION], (time.perf_counter() - context.pop(_STARTED_AT)) * 1000, error=type(exception).__name__)
+
+
+def account_api_calls(client: Any) -> Any:
+    """Registers the call accounting hooks on a boto3 client's events, clients copy their session's hooks when created."""
+    client.meta.events.register('before-call', _before_call, unique_id='api-call-accounting-before')
+    client.meta.events.register('after-call', _after_call, unique_id='api-call-accounting-after')
+    client.meta.events.register('after-call-error', _after_call_error, unique_id='api-call-accounting-error')
+    return client
+
+
+class AccountedCfnResource(CfnResource):
+    """crhelper's CfnResource, its custom resource responses to the ResponseURL are accounted like the boto3 calls."""
+
+    def _send(self, status=None, reason='', send_response=_send_response):  # type: ignore[no-untyped-def]
+        def accounted_send_response(*args: Any, **kwargs: Any) -> None:
+            started_at = time.perf_counter()
+            try:
+                send_response(*args, **kwargs)
+            finally:
+                _record(CFN_RESPONSE_OPERATION, (time.perf_counter() - started_at) * 1000)
+
+        super()._send(status, reason, send_response=accounted_send_response)
+
+
+def _report_api_calls(ledger: ApiCallLedger, sample_rate: float) -> None:
+    logger.info('invocation api calls', api_calls=ledger.operations, api_calls_total=ledger.total_calls)
+    metrics.add_metric(name='ApiCalls', unit=MetricUnit.Count, value=ledger.total_calls)
+    if not ledger.operations or not sample_rate or random.random() >= sample_rate:
+        return
+    # one blob for the breakdown, the handler's metrics keep their dimensions. A blob's dimension sets all share its metric values,
+    # so the operation is part of the metric name, e.g. 'IAM.GetRole.Calls'
+    operation_metrics = EphemeralMetrics(namespace=metrics.namespace, service=metrics.service)
+    for operation, totals in sorted(ledger.operations.items()):
+        operation_metrics.add_metric(name=f'{operation}.Calls', unit=MetricUnit.Count, value=totals['calls'])
+        operation_metrics.add_metric(name=f'{operation}.Latency', unit=MetricUnit.Milliseconds, value=totals['total_ms'])
+    operation_metrics.flush_metrics()
+
+
+def report_api_calls(handler: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Logs the AWS calls of every invocation per operation, the CloudFormation response included, and emits their total.
+    The per-operation metrics are emitted for an API_CALLS_SAMPLE_RATE fraction of invocations.
+    """
+
+    @wraps(handler)
+    def wrapper(event: Dict[str, Any], context: Any) -> Any:
+        with track_api_calls() as ledger:
+            try:
+                return handler(event, context)
+            finally:
+                try:
+                    _report_api_calls(ledger, get_environment_variables(model=VisibilityEnvVars).API_CALLS_SAMPLE_RATE)
+                except Exception:
+                    # call accounting must never fail the actual processing
+                    logger.exception('failed to report invocation api calls')
+
+    return wrapper
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict
+
+from aws_lambda_env_modeler import get_environment_variables
+
+from catalog_backend.handlers.models.env_vars import VisibilityEnvVars
+from catalog_backend.handlers.utils.observability import logger
+
+CAPTURE_LOG_SINK = 'log'  # captured events are written as structured log records instead of a file
+SCRUBBED_RESPONSE_URL = 'https://response-url.invalid/'
+
+_ARN_PATTERN = re.compile(r'arn:(aws[\w-]*):([\w-]+):([\w-]*):(\d{12})?:([^\s"\',]+)')
+_ACCOUNT_ID_PATTERN = re.compile(r'\b\d{12}\b')
+_DROPPED_RECORD_KEYS = ('md5OfMessageAttributes',)
+_file_lock = threading.Lock()
+
+
+def _pseudonym(value: str, salt: str) -> str:
+    return hashlib.sha256(f'{salt}{value}'.encode()).hexdigest()[:12]
+
+
+def _pseudo_account_id(account_id: str, salt: str) -> str:
+    return str(int(_pseudonym(account_id, salt), 16) % 10**12).zfill(12)
+
+
+def _scrub_arn(match: re.Match, salt: str) -> str:
+    partition, service, region, account_id, resource = match.groups()
+    # keep the resource type and the number of path segments, replay and the DAL rely on the ARN structure
+    resource_type, separator, path = resource.partition('/')
+    if separator:
+        resource = f'{resource_type}/' + '/'.join(_pseudonym(segment, salt) for segment in path.split('/'))
+    else:
+        resource = _pseudonym(resource, salt)
+    return f'arn:{partition}:{service}:{region}:{account_id or ""}:{resource}'
+
+
+def scrub_text(value: str, salt: str) -> str:
+    # account ids go first so an account maps to the same pseudonym inside and outside of ARNs
+    value = _ACCOUNT_ID_PATTERN.sub(lambda match: _pseudo_account_id(match.group(), salt), value)
+    return _ARN_PATTERN.sub(lambda match: _scrub_arn(match, salt), value)
+
+
+def _scrub(value: Any, salt: str) -> Any:
+    if isinstance(value, str):
+        return scrub_text(value, salt)
+    if isinstance(value, dict):
+        return {key: _scrub(item, salt) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_scrub(item, salt) for item in value]
+    return value
+
+
+def _sanitize_body(body: str, salt: str) -> str:
+    try:
+        request = json.loads(body)
+    except ValueError:
+        return scrub_text(body, salt)  # keep malformed traffic, it is part of the load too
+    if isinstance(request, dict) and request.get('ResponseURL'):
+        request['ResponseURL'] = f'{SCRUBBED_RESPONSE_URL}{_pseudonym(request["ResponseURL"], salt)}'
+    return json.dumps(_scrub(request, salt))
+
+
+def sanitize_sqs_event(event: Dict[str, Any], salt: str) -> Dict[str, Any]:
+    records = []
+    for record in event.get('Records', []):
+        record = {key: value for key, value in record.items() if key not in _DROPPED_RECORD_KEYS}
+        body = record.pop('body', '')
+        record = _scrub(record, salt)
+        if 'SenderId' in record.get('attributes', {}):
+            record['attributes']['SenderId'] = _pseudonym(record['attributes']['SenderId'], salt)
+        # the SQS envelope requires a receipt handle and body digest, keep both valid for the replayed body
+        record['receiptHandle'] = _pseudonym(record.get('receiptHandle', ''), salt)
+        record['body'] = _sanitize_body(body, salt)
+        record['md5OfBody'] = hashlib.md5(record['body'].encode(), usedforsecurity=False).hexdigest()
+        records.append(record)
+    return {'Records': records}
+
+
+def _write_capture(sink: str, captured: Dict[str, Any]) -> None:
+    if sink == CAPTURE_LOG_SINK:
+        logger.info('captured product event', captured_event=captured)
+        return
+    with _file_lock, open(sink, 'a', encoding='utf-8') as sink_file:
+        sink_file.write(json.dumps(captured) + '\n')
+
+
+def capture_events(handler: Callable[..., Any]) -> Callable[..., Any]:
+    """Opt-in, writes a sanitized copy of every SQS event to the CAPTURE_SINK JSONL sink before it is processed."""
+
+    @wraps(handler)
+    def wrapper(event: Dict[str, Any], context: Any) -> Any:
+        env_vars = get_environment_variables(model=VisibilityEnvVars)
+        if env_vars.CAPTURE_SINK:
+            try:
+                captured = {'captured_at_ms': int(time.time() * 1000), 'event': sanitize_sqs_event(event, env_vars.CAPTURE_SALT)}
+                _write_capture(env_vars.CAPTURE_SINK, captured)
+            except Exception:
+                # capturing must never fail the actual processing
+                logger.exception('failed to capture product event')
+        return handler(event, context)
+
+    return wrapper
@@ -0,0 +1,96 @@
+import os
+import random
+import time
+
+from aws_lambda_env_modeler import get_environment_variables
+
+from catalog_backend.dal import get_dal_handler, reset_dal_handlers
+from catalog_backend.handlers.models.env_vars import VisibilityEnvVars
+from catalog_backend.handlers.utils.observability import logger
+from catalog_backend.logic.iam.helpers import get_iam_client
+from catalog_backend.models.input import ProductCreateEventModel, ProductDeleteEventModel, ProductUpdateEventModel
+
+# placeholder custom resource requests, validating them builds the models' validators once during the init phase
+_WARM_UP_PRODUCT = {
+    'product_name': 'warm-up',
+    'product_version': '1',
+    'account_id': '123456789012',
+    'consumer_name': 'warm-up',
+    'region': 'us-east-1',
+    'trust_role_arn': 'arn:aws:iam::123456789012:role/warm-up',
+}
+_WARM_UP_REQUEST = {
+    'ServiceToken': 'arn:aws:lambda:us-east-1:123456789012:function:warm-up',
+    'ResponseURL': 'https://cloudformation-custom-resource-response-useast1.s3.amazonaws.com/warm-up',
+    'StackId': 'arn:aws:cloudformation:us-east-1:123456789012:stack/warm-up/00000000-0000-0000-0000-000000000000',
+    'RequestId': 'warm-up',
+    'LogicalResourceId': 'WarmUp',
+    'ResourceType': 'Custom::PlatformEngGovernanceEnabler',
+    'ResourceProperties': _WARM_UP_PRODUCT,
+}
+
+
+def warm_up_models() -> None:
+    ProductCreateEventModel.model_validate({**_WARM_UP_REQUEST, 'RequestType': 'Create'})
+    ProductUpdateEventModel.model_validate(
+        {**_WARM_UP_REQUEST, 'RequestType': 'Update', 'PhysicalResourceId': 'warm-up', 'OldResourceProperties': _WARM_UP_PRODUCT}
+    )
+    ProductDeleteEventModel.model_validate({**_WARM_UP_REQUEST, 'RequestType': 'Delete', 'PhysicalResourceId': 'warm-up'})
+
+
+def warm_up_clients(env_vars: VisibilityEnvVars) -> None:
+    """Creates the DynamoDB and IAM clients, resolves their endpoints and loads credentials, without calling either service."""
+    get_dal_handler(
+        env_vars.TABLE_NAME,
+        env_vars.TABLE_SHARD_COUNT,
+        env_vars.TABLE_COMPACT_ITEMS,
+        env_vars.TABLE_LOW_LEVEL_CLIENT,
+        env_vars.TABLE_HISTORY_RETENTION_DAYS,
+        env_vars.TABLE_AGGREGATES_ENABLED,
+    ).warm_up()
+    get_iam_client().generate_presigned_url('get_role', Params={'RoleName': env_vars.SERVICE_ROLE_NAME})
+
+
+def warm_up() -> bool:
+    """
+    Does the first invocation's one time work eagerly: parses the environment variables, builds the event models' validators and opens the clients.
+    Never fails the init phase, the first invocation repeats whatever didn't warm up.
+    """
+    if os.environ.get('PREWARM_ON_INIT', '').lower() != 'true':
+        return False
+    start = time.perf_counter()
+    try:
+        warm_up_models()
+        warm_up_clients(get_environment_variables(model=VisibilityEnvVars))
+    except Exception:
+        logger.exception('init phase warm up failed')
+        return False
+    logger.info('init phase warm up done', warm_up_ms=round((time.perf_counter() - start) * 1000, 3))
+    return True
+
+
+def refresh_after_restore() -> None:
+    """
+    Runs in every execution environment restored from a SnapStart snapshot, which all start with the same memory.
+    Clients are reopened so they pick up the environment's credentials instead of the snapshot's, and the random module is reseeded
+    from os.urandom so restored environments don't sample the same sequence. External ids are drawn from uuid4, which reads os.urandom.
+    """
+    random.seed()
+    reset_dal_handlers()
+    get_iam_client.cache_clear()
+    warm_up()
+
+
+def register_snapstart_hooks() -> bool:
+    try:
+        from snapshot_restore_py import register_after_restore  # provided by the Lambda Python runtime
+    except ImportError:
+        return False
+    register_after_restore(refresh_after_restore)
+    return True
+
+
+def initialize() -> None:
+    """The governance function's init phase, see warm_up and refresh_after_restore."""
+    register_snapstart_hooks()
+    warm_up()
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from aws_lambda_powertools.metrics import MetricResolution, MetricUnit, single_metric
+from aws_lambda_powertools.utilities.parser.models import SqsRecordModel
+
+from catalog_backend.handlers.utils.observability import logger, metrics
+
+END_TO_END_LATENCY_METRIC = 'EndToEndLatency'
+QUEUE_LATENCY_METRIC = 'QueueLatency'
+REQUEST_TYPE_DIMENSION = 'RequestType'
+
+
+def _emit(name: str, value_ms: float, request_type: str) -> None:
+    # a dimension per request type only applies to its own metric, the handler's metrics keep their dimensions
+    with single_metric(
+        name=name,
+        unit=MetricUnit.Milliseconds,
+        value=value_ms,
+        resolution=MetricResolution.High,
+        namespace=metrics.namespace,
+        default_dimensions={'service': metrics.service} if metrics.service else None,
+    ) as metric:
+        metric.add_dimension(name=REQUEST_TYPE_DIMENSION, value=request_type)
+
+
+def record_end_to_end_latency(record: SqsRecordModel, request_type: str, responded_at: Optional[datetime] = None) -> float:
+    """
+    Emits the time from the request reaching the queue until its CloudFormation response was sent, the wait stack owners feel, retries included.
+    The time the request spent in SNS before reaching the queue isn't covered. Returns the end-to-end latency in milliseconds.
+    """
+    responded_at = responded_at or datetime.now(timezone.utc)
+    sent_at = record.attributes.SentTimestamp
+    end_to_end_ms = round((responded_at - sent_at).total_seconds() * 1000, 3)
+    queue_ms = round((record.attributes.ApproximateFirstReceiveTimestamp - sent_at).total_seconds() * 1000, 3)
+    _emit(END_TO_END_LATENCY_METRIC, end_to_end_ms, request_type)
+    _emit(QUEUE_LATENCY_METRIC, queue_ms, request_type)
+    logger.info('custom resource responded', end_to_end_latency_ms=end_to_end_ms, queue_latency_ms=queue_ms, request_type=request_type)
+    return end_to_end_ms
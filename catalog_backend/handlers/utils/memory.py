@@ -0,0 +1,54 @@
+import resource
+import tracemalloc
+from functools import wraps
+from typing import Any, Callable, Dict
+
+from aws_lambda_env_modeler import get_environment_variables
+
+from catalog_backend.handlers.models.env_vars import VisibilityEnvVars
+from catalog_backend.handlers.utils.observability import logger
+
+# tracemalloc's own bookkeeping allocations would otherwise top every report
+_SNAPSHOT_FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, '<frozen importlib._bootstrap*>')]
+
+
+def _allocation_hotspots(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, top_n: int) -> list[Dict[str, Any]]:
+    differences = after.filter_traces(_SNAPSHOT_FILTERS).compare_to(before.filter_traces(_SNAPSHOT_FILTERS), 'lineno')
+    return [
+        {'location': str(difference.traceback[0]), 'size_diff_kb': round(difference.size_diff / 1024, 1), 'count_diff': difference.count_diff}
+        for difference in differences[:top_n]
+    ]
+
+
+def track_memory(handler: Callable[..., Any]) -> Callable[..., Any]:
+    """Logs the tracemalloc peak and the top growing allocation sites of every invocation while MEMORY_TRACKING_ENABLED is set."""
+
+    @wraps(handler)
+    def wrapper(event: Dict[str, Any], context: Any) -> Any:
+        env_vars = get_environment_variables(model=VisibilityEnvVars)
+        if not env_vars.MEMORY_TRACKING_ENABLED:
+            return handler(event, context)
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()  # allocations made before the first tracked invocation, e.g. at init, are not traced
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        try:
+            return handler(event, context)
+        finally:
+            try:
+                current, peak = tracemalloc.get_traced_memory()
+                logger.info(
+                    'invocation memory',
+                    memory_peak_kb=round(peak / 1024, 1),
+                    memory_current_kb=round(current / 1024, 1),
+                    # ru_maxrss is in KB on Linux, the execution environment high-water mark to compare against the memory setting
+                    memory_max_rss_mb=round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                    memory_limit_mb=int(context.memory_limit_in_mb),
+                    allocation_hotspots=_allocation_hotspots(before, tracemalloc.take_snapshot(), env_vars.MEMORY_TOP_N),
+                )
+            except Exception:
+                # memory tracking must never fail the actual processing
+                logger.exception('failed to report invocation memory')
+
+    return wrapper
@@ -0,0 +1,62 @@
+import cProfile
+import os
+import pstats
+import random
+from functools import wraps
+from typing import Any, Callable, Dict
+
+from aws_lambda_env_modeler import get_environment_variables
+
+from catalog_backend.handlers.models.env_vars import VisibilityEnvVars
+from catalog_backend.handlers.utils.observability import logger
+
+
+def _top_functions(stats: pstats.Stats, top_n: int) -> list[Dict[str, Any]]:
+    # stats.stats maps (file, line, function) to (primitive calls, total calls, own time, cumulative time, callers)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top_n]  # type: ignore[attr-defined]
+    return [
+        {
+            'function': f'{os.path.basename(file_name)}:{line}({function})',
+            'calls': total_calls,
+            'own_ms': round(own_time * 1000, 3),
+            'cumulative_ms': round(cumulative_time * 1000, 3),
+        }
+        for (file_name, line, function), (_, total_calls, own_time, cumulative_time, _) in rows
+    ]
+
+
+def _report_profile(profiler: cProfile.Profile, env_vars: VisibilityEnvVars, context: Any) -> None:
+    stats = pstats.Stats(profiler)
+    dump_path = None
+    if env_vars.PROFILER_DUMP_DIR:
+        # the full profile can be loaded with pstats or snakeviz while the execution environment is still warm
+        dump_path = os.path.join(env_vars.PROFILER_DUMP_DIR, f'{context.aws_request_id}.prof')
+        stats.dump_stats(dump_path)
+    logger.info(
+        'invocation profile',
+        profile_total_ms=round(stats.total_tt * 1000, 3),  # type: ignore[attr-defined]
+        profile_top=_top_functions(stats, env_vars.PROFILER_TOP_N),
+        profile_dump_path=dump_path,
+    )
+
+
+def profile_invocations(handler: Callable[..., Any]) -> Callable[..., Any]:
+    """Profiles a PROFILER_SAMPLE_RATE fraction of invocations with cProfile, unsampled invocations call the handler directly."""
+
+    @wraps(handler)
+    def wrapper(event: Dict[str, Any], context: Any) -> Any:
+        env_vars = get_environment_variables(model=VisibilityEnvVars)
+        if not env_vars.PROFILER_SAMPLE_RATE or random.random() >= env_vars.PROFILER_SAMPLE_RATE:
+            return handler(event, context)
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(handler, event, context)
+        finally:
+            try:
+                _report_profile(profiler, env_vars, context)
+            except Exception:
+                # profiling must never fail the actual processing
+                logger.exception('failed to report invocation profile')
+
+    return wrapper
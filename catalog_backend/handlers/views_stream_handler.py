@@ -0,0 +1,40 @@
+from typing import Any, Dict
+
+from aws_lambda_env_modeler import get_environment_variables, init_environment_variables
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.utilities.batch import BatchProcessor, EventType, process_partial_response
+from aws_lambda_powertools.utilities.data_classes.dynamo_db_stream_event import DynamoDBRecord
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+from catalog_backend.handlers.models.env_vars import ViewsEnvVars
+from catalog_backend.handlers.utils.observability import logger, metrics, tracer
+from catalog_backend.logic.views import apply_table_change
+
+processor = BatchProcessor(event_type=EventType.DynamoDBStreams)
+
+
+def record_handler(record: DynamoDBRecord) -> None:
+    env_vars: ViewsEnvVars = get_environment_variables(model=ViewsEnvVars)
+    stream_record = record.dynamodb
+    changed = apply_table_change(
+        views_table_name=env_vars.VIEWS_TABLE_NAME,
+        sequence_number=stream_record.sequence_number,  # type: ignore[union-attr, arg-type]
+        changed_at=stream_record.approximate_creation_date_time,  # type: ignore[union-attr, arg-type]
+        old_image=stream_record.old_image,  # type: ignore[union-attr]
+        new_image=stream_record.new_image,  # type: ignore[union-attr]
+    )
+    metrics.add_metric(name='ViewItemsChanged', unit=MetricUnit.Count, value=changed)
+
+
+@init_environment_variables(model=ViewsEnvVars)
+@logger.inject_lambda_context()
+@metrics.log_metrics
+@tracer.capture_lambda_handler(capture_response=False)
+def handle_table_stream(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """
+    Keeps the materialised views in sync with the governance table stream.
+    Failed records are reported back, the event source checkpoints before the first of them and bisects the batch on retry.
+    Records can be delivered again, view items only apply a record later than the one they hold, so replays are idempotent.
+    """
+    logger.info('processing governance table stream batch', records=len(event.get('Records', [])))
+    return process_partial_response(event=event, record_handler=record_handler, processor=processor, context=context)
@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlparse
+
+import boto3
+
+from catalog_backend.handlers.utils.observability import logger, tracer
+from catalog_backend.logic.rate_limiter import TokenBucket
+from catalog_backend.models.input import RedriveRequestModel
+from catalog_backend.models.output import RedriveReportModel
+
+# stop pulling new batches when the invocation has less than this time left
+_DEADLINE_MARGIN_MS = 10_000
+
+
+class _MessageBudget:
+    """Shared across workers, caps the total number of messages a single redrive run handles."""
+
+    def __init__(self, max_messages: int) -> None:
+        self._left = max_messages
+        self._lock = threading.Lock()
+
+    def reserve(self, count: int) -> int:
+        with self._lock:
+            reserved = min(count, self._left)
+            self._left -= reserved
+            return reserved
+
+    def release(self, count: int) -> None:
+        # a receive can return fewer messages than were reserved for it, the difference goes back to the other workers
+        with self._lock:
+            self._left += count
+
+
+def get_response_url_expiry(response_url: str) -> Optional[datetime]:
+    # CloudFormation ResponseURLs are S3 pre-signed URLs, SigV4 URLs carry the signing time and lifetime, SigV2 URLs an absolute epoch
+    query = parse_qs(urlparse(response_url).query)
+    try:
+        if 'X-Amz-Date' in query:
+            signed_at = datetime.strptime(query['X-Amz-Date'][0], '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc)
+            return signed_at + timedelta(seconds=int(query['X-Amz-Expires'][0]))
+        return datetime.fromtimestamp(int(query['Expires'][0]), tz=timezone.utc)
+    except (KeyError, ValueError, IndexError):
+        return None
+
+
+def is_response_url_expired(message_body: str, now: datetime, margin_seconds: int) -> bool:
+    response_url = json.loads(message_body).get('ResponseURL', '')
+    expiry = get_response_url_expiry(response_url)
+    # an unknown expiry is replayed, CloudFormation ignores responses it no longer waits for
+    return expiry is not None and expiry <= now + timedelta(seconds=margin_seconds)
+
+
+def _split_expired(messages: list[dict], margin_seconds: int) -> tuple[list[dict], list[dict], list[dict]]:
+    now = datetime.now(timezone.utc)
+    valid, expired, invalid = [], [], []
+    for message in messages:
+        try:
+            (expired if is_response_url_expired(message['Body'], now, margin_seconds) else valid).append(message)
+        except (ValueError, AttributeError):
+            logger.warning('dlq message is not a custom resource request, leaving it in the dlq', message_id=message['MessageId'])
+            invalid.append(message)
+    return valid, expired, invalid
+
+
+def _delete_messages(sqs_client, dlq_url: str, messages: list[dict]) -> None:
+    if messages:
+        entries = [{'Id': str(index), 'ReceiptHandle': message['ReceiptHandle']} for index, message in enumerate(messages)]
+        sqs_client.delete_message_batch(QueueUrl=dlq_url, Entries=entries)
+
+
+def _replay_batch(sqs_client, request: RedriveRequestModel, bucket: TokenBucket, messages: list[dict]) -> Counter:
+    valid, expired, invalid = _split_expired(messages, request.expiry_margin_seconds)
+    sent: list[dict] = []
+    if valid:
+        bucket.acquire(len(valid))
+        entries = [{'Id': str(index), 'MessageBody': message['Body']} for index, message in enumerate(valid)]
+        response = sqs_client.send_message_batch(QueueUrl=request.target_queue_url, Entries=entries)
+        sent = [valid[int(entry['Id'])] for entry in response.get('Successful', [])]
+    # failed sends stay in the dlq and become visible again once their visibility timeout ends
+    _delete_messages(sqs_client, request.dlq_url, sent + expired)
+    return Counter(replayed=len(sent), expired=len(expired), failed=len(valid) - len(sent) + len(invalid))
+
+
+def _drain(sqs_client, request: RedriveRequestModel, bucket: TokenBucket, budget: _MessageBudget, remaining_time_ms: Callable[[], int]) -> Counter:
+    outcomes: Counter = Counter()
+    while remaining_time_ms() > _DEADLINE_MARGIN_MS:
+        batch_size = budget.reserve(request.batch_size)
+        if not batch_size:
+            break
+        response = sqs_client.receive_message(QueueUrl=request.dlq_url, MaxNumberOfMessages=batch_size, WaitTimeSeconds=1)
+        messages = response.get('Messages', [])
+        budget.release(batch_size - len(messages))
+        if not messages:
+            break  # dlq is drained
+        outcomes.update(_replay_batch(sqs_client, request, bucket, messages))
+    return outcomes
+
+
+@tracer.capture_method(capture_response=False)
+def redrive_dlq(request: RedriveRequestModel, remaining_time_ms: Callable[[], int]) -> RedriveReportModel:
+    logger.info('starting dlq redrive', dlq_url=request.dlq_url, target_queue_url=request.target_queue_url)
+    sqs_client = boto3.client('sqs')
+    # burst is capped to a single batch so a fresh bucket can't release all workers at once
+    bucket = TokenBucket(rate=request.rate_per_second, capacity=request.batch_size)
+    budget = _MessageBudget(request.max_messages)
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=request.max_workers) as executor:
+        futures = [executor.submit(_drain, sqs_client, request, bucket, budget, remaining_time_ms) for _ in range(request.max_workers)]
+        outcomes = sum((future.result() for future in futures), Counter())
+    report = RedriveReportModel(elapsed_seconds=round(time.monotonic() - start, 3), **outcomes)
+    logger.info('finished dlq redrive', report=report.model_dump())
+    return report
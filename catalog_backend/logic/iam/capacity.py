@@ -0,0 +1,75 @@
+"""
+Trust policy capacity of the service role: every consumer adds a statement, IAM rejects the update once the policy outgrows its quota.
+
+Capacity planner, forecasts the trust policy after onboarding more consumers:
+    python -m catalog_backend.logic.iam.capacity <service role name> --consumers 50 [--quota 2048]
+"""
+
+import argparse
+import json
+
+from aws_lambda_powertools.metrics import MetricUnit
+
+from catalog_backend.handlers.utils.observability import logger, metrics
+from catalog_backend.logic.iam.helpers import create_statement_and_external_id, get_iam_client, get_trust_policy
+from catalog_backend.models.output import CapacityForecastModel, TrustPolicyCapacityModel
+
+# the default 'Role trust policy length' quota, it can be raised up to 4096 characters through Service Quotas
+DEFAULT_TRUST_POLICY_QUOTA = 2048
+# a consumer role ARN of a typical length, the statements the planner adds are sized after it
+_PLANNED_ROLE_ARN = 'arn:aws:iam::123456789012:role/SC-123456789012-pp-consumer-role-name'
+
+
+def policy_size(policy_document: dict) -> int:
+    # IAM counts the policy without whitespace
+    return len(json.dumps(policy_document, separators=(',', ':')))
+
+
+def measure_trust_policy(policy_document: dict, quota: int = DEFAULT_TRUST_POLICY_QUOTA) -> TrustPolicyCapacityModel:
+    return TrustPolicyCapacityModel(statements=len(policy_document.get('Statement', [])), size_bytes=policy_size(policy_document), quota_bytes=quota)
+
+
+def record_trust_policy_capacity(policy_document: dict, quota: int = DEFAULT_TRUST_POLICY_QUOTA) -> TrustPolicyCapacityModel:
+    """Logs and emits the statement count, size and headroom of a trust policy, called after every trust policy mutation."""
+    capacity = measure_trust_policy(policy_document, quota)
+    logger.info('trust policy capacity', trust_policy_capacity=capacity.model_dump())
+    metrics.add_metric(name='TrustPolicyStatements', unit=MetricUnit.Count, value=capacity.statements)
+    metrics.add_metric(name='TrustPolicySize', unit=MetricUnit.Bytes, value=capacity.size_bytes)
+    metrics.add_metric(name='TrustPolicyHeadroom', unit=MetricUnit.Percent, value=capacity.headroom_percent)
+    return capacity
+
+
+def forecast_capacity(
+    policy_document: dict, consumers: int, quota: int = DEFAULT_TRUST_POLICY_QUOTA, role_arn: str = _PLANNED_ROLE_ARN
+) -> CapacityForecastModel:
+    """Simulates 'consumers' more consumer statements against a trust policy, the document itself isn't changed."""
+    # serialized statements are joined by a comma
+    statement_bytes = policy_size(create_statement_and_external_id(role_arn)[0]) + 1
+    simulated_document = {
+        **policy_document,
+        'Statement': [*policy_document.get('Statement', []), *(create_statement_and_external_id(role_arn)[0] for _ in range(consumers))],
+    }
+    current = measure_trust_policy(policy_document, quota)
+    return CapacityForecastModel(
+        current=current,
+        simulated_consumers=consumers,
+        simulated=measure_trust_policy(simulated_document, quota),
+        consumer_statement_bytes=statement_bytes,
+        consumers_remaining=max(current.headroom_bytes // statement_bytes, 0),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='forecast the service role trust policy after onboarding more consumers')
+    parser.add_argument('role_name', help='service role name, the ServiceRoleName stack output')
+    parser.add_argument('--consumers', type=int, default=10, help='consumers to simulate')
+    parser.add_argument('--quota', type=int, default=DEFAULT_TRUST_POLICY_QUOTA, help="the account's role trust policy length quota")
+    parser.add_argument('--role-arn', default=_PLANNED_ROLE_ARN, help='a typical consumer role ARN, sizes the simulated statements')
+    args = parser.parse_args()
+
+    policy_document = get_trust_policy(get_iam_client(), args.role_name)
+    print(forecast_capacity(policy_document, args.consumers, args.quota, args.role_arn).model_dump_json(indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,22 @@
 import json
+from functools import lru_cache
 from uuid import uuid4
 
 import boto3
 from botocore.exceptions import ClientError
 
+from catalog_backend.handlers.utils.api_calls import account_api_calls
 from catalog_backend.handlers.utils.observability import logger
 
 
+@lru_cache
+def get_iam_client() -> boto3.client:
+    # clients are thread safe, one per container saves the client creation and endpoint resolution on every request
+    return account_api_calls(boto3.client('iam'))
+
+
 def create_statement_and_external_id(product_role_arn: str) -> tuple[dict, str]:
+    # uuid4 reads os.urandom, so external ids stay unique across containers restored from the same SnapStart snapshot
     external_id = str(uuid4())
     # ideally, you should save external id per consumer_name
     statement = {
@@ -1,9 +1,9 @@
-import boto3
-
-from catalog_backend.handlers.utils.observability import tracer
+from catalog_backend.handlers.utils.observability import logger, tracer
+from catalog_backend.logic.iam.capacity import DEFAULT_TRUST_POLICY_QUOTA, record_trust_policy_capacity
 from catalog_backend.logic.iam.helpers import (
     clean_statements,
     create_statement_and_external_id,
+    get_iam_client,
     get_trust_policy,
     update_assume_role_policy,
 )
@@ -11,8 +11,8 @@ from catalog_backend.logic.iam.helpers import (
 
 # returns external id for the trust policy
 @tracer.capture_method(capture_response=False)
-def create_iam_trust(service_role_name: str, product_role_arn: str) -> str:
-    iam_client = boto3.client('iam')
+def create_iam_trust(service_role_name: str, product_role_arn: str, trust_policy_quota: int = DEFAULT_TRUST_POLICY_QUOTA) -> str:
+    iam_client = get_iam_client()
     current_policy_document = get_trust_policy(iam_client, service_role_name)
 
     # Check if the product_role_arn is already in the trust policy
@@ -32,13 +32,16 @@ def create_iam_trust(service_role_name: str, product_role_arn: str) -> str:
     # Update the trust policy, replace statements with new_statements
     current_policy_document['Statement'] = new_statements
     update_assume_role_policy(iam_client, service_role_name, current_policy_document)
+    record_trust_policy_capacity(current_policy_document, trust_policy_quota)
     return external_id
 
 
 # returns external id for the trust policy, updates policy if needed
 @tracer.capture_method(capture_response=False)
-def update_iam_trust(service_role_name: str, product_role_arn: str, old_product_role_arn: str) -> str:
-    iam_client = boto3.client('iam')
+def update_iam_trust(
+    service_role_name: str, product_role_arn: str, old_product_role_arn: str, trust_policy_quota: int = DEFAULT_TRUST_POLICY_QUOTA
+) -> str:
+    iam_client = get_iam_client()
     current_policy_document = get_trust_policy(iam_client, service_role_name)
 
     new_statements = clean_statements(current_policy_document.get('Statement', []), old_product_role_arn)
@@ -48,16 +51,22 @@ def update_iam_trust(service_role_name: str, product_role_arn: str, old_product_
     # replace statements with new_statements
     current_policy_document['Statement'] = new_statements
     update_assume_role_policy(iam_client, service_role_name, current_policy_document)
+    record_trust_policy_capacity(current_policy_document, trust_policy_quota)
     return external_id
 
 
 @tracer.capture_method(capture_response=False)
-def delete_iam_trust(service_role_name: str, product_role_arn: str) -> None:
-    iam_client = boto3.client('iam')
+def delete_iam_trust(service_role_name: str, product_role_arn: str, trust_policy_quota: int = DEFAULT_TRUST_POLICY_QUOTA) -> None:
+    iam_client = get_iam_client()
     current_policy_document = get_trust_policy(iam_client, service_role_name)
 
     new_statements = clean_statements(current_policy_document.get('Statement', []), product_role_arn)
+    if len(new_statements) == len(current_policy_document.get('Statement', [])):
+        # a retried or repeated delete, the trust policy is already in its desired state
+        logger.info('product role has no trust policy statement, skipping trust policy update')
+        return
 
     # replace statements with new_statements
     current_policy_document['Statement'] = new_statements
     update_assume_role_policy(iam_client, service_role_name, current_policy_document)
+    record_trust_policy_capacity(current_policy_document, trust_policy_quota)
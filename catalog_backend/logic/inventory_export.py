@@ -0,0 +1,217 @@
+"""
+Exports the current product deployments of the governance table for the compliance inventory.
+
+Usage: python -m catalog_backend.logic.inventory_export <table name> <output dir> [--format jsonl|parquet] [--segments 8]
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from mypy_boto3_dynamodb.client import DynamoDBClient
+
+from catalog_backend.dal import codec
+from catalog_backend.dal.dynamo_client_dal_handler import from_wire
+from catalog_backend.dal.models.db import ProductEntry
+from catalog_backend.dal.sharding import is_product_partition, portfolio_of
+from catalog_backend.handlers.utils.observability import logger
+from catalog_backend.models.output import ExportReportModel
+
+CHECKPOINT_FILE = 'checkpoint.json'
+FORMATS = ('jsonl', 'parquet')
+# retried with backoff once botocore's own retries are exhausted, the export resumes from its checkpoint if these fail too
+_THROTTLING_ERRORS = frozenset({'ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded', 'InternalServerError'})
+_MAX_THROTTLE_RETRIES = 8
+_BACKOFF_BASE_SECONDS = 0.1
+_BACKOFF_CAP_SECONDS = 20.0
+
+
+def _import_pyarrow() -> Any:
+    # optional dependency, only needed for parquet exports
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError('parquet export requires pyarrow, install it with: pip install pyarrow') from exc
+    return pyarrow
+
+
+def _write_jsonl(path: Path, rows: list[dict[str, Any]]) -> None:
+    with path.open('w', encoding='utf-8') as part:
+        part.writelines(json.dumps(row) + '\n' for row in rows)
+
+
+def _write_parquet(path: Path, rows: list[dict[str, Any]]) -> None:
+    pyarrow = _import_pyarrow()
+    schema = pyarrow.schema(
+        [(name, pyarrow.int64() if field.annotation is int else pyarrow.string()) for name, field in ProductEntry.model_fields.items()]
+    )
+    pyarrow.parquet.write_table(pyarrow.Table.from_pylist(rows, schema=schema), path)
+
+
+_WRITERS: dict[str, Callable[[Path, list[dict[str, Any]]], None]] = {'jsonl': _write_jsonl, 'parquet': _write_parquet}
+
+
+def to_row(item: dict[str, dict]) -> Optional[dict[str, Any]]:
+    """A scanned item as an inventory row, None for items that are not a current product deployment."""
+    values = from_wire(item)
+    partition = values['portfolio_id']
+    if not is_product_partition(partition):
+        return None
+    # sharded and compact items are exported in the same shape as any other product entry
+    return codec.decode({**values, 'portfolio_id': portfolio_of(partition)}).model_dump()
+
+
+class _Checkpoint:
+    """Progress of every segment, saved after each part file is written so an interrupted export resumes where it stopped."""
+
+    def __init__(self, path: Path, total_segments: int, output_format: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        state = json.loads(path.read_text(encoding='utf-8')) if path.exists() else None
+        if state and (state['total_segments'], state['format']) != (total_segments, output_format):
+            raise ValueError('the checkpoint was written with different segments or format, export to a new output directory')
+        self.state: dict[str, Any] = state or {'total_segments': total_segments, 'format': output_format, 'segments': {}}
+
+    def segment(self, segment: int) -> dict[str, Any]:
+        return dict(self.state['segments'].get(str(segment), {'last_key': None, 'parts': 0, 'items': 0, 'done': False}))
+
+    def save(self, segment: int, progress: dict[str, Any]) -> None:
+        with self._lock:
+            self.state['segments'][str(segment)] = progress
+            temp_path = self.path.with_suffix('.tmp')
+            temp_path.write_text(json.dumps(self.state), encoding='utf-8')
+            os.replace(temp_path, self.path)
+
+    def total_items(self) -> int:
+        return sum(progress['items'] for progress in self.state['segments'].values())
+
+
+class InventoryExporter:
+    """
+    Scans the table with 'total_segments' parallel segments, each worker streams its segment into part files of up to 'chunk_items' rows.
+    Memory stays bounded by a chunk plus one scan page per worker, whatever the table size.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        output_dir: Path,
+        output_format: str = 'jsonl',
+        total_segments: int = 8,
+        page_size: int = 1000,
+        chunk_items: int = 10_000,
+        client: Optional[DynamoDBClient] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if output_format not in FORMATS:
+            raise ValueError(f'unsupported export format {output_format}')
+        if output_format == 'parquet':
+            _import_pyarrow()  # fail before scanning
+        self.table_name = table_name
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.total_segments = total_segments
+        self.page_size = page_size
+        self.chunk_items = chunk_items
+        # adaptive retries rate limit the client side once DynamoDB starts throttling
+        self.client = client or boto3.client('dynamodb', config=Config(retries={'mode': 'adaptive', 'max_attempts': 10}))
+        self._sleep = sleep
+        self._counters = {'items': 0, 'parts': 0, 'throttled': 0}
+        self._counters_lock = threading.Lock()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint = _Checkpoint(output_dir / CHECKPOINT_FILE, total_segments, output_format)
+
+    def _count(self, **counts: int) -> None:
+        with self._counters_lock:
+            for name, count in counts.items():
+                self._counters[name] += count
+
+    def _scan_page(self, params: dict[str, Any]) -> dict[str, Any]:
+        for attempt in range(_MAX_THROTTLE_RETRIES + 1):
+            try:
+                return self.client.scan(**params)  # type: ignore[return-value]
+            except ClientError as exc:
+                if exc.response['Error']['Code'] not in _THROTTLING_ERRORS or attempt == _MAX_THROTTLE_RETRIES:
+                    raise
+                # exponential backoff with full jitter, so throttled workers don't retry in lockstep
+                delay = random.uniform(0, min(_BACKOFF_CAP_SECONDS, _BACKOFF_BASE_SECONDS * 2**attempt))
+                logger.warning('scan throttled, backing off', segment=params['Segment'], attempt=attempt, delay_seconds=delay)
+                self._count(throttled=1)
+                self._sleep(delay)
+        raise AssertionError('unreachable')  # pragma: no cover
+
+    def _write_part(self, segment: int, part: int, rows: list[dict[str, Any]]) -> None:
+        path = self.output_dir / f'segment-{segment:04d}-part-{part:05d}.{self.output_format}'
+        # a part file either exists complete or not at all, parts after the checkpoint are overwritten on resume
+        temp_path = path.with_suffix('.tmp')
+        _WRITERS[self.output_format](temp_path, rows)
+        os.replace(temp_path, path)
+
+    def export_segment(self, segment: int) -> None:
+        progress = self.checkpoint.segment(segment)
+        if progress['done']:
+            return
+        logger.info('exporting segment', segment=segment, resumed_items=progress['items'])
+        rows: list[dict[str, Any]] = []
+        last_key = progress['last_key']
+        while True:
+            params: dict[str, Any] = {'TableName': self.table_name, 'Segment': segment, 'TotalSegments': self.total_segments, 'Limit': self.page_size}
+            if last_key:
+                params['ExclusiveStartKey'] = last_key
+            response = self._scan_page(params)
+            rows.extend(row for item in response.get('Items', []) if (row := to_row(item)) is not None)
+            last_key = response.get('LastEvaluatedKey')
+            if len(rows) < self.chunk_items and last_key:
+                continue
+            if rows:
+                self._write_part(segment, progress['parts'], rows)
+                progress['parts'] += 1
+                progress['items'] += len(rows)
+                self._count(items=len(rows), parts=1)
+            progress.update(last_key=last_key, done=not last_key)
+            self.checkpoint.save(segment, progress)
+            rows = []
+            if not last_key:
+                return
+
+    def run(self) -> ExportReportModel:
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.total_segments) as executor:
+            # list() re-raises the first failed segment, the others keep their checkpointed progress
+            list(executor.map(self.export_segment, range(self.total_segments)))
+        report = ExportReportModel(
+            segments=self.total_segments,
+            total_items=self.checkpoint.total_items(),
+            elapsed_seconds=round(time.monotonic() - start, 3),
+            **self._counters,
+        )
+        logger.info('finished inventory export', report=report.model_dump())
+        return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='export the product deployments of the governance table')
+    parser.add_argument('table_name', help='governance table name, the DbOutput stack output')
+    parser.add_argument('output_dir', type=Path, help='directory of the part files and checkpoint, rerun with the same directory to resume')
+    parser.add_argument('--format', choices=FORMATS, default='jsonl', dest='output_format')
+    parser.add_argument('--segments', type=int, default=8, help='parallel scan segments and workers')
+    parser.add_argument('--page-size', type=int, default=1000, help='items per scan request')
+    parser.add_argument('--chunk-items', type=int, default=10_000, help='rows per part file')
+    args = parser.parse_args()
+
+    exporter = InventoryExporter(args.table_name, args.output_dir, args.output_format, args.segments, args.page_size, args.chunk_items)
+    print(exporter.run().model_dump_json(indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -22,11 +22,19 @@ def provision_product(
         external_id = create_iam_trust(
             service_role_name=env_vars.SERVICE_ROLE_NAME,
             product_role_arn=product_details.resource_properties.trust_role_arn,
+            trust_policy_quota=env_vars.TRUST_POLICY_QUOTA,
         )
         cfn_data = {'assume_role_arn': env_vars.SERVICE_ROLE_ARN, 'external_id': external_id}
 
     # finish creation
-    dal_handler: DalHandler = get_dal_handler(env_vars.TABLE_NAME)
+    dal_handler: DalHandler = get_dal_handler(
+        env_vars.TABLE_NAME,
+        env_vars.TABLE_SHARD_COUNT,
+        env_vars.TABLE_COMPACT_ITEMS,
+        env_vars.TABLE_LOW_LEVEL_CLIENT,
+        env_vars.TABLE_HISTORY_RETENTION_DAYS,
+        env_vars.TABLE_AGGREGATES_ENABLED,
+    )
     dal_handler.add_product_deployment(
         portfolio_id=env_vars.PORTFOLIO_ID,
         product_stack_id=product_details.stack_id,
@@ -42,13 +50,21 @@ def provision_product(
 @tracer.capture_method(capture_response=False)
 def delete_product(product_details: ProductDeleteEventModel) -> None:
     env_vars = get_environment_variables(model=VisibilityEnvVars)
-    dal_handler: DalHandler = get_dal_handler(env_vars.TABLE_NAME)
+    dal_handler: DalHandler = get_dal_handler(
+        env_vars.TABLE_NAME,
+        env_vars.TABLE_SHARD_COUNT,
+        env_vars.TABLE_COMPACT_ITEMS,
+        env_vars.TABLE_LOW_LEVEL_CLIENT,
+        env_vars.TABLE_HISTORY_RETENTION_DAYS,
+        env_vars.TABLE_AGGREGATES_ENABLED,
+    )
 
     if product_details.resource_properties.trust_role_arn:
         logger.info('trust role arn is provided, deleting trust policy', trust_role_arn=product_details.resource_properties.trust_role_arn)
         delete_iam_trust(
             service_role_name=env_vars.SERVICE_ROLE_NAME,
             product_role_arn=product_details.resource_properties.trust_role_arn,
+            trust_policy_quota=env_vars.TRUST_POLICY_QUOTA,
         )
     # finish deletion
     dal_handler.delete_product_deployment(env_vars.PORTFOLIO_ID, product_details.stack_id)
@@ -63,11 +79,19 @@ def update_product(product_details: ProductUpdateEventModel) -> Optional[dict]:
         external_id = update_iam_trust(
             service_role_name=env_vars.SERVICE_ROLE_NAME,
             product_role_arn=product_details.resource_properties.trust_role_arn,
+            trust_policy_quota=env_vars.TRUST_POLICY_QUOTA,
             old_product_role_arn=product_details.old_resource_properties.trust_role_arn,  # type: ignore
         )
         cfn_data = {'assume_role_arn': env_vars.SERVICE_ROLE_ARN, 'external_id': external_id}
 
-    dal_handler: DalHandler = get_dal_handler(env_vars.TABLE_NAME)
+    dal_handler: DalHandler = get_dal_handler(
+        env_vars.TABLE_NAME,
+        env_vars.TABLE_SHARD_COUNT,
+        env_vars.TABLE_COMPACT_ITEMS,
+        env_vars.TABLE_LOW_LEVEL_CLIENT,
+        env_vars.TABLE_HISTORY_RETENTION_DAYS,
+        env_vars.TABLE_AGGREGATES_ENABLED,
+    )
     dal_handler.update_product_deployment(
         portfolio_id=env_vars.PORTFOLIO_ID,
         product_stack_id=product_details.stack_id,
@@ -0,0 +1,44 @@
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket, tokens refill continuously at 'rate' per second up to 'capacity'.
+    Paces the DLQ redrive and, packaged with the demo function, the orders client under the API Gateway stage's throttling limits.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last_refill = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Blocks until 'tokens' are available, returns the seconds spent waiting. Requests larger than the bucket capacity are capped to it."""
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait_seconds = (tokens - self._tokens) / self.rate
+            self._sleep(wait_seconds)
+            waited += wait_seconds
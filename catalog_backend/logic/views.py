@@ -0,0 +1,76 @@
+from typing import Any, Optional
+
+from catalog_backend.dal import codec, get_views_dal_handler
+from catalog_backend.dal.models.db import AccountSummary, ProductEntry, VersionAdoption
+from catalog_backend.dal.sharding import is_product_partition, portfolio_of
+from catalog_backend.handlers.utils.observability import logger, tracer
+
+# a view is a partition of membership items, one per product deployment:
+# 'account#<portfolio id>#<account id>', 'consumer#<portfolio id>#<consumer name>' and 'adoption#<portfolio id>#<product name>'
+_SEPARATOR = '#'
+
+
+def _view_id(view: str, portfolio_id: str, value: str) -> str:
+    return _SEPARATOR.join((view, portfolio_id, value))
+
+
+def decode_image(image: Optional[dict[str, Any]]) -> Optional[tuple[str, ProductEntry]]:
+    """The stored sort key and product entry of a stream image, None for history, counters and missing images."""
+    if not image or not is_product_partition(image['portfolio_id']):
+        return None
+    return image['product_stack_id'], codec.decode({**image, 'portfolio_id': portfolio_of(image['portfolio_id'])})
+
+
+def memberships(stored_key: str, entry: ProductEntry) -> dict[tuple[str, str], ProductEntry]:
+    # items are keyed by the stored sort key, so the legacy and compact copies of a product never overwrite each other while it migrates
+    return {
+        (_view_id('account', entry.portfolio_id, entry.account_id), stored_key): entry,
+        (_view_id('consumer', entry.portfolio_id, entry.consumer_name), stored_key): entry,
+        (_view_id('adoption', entry.portfolio_id, entry.name), f'{entry.version}{_SEPARATOR}{stored_key}'): entry,
+    }
+
+
+@tracer.capture_method(capture_response=False)
+def apply_table_change(
+    views_table_name: str, sequence_number: str, changed_at: int, old_image: Optional[dict[str, Any]], new_image: Optional[dict[str, Any]]
+) -> int:
+    """
+    Moves the product's view memberships from its old image to its new image, returns the number of view items changed.
+    'changed_at' is the record's creation time in unix seconds, memberships that are left are kept as deleted markers from then on.
+    """
+    old, new = decode_image(old_image), decode_image(new_image)
+    previous = memberships(*old) if old else {}
+    current = memberships(*new) if new else {}
+    dal_handler = get_views_dal_handler(views_table_name)
+    changed = 0
+    for view_id, item_id in previous.keys() - current.keys():
+        changed += dal_handler.delete_view_item(view_id, item_id, sequence_number, changed_at)
+    for (view_id, item_id), entry in current.items():
+        changed += dal_handler.upsert_view_item(view_id, item_id, entry, sequence_number)
+    logger.debug('applied table change to views', sequence_number=sequence_number, changed=changed)
+    return changed
+
+
+@tracer.capture_method(capture_response=False)
+def get_account_summary(views_table_name: str, portfolio_id: str, account_id: str) -> AccountSummary:
+    summary = AccountSummary(account_id=account_id)
+    for entry in get_views_dal_handler(views_table_name).list_view_items(_view_id('account', portfolio_id, account_id)):
+        summary.total += 1
+        versions = summary.products.setdefault(entry.name, {})
+        versions[entry.version] = versions.get(entry.version, 0) + 1
+        summary.regions[entry.region] = summary.regions.get(entry.region, 0) + 1
+    return summary
+
+
+@tracer.capture_method(capture_response=False)
+def list_consumer_deployments(views_table_name: str, portfolio_id: str, consumer_name: str) -> list[ProductEntry]:
+    return get_views_dal_handler(views_table_name).list_view_items(_view_id('consumer', portfolio_id, consumer_name))
+
+
+@tracer.capture_method(capture_response=False)
+def get_version_adoption(views_table_name: str, portfolio_id: str, product_name: str) -> VersionAdoption:
+    adoption = VersionAdoption(product_name=product_name)
+    for entry in get_views_dal_handler(views_table_name).list_view_items(_view_id('adoption', portfolio_id, product_name)):
+        adoption.total += 1
+        adoption.versions[entry.version] = adoption.versions.get(entry.version, 0) + 1
+    return adoption
@@ -31,3 +31,13 @@ class ProductUpdateEventModel(CloudFormationCustomResourceUpdateModel):
     resource_properties: ProductModel = Field(..., alias='ResourceProperties')
     old_resource_properties: ProductModel = Field(..., alias='OldResourceProperties')
     resource_type: Literal['Custom::PlatformEngGovernanceEnabler'] = Field(..., alias='ResourceType')
+
+
+class RedriveRequestModel(BaseModel):
+    dlq_url: str = Field(..., min_length=1)
+    target_queue_url: str = Field(..., min_length=1)
+    max_messages: int = Field(1000, ge=1)
+    rate_per_second: float = Field(5.0, gt=0)  # max messages per second sent back to the target queue, across all workers
+    max_workers: int = Field(4, ge=1, le=32)
+    batch_size: int = Field(10, ge=1, le=10)  # SQS receive, send and delete batch limit
+    expiry_margin_seconds: int = Field(60, ge=0)  # skip requests whose ResponseURL expires within this margin
@@ -0,0 +1,56 @@
+from pydantic import BaseModel, Field, computed_field
+
+
+class RedriveReportModel(BaseModel):
+    replayed: int = Field(0, ge=0)
+    expired: int = Field(0, ge=0)
+    failed: int = Field(0, ge=0)
+    elapsed_seconds: float = Field(0.0, ge=0)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def throughput_per_second(self) -> float:
+        return round(self.replayed / self.elapsed_seconds, 2) if self.elapsed_seconds else 0.0
+
+
+class ExportReportModel(BaseModel):
+    segments: int = Field(0, ge=0)
+    items: int = Field(0, ge=0)  # exported by this run
+    parts: int = Field(0, ge=0)  # written by this run
+    total_items: int = Field(0, ge=0)  # in the export, including the items of resumed runs
+    throttled: int = Field(0, ge=0)  # scan pages retried after throttling
+    elapsed_seconds: float = Field(0.0, ge=0)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def items_per_second(self) -> float:
+        return round(self.items / self.elapsed_seconds, 2) if self.elapsed_seconds else 0.0
+
+
+class TrustPolicyCapacityModel(BaseModel):
+    statements: int = Field(0, ge=0)
+    size_bytes: int = Field(0, ge=0)  # serialized without whitespace, the way IAM counts it against the quota
+    quota_bytes: int = Field(..., gt=0)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def headroom_bytes(self) -> int:
+        return self.quota_bytes - self.size_bytes
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def headroom_percent(self) -> float:
+        return round(100 * self.headroom_bytes / self.quota_bytes, 2)
+
+
+class CapacityForecastModel(BaseModel):
+    current: TrustPolicyCapacityModel
+    simulated_consumers: int = Field(0, ge=0)
+    simulated: TrustPolicyCapacityModel  # the trust policy once the simulated consumers were added
+    consumer_statement_bytes: int = Field(..., gt=0)  # added by every consumer's statement
+    consumers_remaining: int  # consumers the current trust policy still has room for
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def fits(self) -> bool:
+        return self.simulated.headroom_bytes >= 0
@@ -0,0 +1,153 @@
+"""
+Slims Lambda artifacts before they are zipped: prunes files the runtime never imports, precompiles bytecode and enforces a size budget.
+
+Standard library only, it also runs inside the layer's bundling container, copied there by 'make build'.
+Usage:
+    python artifacts.py requirements <requirements.txt>
+    python artifacts.py slim <artifact dir> [--budget-mb 5] [--compile]
+"""
+
+import argparse
+import compileall
+import json
+import py_compile
+import re
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+TARGET_PYTHON = (3, 13)  # the functions' runtime, bytecode compiled by any other interpreter is ignored by it
+# shipped by the Lambda Python runtime, a second copy only adds to the cold start, see https://docs.aws.amazon.com/lambda/latest/dg/lambda-python.html
+RUNTIME_PROVIDED = frozenset({'boto3', 'botocore', 's3transfer'})
+# stub-only distributions, the mypy_boto3_* packages aren't among them, the DAL imports their type definitions at runtime
+_TYPING_ONLY = re.compile(r'^(types[-_].*|boto3[-_]stubs)$')
+_TEST_DIRS = frozenset({'tests', 'test'})
+# kind of file removed per suffix: typing stubs, sources of compiled extensions and bytecode of another interpreter
+_PRUNED_SUFFIXES = {'.pyi': 'stubs', '.c': 'sources', '.h': 'sources', '.pxd': 'sources', '.pyx': 'sources', '.pyc': 'bytecode', '.pyo': 'bytecode'}
+_DIST_INFO_KEPT = frozenset({'METADATA', 'entry_points.txt', 'top_level.txt'})  # importlib.metadata needs these for versions and plugins
+_REQUIREMENT_NAME = re.compile(r'^([A-Za-z0-9][A-Za-z0-9._-]*)')
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def _pruned_kind(package: str) -> Optional[str]:
+    normalized = _normalize(package).replace('-', '_')
+    if normalized in RUNTIME_PROVIDED:
+        return 'runtime_sdk'
+    return 'stubs' if _TYPING_ONLY.match(normalized) else None
+
+
+def prune_requirements(text: str) -> tuple[str, list[str]]:
+    """Drops runtime provided SDKs and typing-only stubs from a requirements file, returns the new text and the dropped names."""
+    kept, dropped = [], []
+    # 'poetry export' continues a requirement with its hashes on backslash terminated lines
+    for requirement in re.split(r'(?<!\\)\n', text):
+        match = _REQUIREMENT_NAME.match(requirement.strip())
+        if match and _pruned_kind(match.group(1)):
+            dropped.append(match.group(1))
+            continue
+        kept.append(requirement)
+    return '\n'.join(kept), dropped
+
+
+def _removed_kind(root: Path, path: Path) -> Optional[str]:
+    """Why 'path' is pruned from the artifact, None when it's kept."""
+    if path.is_file():
+        return _PRUNED_SUFFIXES.get(path.suffix, 'stubs' if path.name == 'py.typed' else None)
+    if path.name == '__pycache__':
+        return 'bytecode'
+    if path.name.endswith(('.dist-info', '.egg-info')):
+        return _pruned_kind(path.name.split('-', 1)[0])
+    if len(path.relative_to(root).parts) == 1:
+        return _pruned_kind(path.name)
+    return 'tests' if path.name in _TEST_DIRS else None
+
+
+def prune_tree(root: Path) -> dict[str, int]:
+    """Removes tests, typing stubs, sources of compiled extensions, stale bytecode and runtime provided SDKs, returns the bytes removed per kind."""
+    removed: dict[str, int] = {}
+
+    def remove(path: Path, kind: str) -> None:
+        removed[kind] = removed.get(kind, 0) + tree_size(path)
+        shutil.rmtree(path) if path.is_dir() else path.unlink()
+
+    for path in sorted(root.rglob('*'), key=lambda candidate: len(candidate.parts)):
+        if not path.exists():
+            continue  # inside a directory removed earlier
+        kind = _removed_kind(root, path)
+        if kind:
+            remove(path, kind)
+        elif path.name.endswith(('.dist-info', '.egg-info')):
+            for metadata in path.iterdir():
+                if metadata.name not in _DIST_INFO_KEPT:
+                    remove(metadata, 'dist_info')
+    return removed
+
+
+def precompile(root: Path) -> bool:
+    """Compiles every module to bytecode for the target runtime, the runtime's file system is read only so it would recompile on every cold start."""
+    if sys.version_info[:2] != TARGET_PYTHON:
+        print(
+            f'skipping bytecode, built with Python {sys.version_info[0]}.{sys.version_info[1]} instead of {TARGET_PYTHON[0]}.{TARGET_PYTHON[1]}',
+            file=sys.stderr,
+        )
+        return False
+    # unchecked hash based pycs stay valid when the zip resets file times, the runtime never re-validates them against the sources
+    return compileall.compile_dir(str(root), quiet=1, workers=0, invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH, optimize=0)
+
+
+def tree_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(child.stat().st_size for child in path.rglob('*') if child.is_file())
+
+
+def size_report(root: Path, top: int = 10) -> dict[str, Any]:
+    """Unzipped size of the artifact and its largest top level packages."""
+    packages = {child.name: tree_size(child) for child in root.iterdir()}
+    largest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {'artifact': str(root), 'unzipped_bytes': tree_size(root), 'largest': dict(largest)}
+
+
+def slim(root: Path, budget_mb: float, compile_bytecode: bool) -> dict[str, Any]:
+    before = tree_size(root)
+    removed = prune_tree(root)
+    compiled = precompile(root) if compile_bytecode else False
+    report = {
+        **size_report(root),
+        'before_bytes': before,
+        'removed_bytes': removed,
+        'precompiled': compiled,
+        'budget_bytes': int(budget_mb * 1024 * 1024),
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='slim Lambda artifacts')
+    commands = parser.add_subparsers(dest='command', required=True)
+    requirements = commands.add_parser('requirements', help='drop runtime provided SDKs and stubs from a requirements file')
+    requirements.add_argument('path', type=Path)
+    slim_parser = commands.add_parser('slim', help='prune, precompile and check the size budget of an artifact directory')
+    slim_parser.add_argument('path', type=Path)
+    slim_parser.add_argument('--budget-mb', type=float, default=5, help='fail when the unzipped artifact is larger')
+    slim_parser.add_argument('--compile', action='store_true', help=f'precompile bytecode, requires Python {TARGET_PYTHON[0]}.{TARGET_PYTHON[1]}')
+    args = parser.parse_args()
+
+    if args.command == 'requirements':
+        text, dropped = prune_requirements(args.path.read_text())
+        args.path.write_text(text)
+        print(json.dumps({'requirements': str(args.path), 'dropped': dropped}))
+        return
+
+    report = slim(args.path, args.budget_mb, args.compile)
+    print(json.dumps(report, indent=2))
+    if report['unzipped_bytes'] > report['budget_bytes']:
+        sys.exit(f'{args.path} is {report["unzipped_bytes"]} bytes unzipped, over its {args.budget_mb} MB budget')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import jsii
+from aws_cdk import AssetHashType
+from aws_cdk import aws_lambda as _lambda
+from aws_cdk.aws_lambda_python_alpha import BundlingOptions, ICommandHooks
+from constructs import Construct
+
+import cdk.demo.constants as constants
+
+# generated files that don't change the deployed code
+_IGNORED_DIRS = frozenset({'__pycache__', '.pytest_cache', '.mypy_cache'})
+_IGNORED_SUFFIXES = frozenset({'.pyc', '.pyo'})
+
+
+def _files(*paths: str) -> list[Path]:
+    # files and source tree contents that make up an asset, without generated files
+    files = []
+    for root in sorted(paths):
+        root_path = Path(root)
+        candidates = [root_path] if root_path.is_file() else sorted(root_path.rglob('*'))
+        files += [
+            path for path in candidates if path.is_file() and path.suffix not in _IGNORED_SUFFIXES and not _IGNORED_DIRS.intersection(path.parts)
+        ]
+    return files
+
+
+@lru_cache
+def fingerprint(*paths: str) -> str:
+    """Content hash of files and source trees, independent of file times so a rebuilt, identical tree keeps its fingerprint."""
+    digest = hashlib.sha256()
+    for path in _files(*paths):
+        digest.update(path.as_posix().encode())
+        digest.update(b'\0')
+        digest.update(path.read_bytes())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def record_build(record_file: str = constants.BUILD_FINGERPRINTS_FILE) -> None:
+    """Records the fingerprint of the sources of every build folder, run by 'make build' once it copied them."""
+    fingerprints = {Path(folder).as_posix(): fingerprint(*sources) for folder, sources in constants.BUILD_SOURCES.items()}
+    Path(record_file).write_text(json.dumps(fingerprints, indent=2, sort_keys=True) + '\n')
+
+
+def check_build_is_fresh(build_folder: str, *sources: str, record_file: str = constants.BUILD_FINGERPRINTS_FILE) -> None:
+    """
+    Fails the synth once the sources no longer match the ones 'make build' copied, a stale build folder would deploy under the fingerprint
+    of newer sources. Compares content fingerprints, file times don't tell after a checkout or a copy.
+    """
+    recorded = json.loads(Path(record_file).read_text()) if Path(record_file).exists() else {}
+    if Path(build_folder).as_posix() not in recorded:
+        raise ValueError(f'{build_folder} has no recorded build, run "make build" before synthesizing')
+    if recorded[Path(build_folder).as_posix()] != fingerprint(*sources):
+        raise ValueError(f'{build_folder} was built from other sources than {", ".join(sources)}, run "make build" before synthesizing')
+
+
+def is_fast_synth(scope: Construct) -> bool:
+    """Enabled with 'cdk synth -c fast_synth=true' or FAST_SYNTH=1."""
+    value = scope.node.try_get_context(constants.FAST_SYNTH_CONTEXT_KEY) or os.environ.get('FAST_SYNTH', '')
+    return str(value).lower() in ('1', 'true')
+
+
+def _custom_hash(scope: Construct, build_folder: str, *sources: str) -> dict:
+    # CDK hashes the copied build folder by default, a custom hash also lets it reuse the asset it already staged in cdk.out
+    if not is_fast_synth(scope):
+        return {}
+    check_build_is_fresh(build_folder, *sources)
+    return {'asset_hash_type': AssetHashType.CUSTOM, 'asset_hash': fingerprint(*sources)}
+
+
+def function_code(scope: Construct, build_folder: str, *sources: str) -> _lambda.Code:
+    """Function code from the build folder, in fast synth mode fingerprinted by the source trees it was copied from."""
+    return _lambda.Code.from_asset(build_folder, **_custom_hash(scope, build_folder, *sources))
+
+
+@jsii.implements(ICommandHooks)
+class SlimLayerHooks:
+    """Slims the installed layer inside the bundling container, where bytecode is compiled by the runtime's own Python."""
+
+    def before_bundling(self, input_dir: str, output_dir: str) -> list[str]:
+        return []
+
+    def after_bundling(self, input_dir: str, output_dir: str) -> list[str]:
+        # fails the bundling, and so the synth, once the layer grows past its budget
+        return [f'python {input_dir}/{constants.ARTIFACTS_SCRIPT} slim {output_dir} --compile --budget-mb {constants.COMMON_LAYER_BUDGET_MB}']
+
+
+def layer_bundling(scope: Construct) -> BundlingOptions:
+    """The layer is slimmed after its dependencies install, in fast synth mode it's fingerprinted by the lock file and its Docker bundling is
+    skipped while cdk.out holds a bundle of it."""
+    return BundlingOptions(
+        command_hooks=SlimLayerHooks(),
+        asset_excludes=[constants.ARTIFACTS_SCRIPT],
+        **_custom_hash(scope, constants.COMMON_LAYER_BUILD_FOLDER, *constants.COMMON_LAYER_SOURCES),
+    )
+
+
+if __name__ == '__main__':
+    record_build()
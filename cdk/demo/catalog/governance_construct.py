@@ -1,6 +1,9 @@
+from typing import Optional
+
 import aws_cdk.aws_lambda_event_sources as eventsources
-import boto3
 from aws_cdk import CfnOutput, Duration, RemovalPolicy, aws_sns, aws_sqs
+from aws_cdk import aws_applicationautoscaling as appscaling
+from aws_cdk import aws_cloudwatch as cloudwatch
 from aws_cdk import aws_dynamodb as dynamodb
 from aws_cdk import aws_iam as iam
 from aws_cdk import aws_lambda as _lambda
@@ -10,19 +13,62 @@ from aws_cdk.aws_logs import RetentionDays
 from constructs import Construct
 
 import cdk.demo.constants as constants
+from cdk.demo.assets import function_code
 from cdk.demo.catalog.governance_db_construct import GovernanceDbConstruct
+from cdk.demo.utils import get_organization_id
 
 
 class GovernanceConstruct(Construct):
-    def __init__(self, scope: Construct, id_: str, common_layer: PythonLayerVersion, service_trust_role: iam.Role) -> None:
+    def __init__(
+        self,
+        scope: Construct,
+        id_: str,
+        common_layer: PythonLayerVersion,
+        service_trust_role: iam.Role,
+        organization_id: Optional[str] = None,
+        snap_start: bool = constants.GOVERNANCE_SNAP_START,
+        provisioned_concurrency: bool = constants.GOVERNANCE_PROVISIONED_CONCURRENCY,
+        prewarm_on_init: Optional[bool] = None,
+    ) -> None:
         super().__init__(scope, id_)
+        if snap_start and provisioned_concurrency:
+            raise ValueError('Lambda does not support SnapStart and provisioned concurrency on the same function version, choose one')
         self.id_ = id_
+        # principals of this organization may publish to the topic, see cdk.demo.utils.get_organization_id
+        self.organization_id = get_organization_id(self, organization_id)
         self.api_db = GovernanceDbConstruct(self, f'{id_}db')
         self.lambda_role = self._build_lambda_role(self.api_db.db, service_trust_role)
         self.common_layer = common_layer
-        self.governance_lambda = self._build_governance_lambda(self.lambda_role, self.api_db.db, self.common_layer, service_trust_role)
+        # an on-demand cold start pays for the prewarm inside the first invocation anyway, it only pays off once the init phase runs ahead of it
+        self.prewarm_on_init = snap_start or provisioned_concurrency if prewarm_on_init is None else prewarm_on_init
+        self.governance_lambda = self._build_governance_lambda(
+            self.lambda_role, self.api_db, self.common_layer, service_trust_role, snap_start, self.prewarm_on_init
+        )
+        # SnapStart and provisioned concurrency only apply to published versions, the queues invoke an alias of the latest one instead of $LATEST
+        self.governance_alias = (
+            self._build_live_alias(self.governance_lambda, provisioned_concurrency) if snap_start or provisioned_concurrency else None
+        )
+        self.governance_target: _lambda.IFunction = self.governance_alias or self.governance_lambda
         self.sns_topic = self._build_sns()
-        self.queue = self._build_sns_sqs_lambda_pattern(self.sns_topic, self.governance_lambda)
+        self.queue = self._build_sns_sqs_lambda_pattern(
+            self.sns_topic,
+            self.governance_target,
+            queue_id=constants.SQS,
+            dlq_id='dlq',
+            request_types=constants.PROVISION_LANE_REQUEST_TYPES,
+            max_concurrency=constants.PROVISION_LANE_MAX_CONCURRENCY,
+        )
+        self.delete_queue = self._build_sns_sqs_lambda_pattern(
+            self.sns_topic,
+            self.governance_target,
+            queue_id=constants.DELETE_SQS,
+            dlq_id='deleteDlq',
+            request_types=constants.DELETE_LANE_REQUEST_TYPES,
+            max_concurrency=constants.DELETE_LANE_MAX_CONCURRENCY,
+        )
+        self.redrive_lambda = self._build_redrive_lambda(self.common_layer, [self.queue, self.delete_queue])
+        if provisioned_concurrency and self.governance_alias:
+            self.provisioned_scaling = self._build_backlog_scaling(self.governance_alias, [self.queue, self.delete_queue])
         self._set_outputs()
 
     def _set_outputs(self) -> None:
@@ -40,12 +86,10 @@ class GovernanceConstruct(Construct):
         policy_statement = iam.PolicyStatement(actions=['sns:Publish'], resources=[topic.topic_arn], principals=[iam.AnyPrincipal()])
 
         # Add a condition to the policy statement to restrict to the organization
-        client = boto3.client('organizations')
-        response = client.describe_organization()
         policy_statement.add_condition(
             'StringEquals',
             {
-                'aws:PrincipalOrgID': response['Organization']['Id'],
+                'aws:PrincipalOrgID': self.organization_id,
             },
         )
 
@@ -53,23 +97,101 @@ class GovernanceConstruct(Construct):
         topic.add_to_resource_policy(policy_statement)
         return topic
 
-    def _build_sns_sqs_lambda_pattern(self, topic: aws_sns.Topic, function: _lambda.Function) -> aws_sqs.Queue:
-        dlq = aws_sqs.Queue(self, 'dlq', visibility_timeout=Duration.seconds(300), retention_period=Duration.days(1))
+    def _build_sns_sqs_lambda_pattern(
+        self,
+        topic: aws_sns.Topic,
+        function: _lambda.IFunction,
+        queue_id: str,
+        dlq_id: str,
+        request_types: list[str],
+        max_concurrency: int,
+    ) -> aws_sqs.Queue:
+        # failed requests are kept for two weeks so they can be replayed with the redrive function
+        dlq = aws_sqs.Queue(self, dlq_id, visibility_timeout=Duration.seconds(300), retention_period=Duration.days(14))
         queue = aws_sqs.Queue(
             self,
-            f'{self.id_}{constants.SQS}',
+            f'{self.id_}{queue_id}',
             visibility_timeout=Duration.seconds(300),
             retention_period=Duration.days(1),
-            queue_name=f'{self.id_}{constants.SQS}',
+            queue_name=f'{self.id_}{queue_id}',
             removal_policy=RemovalPolicy.DESTROY,
             encryption=aws_sqs.QueueEncryption.SQS_MANAGED,
             dead_letter_queue=aws_sqs.DeadLetterQueue(max_receive_count=3, queue=dlq),
         )
-        topic.add_subscription(topic_subscription=subscriptions.SqsSubscription(queue, raw_message_delivery=True))
-        function.add_event_source(eventsources.SqsEventSource(queue=queue, batch_size=1, enabled=True))
-        # todo add DLQ redrive pattern
+        # drop foreign resource types and other lanes' request types at SNS, before they reach the queue
+        topic.add_subscription(
+            topic_subscription=subscriptions.SqsSubscription(
+                queue,
+                raw_message_delivery=True,
+                filter_policy_with_message_body={
+                    'ResourceType': aws_sns.FilterOrPolicy.filter(
+                        aws_sns.SubscriptionFilter.string_filter(allowlist=[constants.CUSTOM_RESOURCE_TYPE])
+                    ),
+                    'RequestType': aws_sns.FilterOrPolicy.filter(aws_sns.SubscriptionFilter.string_filter(allowlist=request_types)),
+                },
+            )
+        )
+        # second line of defense, messages that don't match are deleted by the event source mapping without invoking the function
+        function.add_event_source(
+            eventsources.SqsEventSource(
+                queue=queue,
+                batch_size=1,
+                enabled=True,
+                max_concurrency=max_concurrency,
+                filters=[
+                    _lambda.FilterCriteria.filter(
+                        {
+                            'body': {
+                                'ResourceType': _lambda.FilterRule.is_equal(constants.CUSTOM_RESOURCE_TYPE),
+                                'RequestType': _lambda.FilterRule.or_(*request_types),
+                            }
+                        }
+                    )
+                ],
+            )
+        )
+        CfnOutput(self, f'{queue_id}Url', value=queue.queue_url).override_logical_id(f'{queue_id}Url')
+        CfnOutput(self, f'{queue_id}DlqUrl', value=dlq.queue_url).override_logical_id(f'{queue_id}DlqUrl')
         return queue
 
+    def _build_redrive_lambda(self, layer: PythonLayerVersion, queues: list[aws_sqs.Queue]) -> _lambda.Function:
+        role = iam.Role(
+            self,
+            'redriveRole',
+            assumed_by=iam.ServicePrincipal('lambda.amazonaws.com'),
+            managed_policies=[
+                iam.ManagedPolicy.from_aws_managed_policy_name(managed_policy_name=(f'service-role/{constants.LAMBDA_BASIC_EXECUTION_ROLE}'))
+            ],
+        )
+        for queue in queues:
+            queue.grant_send_messages(role)
+            queue.dead_letter_queue.queue.grant_consume_messages(role)  # type: ignore[union-attr]
+
+        lambda_function = _lambda.Function(
+            self,
+            constants.REDRIVE_LAMBDA,
+            runtime=_lambda.Runtime.PYTHON_3_13,
+            code=function_code(self, constants.BUILD_FOLDER, *constants.LAMBDA_SOURCES),
+            handler='catalog_backend.handlers.dlq_redrive_handler.handle_dlq_redrive',
+            environment={
+                constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger
+                'POWERTOOLS_METRICS_NAMESPACE': constants.METRICS_NAMESPACE,  # for metrics
+                'METRICS_DIMENSION_KEY': constants.METRICS_DIMENSION_VALUE,  # for metrics
+            },
+            tracing=_lambda.Tracing.ACTIVE,
+            retry_attempts=0,
+            timeout=Duration.seconds(constants.REDRIVE_LAMBDA_TIMEOUT),
+            memory_size=constants.API_HANDLER_LAMBDA_MEMORY_SIZE,
+            layers=[layer],
+            role=role,
+            log_retention=RetentionDays.ONE_DAY,
+            log_format=_lambda.LogFormat.JSON.value,
+            system_log_level=_lambda.SystemLogLevel.WARN.value,
+        )
+        CfnOutput(self, 'RedriveLambda', value=lambda_function.function_name).override_logical_id('RedriveLambda')
+        return lambda_function
+
     def _build_lambda_role(self, db: dynamodb.TableV2, service_trust_role: iam.Role) -> iam.Role:
         return iam.Role(
             self,
@@ -79,8 +201,8 @@ class GovernanceConstruct(Construct):
                 'dynamodb_db': iam.PolicyDocument(
                     statements=[
                         iam.PolicyStatement(
-                            actions=['dynamodb:PutItem', 'dynamodb:GetItem', 'dynamodb:DeleteItem'],
-                            resources=[db.table_arn],
+                            actions=['dynamodb:PutItem', 'dynamodb:GetItem', 'dynamodb:DeleteItem', 'dynamodb:UpdateItem', 'dynamodb:Query'],
+                            resources=[db.table_arn, f'{db.table_arn}/index/*'],
                             effect=iam.Effect.ALLOW,
                         )
                     ]
@@ -103,24 +225,33 @@ class GovernanceConstruct(Construct):
     def _build_governance_lambda(
         self,
         role: iam.Role,
-        db: dynamodb.TableV2,
+        api_db: GovernanceDbConstruct,
         layer: PythonLayerVersion,
         service_trust_role: iam.Role,
+        snap_start: bool,
+        prewarm_on_init: bool,
     ) -> _lambda.Function:
         lambda_function = _lambda.Function(
             self,
             constants.VISIBILITY_LAMBDA,
             runtime=_lambda.Runtime.PYTHON_3_13,
-            code=_lambda.Code.from_asset(constants.BUILD_FOLDER),
+            code=function_code(self, constants.BUILD_FOLDER, *constants.LAMBDA_SOURCES),
             handler='catalog_backend.handlers.product_callback_handler.handle_product_event',
             environment={
                 constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
                 constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger
                 'POWERTOOLS_METRICS_NAMESPACE': constants.METRICS_NAMESPACE,  # for metrics
                 'METRICS_DIMENSION_KEY': constants.METRICS_DIMENSION_VALUE,  # for metrics
-                'TABLE_NAME': db.table_name,
+                'TABLE_NAME': api_db.db.table_name,
+                'TABLE_SHARD_COUNT': str(api_db.shard_count),
+                'TABLE_COMPACT_ITEMS': str(api_db.compact_items).lower(),
+                'TABLE_LOW_LEVEL_CLIENT': str(constants.TABLE_LOW_LEVEL_CLIENT).lower(),
+                'TABLE_HISTORY_RETENTION_DAYS': str(api_db.history_retention_days),
+                'TABLE_AGGREGATES_ENABLED': str(api_db.aggregates_enabled).lower(),
                 'SERVICE_ROLE_NAME': service_trust_role.role_name,
                 'SERVICE_ROLE_ARN': service_trust_role.role_arn,
+                'TRUST_POLICY_QUOTA': str(constants.TRUST_POLICY_QUOTA),
+                'PREWARM_ON_INIT': str(prewarm_on_init).lower(),  # builds models and clients during the init phase, captured by a SnapStart snapshot
                 # 'PORTFOLIO_ID': constants.PORTFOLIO_ID, is added later after portfolio creation
             },
             tracing=_lambda.Tracing.ACTIVE,
@@ -132,6 +263,56 @@ class GovernanceConstruct(Construct):
             log_retention=RetentionDays.ONE_DAY,
             log_format=_lambda.LogFormat.JSON.value,
             system_log_level=_lambda.SystemLogLevel.WARN.value,
+            snap_start=_lambda.SnapStartConf.ON_PUBLISHED_VERSIONS if snap_start else None,
         )
 
         return lambda_function
+
+    def _build_live_alias(self, function: _lambda.Function, provisioned_concurrency: bool) -> _lambda.Alias:
+        # every deployment publishes a new version, its snapshot is taken and its provisioned environments start before the alias moves to it
+        return _lambda.Alias(
+            self,
+            'GovernanceLiveAlias',
+            alias_name=constants.GOVERNANCE_ALIAS,
+            version=function.current_version,
+            provisioned_concurrent_executions=constants.GOVERNANCE_PROVISIONED_MIN_CAPACITY if provisioned_concurrency else None,
+        )
+
+    def _build_backlog_scaling(self, alias: _lambda.Alias, queues: list[aws_sqs.Queue]) -> appscaling.ScalableTarget:
+        # more provisioned environments than the lanes' maximum concurrency would never be invoked
+        max_capacity = constants.PROVISION_LANE_MAX_CONCURRENCY + constants.DELETE_LANE_MAX_CONCURRENCY
+        target = appscaling.ScalableTarget(
+            self,
+            'GovernanceProvisionedConcurrency',
+            service_namespace=appscaling.ServiceNamespace.LAMBDA,
+            scalable_dimension='lambda:function:ProvisionedConcurrency',
+            resource_id=f'function:{alias.lambda_.function_name}:{alias.alias_name}',
+            min_capacity=constants.GOVERNANCE_PROVISIONED_MIN_CAPACITY,
+            max_capacity=max_capacity,
+        )
+        target.node.add_dependency(alias)
+        period = Duration.minutes(1)
+        depth = {f'depth{index}': queue.metric_approximate_number_of_messages_visible(period=period) for index, queue in enumerate(queues)}
+        age = {f'age{index}': queue.metric_approximate_age_of_oldest_message(period=period) for index, queue in enumerate(queues)}
+        # one backlog signal for one exact capacity policy, a second policy on the age would scale in whatever this one scaled out
+        backlog = cloudwatch.MathExpression(
+            expression=(
+                f'MAX([{" + ".join(depth)}, IF(MAX([{", ".join(age)}]) >= {constants.GOVERNANCE_FULL_SCALE_MESSAGE_AGE}, '
+                f'{constants.GOVERNANCE_FULL_SCALE_BACKLOG}, 0)])'
+            ),
+            using_metrics={**depth, **age},
+            label='Governance lanes backlog',
+            period=period,
+        )
+        target.scale_on_metric(
+            'BacklogScaling',
+            metric=backlog,
+            adjustment_type=appscaling.AdjustmentType.EXACT_CAPACITY,
+            scaling_steps=[
+                appscaling.ScalingInterval(upper=constants.GOVERNANCE_SCALE_OUT_BACKLOG, change=constants.GOVERNANCE_PROVISIONED_MIN_CAPACITY),
+                appscaling.ScalingInterval(lower=constants.GOVERNANCE_SCALE_OUT_BACKLOG, change=max(max_capacity // 2, 1)),
+                appscaling.ScalingInterval(lower=constants.GOVERNANCE_FULL_SCALE_BACKLOG, change=max_capacity),
+            ],
+            cooldown=Duration.minutes(1),
+        )
+        return target
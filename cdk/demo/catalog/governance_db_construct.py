@@ -6,9 +6,24 @@ import cdk.demo.constants as constants
 
 
 class GovernanceDbConstruct(Construct):
-    def __init__(self, scope: Construct, id_: str) -> None:
+    def __init__(
+        self,
+        scope: Construct,
+        id_: str,
+        shard_count: int = constants.TABLE_SHARD_COUNT,
+        compact_items: bool = constants.TABLE_COMPACT_ITEMS,
+        history_retention_days: int = constants.TABLE_HISTORY_RETENTION_DAYS,
+        aggregates_enabled: bool = constants.TABLE_AGGREGATES_ENABLED,
+    ) -> None:
         super().__init__(scope, id_)
-
+        # items of a portfolio are spread over 'portfolio_id#shard' partition keys when larger than 1, see catalog_backend.dal.sharding
+        self.shard_count = shard_count
+        # item layout, see catalog_backend.dal.codec
+        self.compact_items = compact_items
+        # history events expire through the table's TTL, see catalog_backend.dal.history
+        self.history_retention_days = history_retention_days
+        # live deployment counters, see catalog_backend.dal.aggregates
+        self.aggregates_enabled = aggregates_enabled
         self.db: dynamodb.TableV2 = self._build_db(id_)
 
     def _build_db(self, id_prefix: str) -> dynamodb.TableV2:
@@ -20,6 +35,18 @@ class GovernanceDbConstruct(Construct):
             partition_key=dynamodb.Attribute(name='portfolio_id', type=dynamodb.AttributeType.STRING),
             sort_key=dynamodb.Attribute(name='product_stack_id', type=dynamodb.AttributeType.STRING),
             billing=dynamodb.Billing.on_demand(),
+            time_to_live_attribute='expires_at',
+            # sparse index of recent changes, only history events carry its keys
+            global_secondary_indexes=[
+                dynamodb.GlobalSecondaryIndexPropsV2(
+                    index_name='recent_changes',
+                    partition_key=dynamodb.Attribute(name='recent_pk', type=dynamodb.AttributeType.STRING),
+                    sort_key=dynamodb.Attribute(name='recent_sk', type=dynamodb.AttributeType.STRING),
+                    projection_type=dynamodb.ProjectionType.ALL,
+                )
+            ],
+            # consumed by the materialised views function, see cdk.demo.catalog.views_construct
+            dynamo_stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES,
             point_in_time_recovery=True,
             removal_policy=RemovalPolicy.DESTROY,
         )
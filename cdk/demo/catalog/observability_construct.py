@@ -1,5 +1,6 @@
 import aws_cdk.aws_sns as sns
 from aws_cdk import CfnOutput, Duration, RemovalPolicy
+from aws_cdk import aws_cloudwatch as cloudwatch
 from aws_cdk import aws_dynamodb as dynamodb
 from aws_cdk import aws_iam as iam
 from aws_cdk import aws_kms as kms
@@ -8,6 +9,8 @@ from aws_cdk import aws_sqs as sqs
 from cdk_monitoring_constructs import (
     AlarmFactoryDefaults,
     CustomMetricGroup,
+    CustomMetricWithAlarm,
+    CustomThreshold,
     LatencyThreshold,
     MetricFactory,
     MetricStatistic,
@@ -26,14 +29,14 @@ class ObservabilityConstruct(Construct):
         id_: str,
         db: dynamodb.TableV2,
         functions: list[_lambda.Function],
-        visibility_queue: sqs.Queue,
+        visibility_queues: dict[str, sqs.Queue],
         visibility_topic: sns.Topic,
     ) -> None:
         super().__init__(scope, id_)
         self.id_ = id_
         self.notification_topic = self._build_topic()
         self._build_high_level_dashboard(self.notification_topic)
-        self._build_low_level_dashboard(db, functions, self.notification_topic, visibility_queue, visibility_topic)
+        self._build_low_level_dashboard(db, functions, self.notification_topic, visibility_queues, visibility_topic)
 
     def _build_topic(self) -> sns.Topic:
         key = kms.Key(
@@ -96,8 +99,120 @@ class ObservabilityConstruct(Construct):
         )
         high_level_facade.monitor_custom(metric_groups=[success_group, failure_group], human_readable_name='KPIs', alarm_friendly_name='KPIs')
 
+    def _monitor_end_to_end_latency(self, facade: MonitoringFacade) -> None:
+        # time from a request reaching its queue until its CloudFormation response, emitted per request type by the governance function
+        metrics_factory = facade.create_metric_factory()
+        request_types = constants.PROVISION_LANE_REQUEST_TYPES + constants.DELETE_LANE_REQUEST_TYPES
+
+        def latency(request_type: str, statistic: MetricStatistic) -> cloudwatch.IMetric:
+            return metrics_factory.create_metric(
+                metric_name='EndToEndLatency',
+                namespace=constants.METRICS_NAMESPACE,
+                statistic=statistic,
+                dimensions_map={constants.METRICS_DIMENSION_KEY: constants.METRICS_DIMENSION_VALUE, 'RequestType': request_type},
+                label=f'{request_type} {statistic.value}',
+                period=Duration.minutes(1),
+            )
+
+        p99 = {f'p99{request_type.lower()}': latency(request_type, MetricStatistic.P99) for request_type in request_types}
+        # the SLO holds for every request type, it breaches with the slowest one
+        slowest_p99 = metrics_factory.create_metric_math(
+            expression=f'MAX([{", ".join(p99)}])', using_metrics=p99, label='slowest request type p99', period=Duration.minutes(1)
+        )
+        slo_alarm = CustomMetricWithAlarm(
+            metric=slowest_p99,
+            alarm_friendly_name='EndToEndLatencySlo',
+            add_alarm={
+                'p99': CustomThreshold(
+                    threshold=constants.END_TO_END_LATENCY_SLO_SECONDS * 1000,
+                    comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_THRESHOLD,
+                    evaluation_periods=constants.END_TO_END_LATENCY_SLO_EVALUATION_MINUTES,
+                    datapoints_to_alarm=constants.END_TO_END_LATENCY_SLO_BREACHING_MINUTES,
+                    treat_missing_data_override=cloudwatch.TreatMissingData.NOT_BREACHING,  # no requests, nobody waits
+                    alarm_description_override=f'p99 end-to-end provisioning latency above {constants.END_TO_END_LATENCY_SLO_SECONDS} seconds',
+                )
+            },
+        )
+        facade.monitor_custom(
+            metric_groups=[
+                CustomMetricGroup(
+                    metrics=[latency(request_type, MetricStatistic.P50) for request_type in request_types], title='End-to-end latency p50'
+                ),
+                CustomMetricGroup(metrics=[*p99.values(), slo_alarm], title='End-to-end latency p99'),
+            ],
+            human_readable_name='End-to-end Provisioning Latency',
+            alarm_friendly_name='EndToEndLatency',
+        )
+
+    def _monitor_trust_policy_capacity(self, facade: MonitoringFacade) -> None:
+        # reported by the governance function after every trust policy change, IAM rejects the change that outgrows the quota
+        metrics_factory = facade.create_metric_factory()
+
+        def capacity(name: str, statistic: MetricStatistic, label: str) -> cloudwatch.IMetric:
+            return metrics_factory.create_metric(
+                metric_name=name,
+                namespace=constants.METRICS_NAMESPACE,
+                statistic=statistic,
+                dimensions_map={constants.METRICS_DIMENSION_KEY: constants.METRICS_DIMENSION_VALUE},
+                label=label,
+            )
+
+        headroom_alarm = CustomMetricWithAlarm(
+            metric=capacity('TrustPolicyHeadroom', MetricStatistic.MIN, 'headroom %'),
+            alarm_friendly_name='TrustPolicyHeadroom',
+            add_alarm={
+                'headroom': CustomThreshold(
+                    threshold=constants.TRUST_POLICY_HEADROOM_ALARM_PERCENT,
+                    comparison_operator=cloudwatch.ComparisonOperator.LESS_THAN_THRESHOLD,
+                    treat_missing_data_override=cloudwatch.TreatMissingData.NOT_BREACHING,  # only reported when the trust policy changes
+                    alarm_description_override=(
+                        f'service role trust policy has less than {constants.TRUST_POLICY_HEADROOM_ALARM_PERCENT}% of its quota left, '
+                        'forecast it with python -m catalog_backend.logic.iam.capacity'
+                    ),
+                )
+            },
+        )
+        facade.monitor_custom(
+            metric_groups=[
+                CustomMetricGroup(
+                    metrics=[
+                        capacity('TrustPolicyStatements', MetricStatistic.MAX, 'statements'),
+                        capacity('TrustPolicySize', MetricStatistic.MAX, 'size (bytes)'),
+                    ],
+                    title='Trust Policy Size',
+                ),
+                CustomMetricGroup(metrics=[headroom_alarm], title='Trust Policy Headroom'),
+            ],
+            human_readable_name='Service Role Trust Policy Capacity',
+            alarm_friendly_name='TrustPolicyCapacity',
+        )
+
+    def _monitor_api_calls(self, facade: MonitoringFacade) -> None:
+        # AWS calls per governance invocation, the CloudFormation response included, a creeping average means a new call crept into a lifecycle event
+        metrics_factory = facade.create_metric_factory()
+        calls = [
+            metrics_factory.create_metric(
+                metric_name='ApiCalls',
+                namespace=constants.METRICS_NAMESPACE,
+                statistic=statistic,
+                dimensions_map={constants.METRICS_DIMENSION_KEY: constants.METRICS_DIMENSION_VALUE},
+                label=label,
+            )
+            for statistic, label in ((MetricStatistic.AVERAGE, 'average calls'), (MetricStatistic.MAX, 'max calls'))
+        ]
+        facade.monitor_custom(
+            metric_groups=[CustomMetricGroup(metrics=calls, title='AWS Calls per Invocation')],
+            human_readable_name='AWS Call Accounting',
+            alarm_friendly_name='ApiCalls',
+        )
+
     def _build_low_level_dashboard(
-        self, db: dynamodb.TableV2, functions: list[_lambda.Function], notification_topic: sns.Topic, queue: sqs.Queue, visibility_topic: sns.Topic
+        self,
+        db: dynamodb.TableV2,
+        functions: list[_lambda.Function],
+        notification_topic: sns.Topic,
+        queues: dict[str, sqs.Queue],
+        visibility_topic: sns.Topic,
     ):
         low_level_facade = MonitoringFacade(
             self,
@@ -110,7 +225,11 @@ class ObservabilityConstruct(Construct):
         )
         low_level_facade.add_large_header('Platform Engineering Service Catalog Low Level Dashboard')
 
-        low_level_facade.monitor_sqs_queue(queue=queue, alarm_friendly_name='Visibility Queue')
+        for queue_name, queue in queues.items():
+            low_level_facade.monitor_sqs_queue(queue=queue, alarm_friendly_name=queue_name)
+        self._monitor_end_to_end_latency(low_level_facade)
+        self._monitor_trust_policy_capacity(low_level_facade)
+        self._monitor_api_calls(low_level_facade)
         low_level_facade.monitor_sns_topic(topic=visibility_topic, alarm_friendly_name='Visibility Topic')
 
         for func in functions:
@@ -0,0 +1,102 @@
+import aws_cdk.aws_lambda_event_sources as eventsources
+from aws_cdk import CfnOutput, Duration, RemovalPolicy, aws_sqs
+from aws_cdk import aws_dynamodb as dynamodb
+from aws_cdk import aws_iam as iam
+from aws_cdk import aws_lambda as _lambda
+from aws_cdk.aws_lambda_python_alpha import PythonLayerVersion
+from aws_cdk.aws_logs import RetentionDays
+from constructs import Construct
+
+import cdk.demo.constants as constants
+from cdk.demo.assets import function_code
+
+
+class ViewsConstruct(Construct):
+    """Materialised views of the governance table, kept in sync by a function that consumes the table's stream."""
+
+    def __init__(self, scope: Construct, id_: str, common_layer: PythonLayerVersion, governance_db: dynamodb.TableV2) -> None:
+        super().__init__(scope, id_)
+        self.id_ = id_
+        self.views_db = self._build_db()
+        # records that kept failing, with their shard and sequence numbers, are kept for two weeks
+        self.dlq = aws_sqs.Queue(self, 'viewsDlq', retention_period=Duration.days(14))
+        self.views_lambda = self._build_views_lambda(common_layer, governance_db)
+
+    def _build_db(self) -> dynamodb.TableV2:
+        table_id = f'{self.id_}{constants.VIEWS_TABLE_NAME}'
+        # view partitions, see catalog_backend.logic.views
+        table = dynamodb.TableV2(
+            self,
+            table_id,
+            table_name=table_id,
+            partition_key=dynamodb.Attribute(name='view_id', type=dynamodb.AttributeType.STRING),
+            sort_key=dynamodb.Attribute(name='item_id', type=dynamodb.AttributeType.STRING),
+            billing=dynamodb.Billing.on_demand(),
+            point_in_time_recovery=True,
+            removal_policy=RemovalPolicy.DESTROY,
+            time_to_live_attribute='expires_at',  # deleted markers
+        )
+        CfnOutput(self, id=constants.VIEWS_TABLE_NAME_OUTPUT, value=table.table_name).override_logical_id(constants.VIEWS_TABLE_NAME_OUTPUT)
+        return table
+
+    def _build_views_lambda(self, layer: PythonLayerVersion, governance_db: dynamodb.TableV2) -> _lambda.Function:
+        role = iam.Role(
+            self,
+            'viewsRole',
+            assumed_by=iam.ServicePrincipal('lambda.amazonaws.com'),
+            inline_policies={
+                'dynamodb_db': iam.PolicyDocument(
+                    statements=[
+                        iam.PolicyStatement(
+                            actions=['dynamodb:PutItem', 'dynamodb:Query'],
+                            resources=[self.views_db.table_arn],
+                            effect=iam.Effect.ALLOW,
+                        )
+                    ]
+                ),
+            },
+            managed_policies=[
+                iam.ManagedPolicy.from_aws_managed_policy_name(managed_policy_name=(f'service-role/{constants.LAMBDA_BASIC_EXECUTION_ROLE}'))
+            ],
+        )
+
+        lambda_function = _lambda.Function(
+            self,
+            constants.VIEWS_LAMBDA,
+            runtime=_lambda.Runtime.PYTHON_3_13,
+            code=function_code(self, constants.BUILD_FOLDER, *constants.LAMBDA_SOURCES),
+            handler='catalog_backend.handlers.views_stream_handler.handle_table_stream',
+            environment={
+                constants.POWERTOOLS_SERVICE_NAME: constants.SERVICE_NAME,  # for logger, tracer and metrics
+                constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger
+                'POWERTOOLS_METRICS_NAMESPACE': constants.METRICS_NAMESPACE,  # for metrics
+                'METRICS_DIMENSION_KEY': constants.METRICS_DIMENSION_VALUE,  # for metrics
+                'VIEWS_TABLE_NAME': self.views_db.table_name,
+            },
+            tracing=_lambda.Tracing.ACTIVE,
+            retry_attempts=0,
+            timeout=Duration.seconds(constants.API_HANDLER_LAMBDA_TIMEOUT),
+            memory_size=constants.API_HANDLER_LAMBDA_MEMORY_SIZE,
+            layers=[layer],
+            role=role,
+            log_retention=RetentionDays.ONE_DAY,
+            log_format=_lambda.LogFormat.JSON.value,
+            system_log_level=_lambda.SystemLogLevel.WARN.value,
+        )
+        # failed records are reported per item, the shard checkpoints before the first of them and the retried batch is bisected,
+        # so a poison record ends up alone in the DLQ instead of blocking the shard
+        lambda_function.add_event_source(
+            eventsources.DynamoEventSource(
+                table=governance_db,
+                starting_position=_lambda.StartingPosition.TRIM_HORIZON,
+                batch_size=constants.VIEWS_STREAM_BATCH_SIZE,
+                bisect_batch_on_error=True,
+                report_batch_item_failures=True,
+                retry_attempts=constants.VIEWS_STREAM_RETRY_ATTEMPTS,
+                max_record_age=Duration.hours(constants.VIEWS_STREAM_MAX_RECORD_AGE),
+                on_failure=eventsources.SqsDlq(self.dlq),
+            )
+        )
+        CfnOutput(self, 'ViewsLambdaName', value=lambda_function.function_name).override_logical_id('ViewsLambdaName')
+        CfnOutput(self, 'ViewsDlqUrl', value=self.dlq.queue_url).override_logical_id('ViewsDlqUrl')
+        return lambda_function
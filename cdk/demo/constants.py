@@ -1,12 +1,29 @@
 LAMBDA_BASIC_EXECUTION_ROLE = 'AWSLambdaBasicExecutionRole'
 SERVICE_ROLE = 'ServiceRole'
 VISIBILITY_LAMBDA = 'VisibilityLambda'
+REDRIVE_LAMBDA = 'DlqRedriveLambda'
+VIEWS_LAMBDA = 'ViewsLambda'
 TABLE_NAME = 'governance'
 TABLE_NAME_OUTPUT = 'DbOutput'
+TABLE_SHARD_COUNT = 1  # write shards per portfolio partition, changing it requires migrating the existing items
+TABLE_COMPACT_ITEMS = False  # write product entries with the compact item codec, existing items stay readable
+TABLE_LOW_LEVEL_CLIENT = False  # governance function accesses the table with the low-level client DAL
+GOVERNANCE_SNAP_START = False  # SnapStart for the governance function, its queues then invoke the published GOVERNANCE_ALIAS
+GOVERNANCE_ALIAS = 'live'
+TABLE_HISTORY_RETENTION_DAYS = 0  # days to keep the event of every product lifecycle transition, opt-in: see 'Deployment History' for the cost
+TABLE_AGGREGATES_ENABLED = False  # live deployment counters per product, version, account and region, opt-in: see 'Deployment Counters' for the cost
+VIEWS_TABLE_NAME = 'views'
+VIEWS_TABLE_NAME_OUTPUT = 'ViewsDbOutput'
+VIEWS_STREAM_BATCH_SIZE = 100  # governance table stream records per views function invocation
+VIEWS_STREAM_RETRY_ATTEMPTS = 10  # retries of a failing record, bisecting its batch, before it is sent to the views DLQ
+VIEWS_STREAM_MAX_RECORD_AGE = 24  # hours, older records are sent to the views DLQ
 PORTFOLIO_ID_OUTPUT = 'PortfolioIdOutput'
 LAMBDA_LAYER_NAME = 'common'
+TRUST_API_RATE_LIMIT = 2  # trust service stage steady-state requests per second, shared by all consumers
+TRUST_API_BURST_LIMIT = 10  # trust service stage token bucket capacity
 API_HANDLER_LAMBDA_MEMORY_SIZE = 192  # MB
 API_HANDLER_LAMBDA_TIMEOUT = 30  # seconds
+REDRIVE_LAMBDA_TIMEOUT = 300  # seconds
 POWERTOOLS_SERVICE_NAME = 'POWERTOOLS_SERVICE_NAME'
 SERVICE_NAME = 'IamPortfolio'
 SERVICE_NAME_TAG = 'service'
@@ -20,9 +37,45 @@ BUILD_FOLDER = '.build/lambdas/'
 DEMO_FOLDER = '.build/demo/'
 COMMON_LAYER_BUILD_FOLDER = '.build/common_layer'
 ENVIRONMENT = 'dev'
+# fast synth mode fingerprints assets by these sources instead of hashing the build folders, see cdk.demo.assets.
+# artifacts.py slims every build folder, so it's a source of every asset
+FAST_SYNTH_CONTEXT_KEY = 'fast_synth'
+LAMBDA_SOURCES = ('catalog_backend', 'cdk/demo/artifacts.py')
+# catalog_backend modules the demo function imports, 'make build' copies them next to the demo package
+DEMO_SHARED_MODULES = ('catalog_backend/__init__.py', 'catalog_backend/logic/__init__.py', 'catalog_backend/logic/rate_limiter.py')
+DEMO_SOURCES = ('demo', *DEMO_SHARED_MODULES, 'cdk/demo/artifacts.py')
+COMMON_LAYER_SOURCES = ('poetry.lock', 'pyproject.toml', 'cdk/demo/artifacts.py')
+# 'make build' records the fingerprint of the sources every build folder was built from, fast synth fails once they no longer match
+BUILD_FINGERPRINTS_FILE = '.build/fingerprints.json'
+BUILD_SOURCES = {BUILD_FOLDER: LAMBDA_SOURCES, DEMO_FOLDER: DEMO_SOURCES, COMMON_LAYER_BUILD_FOLDER: COMMON_LAYER_SOURCES}
+# unzipped size budgets of the slimmed artifacts, a build past one fails instead of shipping a slower cold start, see cdk.demo.artifacts
+ARTIFACTS_SCRIPT = 'artifacts.py'
+LAMBDA_ARTIFACT_BUDGET_MB = 2
+COMMON_LAYER_BUDGET_MB = 40
 SNS_TOPIC = 'CatalogTopic'
 SQS = 'CatalogSQS'
+DELETE_SQS = 'CatalogDeleteSQS'
+# CloudFormation custom resource request types routed to each SQS lane, deletes get their own lane as they block stack teardown
+PROVISION_LANE_REQUEST_TYPES = ['Create', 'Update']
+DELETE_LANE_REQUEST_TYPES = ['Delete']
+# SQS event source maximum concurrency, minimum is 2. Every invocation reads and rewrites the service role trust policy,
+# together the lanes cap the concurrent IAM writers so a burst is queued instead of throttled by IAM
+PROVISION_LANE_MAX_CONCURRENCY = 5
+DELETE_LANE_MAX_CONCURRENCY = 5
+# provisioned concurrency of the governance function's alias, scaled on the lanes' backlog up to the lanes' combined maximum concurrency
+GOVERNANCE_PROVISIONED_CONCURRENCY = False
+GOVERNANCE_PROVISIONED_MIN_CAPACITY = 1
+GOVERNANCE_SCALE_OUT_BACKLOG = 10  # visible messages across both lanes that scale to half the cap
+GOVERNANCE_FULL_SCALE_BACKLOG = 100  # visible messages across both lanes that scale to the cap
+GOVERNANCE_FULL_SCALE_MESSAGE_AGE = 60  # seconds, a lane's oldest message waiting longer scales to the cap as well
+# p99 time from a request reaching its queue until its CloudFormation response, per request type
+END_TO_END_LATENCY_SLO_SECONDS = 60
+END_TO_END_LATENCY_SLO_EVALUATION_MINUTES = 5
+END_TO_END_LATENCY_SLO_BREACHING_MINUTES = 3
+TRUST_POLICY_QUOTA = 2048  # the account's role trust policy length quota, raise it here after raising it in Service Quotas
+TRUST_POLICY_HEADROOM_ALARM_PERCENT = 20  # alarm once the service role trust policy has less room left for new consumers
 PORTFOLIO_ID = 'AutoIamPortfolio'
 MONITORING_TOPIC = 'monitoringTopic'
 PORTFOLIO_ID_ENV_VAR = 'PORTFOLIO_ID'
+ORGANIZATION_ID_CONTEXT_KEY = 'organization_id'  # set with 'cdk synth -c organization_id=o-...' or in the cdk.json context
 CUSTOM_RESOURCE_TYPE = 'Custom::PlatformEngGovernanceEnabler'
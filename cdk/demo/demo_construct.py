@@ -6,16 +6,27 @@ from aws_cdk.aws_logs import RetentionDays
 from constructs import Construct
 
 import cdk.demo.constants as constants
+from cdk.demo.assets import function_code
 
 
 # this lambda is used to invoke after the product is deployed
 class DemoConstruct(Construct):
-    def __init__(self, scope: Construct, id: str, common_layer: PythonLayerVersion, api_url: str, assume_role_arn: str, **kwargs) -> None:
+    def __init__(
+        self,
+        scope: Construct,
+        id: str,
+        common_layer: PythonLayerVersion,
+        api_url: str,
+        assume_role_arn: str,
+        api_rate_limit: float = constants.TRUST_API_RATE_LIMIT,
+        api_burst_limit: int = constants.TRUST_API_BURST_LIMIT,
+        **kwargs,
+    ) -> None:
         super().__init__(scope, id, **kwargs)
         self.id_ = id
         self.lambda_role = self._build_lambda_role()
         self.common_layer = common_layer
-        self.create_order_func = self._build_demo_lambda(self.lambda_role, api_url, assume_role_arn)
+        self.create_order_func = self._build_demo_lambda(self.lambda_role, api_url, assume_role_arn, api_rate_limit, api_burst_limit)
 
     def _build_lambda_role(self) -> iam.Role:
         return iam.Role(
@@ -45,17 +56,20 @@ class DemoConstruct(Construct):
             },
         )
 
-    def _build_demo_lambda(self, role: iam.Role, api_url: str, assume_role_arn: str) -> _lambda.Function:
+    def _build_demo_lambda(self, role: iam.Role, api_url: str, assume_role_arn: str, api_rate_limit: float, api_burst_limit: int) -> _lambda.Function:
         function = _lambda.Function(
             self,
             'DemoFunction',
             runtime=_lambda.Runtime.PYTHON_3_13,
-            code=_lambda.Code.from_asset(constants.DEMO_FOLDER),
+            code=function_code(self, constants.DEMO_FOLDER, *constants.DEMO_SOURCES),
             handler='demo.handlers.handler.lambda_handler',
             environment={
                 constants.POWERTOOLS_SERVICE_NAME: 'demo',  # for logger, tracer and metrics
                 constants.POWER_TOOLS_LOG_LEVEL: 'INFO',  # for logger
+                'POWERTOOLS_METRICS_NAMESPACE': constants.METRICS_NAMESPACE,  # for metrics
                 'API_URL': api_url,
+                'API_RATE_LIMIT': str(api_rate_limit),  # the client paces its requests under the stage's throttling limits
+                'API_BURST_LIMIT': str(api_burst_limit),
                 'PRODUCT_VERSION': '1.0.0',
                 'CONSUMER_NAME': 'ran',  # this will be used to find the path in the SSM parameter store to get all the role ARNs to assume
             },
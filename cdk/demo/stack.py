@@ -1,3 +1,5 @@
+from typing import Optional
+
 from aws_cdk import Aspects, RemovalPolicy, Stack, Tags
 from aws_cdk import aws_lambda as _lambda
 from aws_cdk.aws_lambda_python_alpha import PythonLayerVersion
@@ -5,9 +7,11 @@ from cdk_nag import AwsSolutionsChecks, NagSuppressions
 from constructs import Construct
 
 import cdk.demo.constants as constants
+from cdk.demo.assets import layer_bundling
 from cdk.demo.catalog.governance_construct import GovernanceConstruct
 from cdk.demo.catalog.observability_construct import ObservabilityConstruct
 from cdk.demo.catalog.portfolio_construct import PortfolioConstruct
+from cdk.demo.catalog.views_construct import ViewsConstruct
 from cdk.demo.constants import OWNER_TAG, SERVICE_NAME, SERVICE_NAME_TAG
 from cdk.demo.demo_construct import DemoConstruct
 from cdk.demo.trust_service import TrustServiceConstruct
@@ -15,7 +19,15 @@ from cdk.demo.utils import get_construct_name, get_username
 
 
 class ServiceStack(Stack):
-    def __init__(self, scope: Construct, id: str, **kwargs) -> None:
+    def __init__(
+        self,
+        scope: Construct,
+        id: str,
+        organization_id: Optional[str] = None,
+        snap_start: bool = constants.GOVERNANCE_SNAP_START,
+        provisioned_concurrency: bool = constants.GOVERNANCE_PROVISIONED_CONCURRENCY,
+        **kwargs,
+    ) -> None:
         super().__init__(scope, id, **kwargs)
         self._add_stack_tags()
         self.common_layer = self._build_common_layer()
@@ -29,6 +41,15 @@ class ServiceStack(Stack):
             get_construct_name(stack_prefix=id, construct_name='Governance'),
             self.common_layer,
             self.trust_service.cross_account_access_role,
+            organization_id=organization_id,
+            snap_start=snap_start,
+            provisioned_concurrency=provisioned_concurrency,
+        )
+        self.views = ViewsConstruct(
+            self,
+            get_construct_name(stack_prefix=id, construct_name='Views'),
+            self.common_layer,
+            self.governance.api_db.db,
         )
         self.portfolio = PortfolioConstruct(
             self,
@@ -40,8 +61,8 @@ class ServiceStack(Stack):
             self,
             get_construct_name(stack_prefix=id, construct_name='Observability'),
             db=self.governance.api_db.db,
-            functions=[self.governance.governance_lambda],
-            visibility_queue=self.governance.queue,
+            functions=[self.governance.governance_lambda, self.views.views_lambda],
+            visibility_queues={'Visibility Queue': self.governance.queue, 'Visibility Delete Queue': self.governance.delete_queue},
             visibility_topic=self.governance.sns_topic,
         )
 
@@ -51,6 +72,8 @@ class ServiceStack(Stack):
             self.common_layer,
             self.trust_service.rest_api.url,
             self.trust_service.cross_account_access_role.role_arn,
+            api_rate_limit=self.trust_service.throttling_rate_limit,
+            api_burst_limit=self.trust_service.throttling_burst_limit,
         )
 
         # add security check
@@ -62,6 +85,7 @@ class ServiceStack(Stack):
             constants.LAMBDA_LAYER_NAME,
             entry=constants.COMMON_LAYER_BUILD_FOLDER,
             compatible_runtimes=[_lambda.Runtime.PYTHON_3_13],
+            bundling=layer_bundling(self),
             removal_policy=RemovalPolicy.DESTROY,
         )
 
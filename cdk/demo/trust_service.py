@@ -11,9 +11,20 @@ import cdk.demo.constants as constants
 
 # this is the service that will be shared with other accounts, other accounts will access its API GW endpoint protected by IAM auth
 class TrustServiceConstruct(Construct):
-    def __init__(self, scope: Construct, id: str, common_layer: PythonLayerVersion, **kwargs) -> None:
+    def __init__(
+        self,
+        scope: Construct,
+        id: str,
+        common_layer: PythonLayerVersion,
+        throttling_rate_limit: float = constants.TRUST_API_RATE_LIMIT,
+        throttling_burst_limit: int = constants.TRUST_API_BURST_LIMIT,
+        **kwargs,
+    ) -> None:
         super().__init__(scope, id, **kwargs)
         self.id_ = id
+        # stage wide token bucket, clients pace themselves with the same limits, see demo/handlers/orders_client.py
+        self.throttling_rate_limit = throttling_rate_limit
+        self.throttling_burst_limit = throttling_burst_limit
         self.lambda_role = self._build_lambda_role()
         self.common_layer = common_layer
         self.rest_api = self._build_api_gw()
@@ -64,7 +75,9 @@ class TrustServiceConstruct(Construct):
             'trust-service-rest-api',
             rest_api_name='Trust Service Rest API',
             description='This service handles /api/orders requests',
-            deploy_options=aws_apigateway.StageOptions(throttling_rate_limit=2, throttling_burst_limit=10),
+            deploy_options=aws_apigateway.StageOptions(
+                throttling_rate_limit=self.throttling_rate_limit, throttling_burst_limit=self.throttling_burst_limit
+            ),
             cloud_watch_role=False,
         )
 
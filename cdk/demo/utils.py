@@ -1,7 +1,9 @@
 import getpass
 import os
 from pathlib import Path
+from typing import Optional
 
+from constructs import Construct
 from git import Repo
 
 import cdk.demo.constants as constants
@@ -29,3 +31,17 @@ def get_stack_name() -> str:
 
 def get_construct_name(stack_prefix: str, construct_name: str) -> str:
     return f'{stack_prefix}-{construct_name}'[0:64]
+
+
+def get_organization_id(scope: Construct, organization_id: Optional[str] = None) -> str:
+    """
+    The AWS organization id, from the explicit override or the 'organization_id' CDK context value.
+    Synth never calls AWS for it, pass 'cdk synth -c organization_id=o-...' or keep it in the context of cdk.json or cdk.context.json.
+    """
+    organization_id = organization_id or scope.node.try_get_context(constants.ORGANIZATION_ID_CONTEXT_KEY)
+    if not organization_id:
+        raise ValueError(
+            f'organization id is not set, pass "-c {constants.ORGANIZATION_ID_CONTEXT_KEY}=o-..." or add it to the cdk.json context, '
+            'it is the Organization.Id of "aws organizations describe-organization"'
+        )
+    return organization_id
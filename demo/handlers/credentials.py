@@ -0,0 +1,128 @@
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import boto3
+from aws_lambda_powertools.logging import Logger
+from aws_lambda_powertools.utilities import parameters
+from botocore.credentials import DeferredRefreshableCredentials
+
+logger: Logger = Logger()
+
+SSM_MAX_AGE_SECONDS = 300  # role ARNs and external ids rarely change, re-read them every 5 minutes at most
+
+
+@dataclass(frozen=True)
+class Credentials:
+    access_key: str
+    secret_key: str
+    session_token: str
+    expiration: datetime
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class CredentialStats:
+    """Thread safe counters of credential cache hits and STS calls, the handler turns them into metrics of its invocation."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.sts_calls = 0
+
+    def record_cache_hit(self) -> None:
+        with self._lock:
+            self.cache_hits += 1
+
+    def record_sts_call(self) -> None:
+        with self._lock:
+            self.sts_calls += 1
+
+    def take(self) -> tuple[int, int]:
+        # returns the cache hits and STS calls since the last take
+        with self._lock:
+            counts = self.cache_hits, self.sts_calls
+            self.cache_hits = self.sts_calls = 0
+            return counts
+
+
+stats = CredentialStats()
+
+
+class RefreshingCredentials:
+    """
+    Credentials cached across warm invocations and refreshed on the request path by botocore's RefreshableCredentials.
+    Once they expire within 15 minutes one caller refreshes them while the others keep using the cached ones, a failed refresh is retried
+    by the next caller. Within 10 minutes of expiry every caller waits for the refresh.
+    """
+
+    def __init__(self, fetch: Callable[[], Credentials], clock: Callable[[], datetime] = _utc_now, credential_stats: CredentialStats = stats) -> None:
+        self._fetch = fetch
+        self._stats = credential_stats
+        self._current: Optional[Credentials] = None
+        self._refreshable = DeferredRefreshableCredentials(self._refresh, method='assume-role', time_fetcher=clock)
+
+    def _refresh(self) -> dict[str, str]:
+        # botocore calls it holding its refresh lock, so only one refresh runs at a time
+        self._current = self._fetch()
+        return {
+            'access_key': self._current.access_key,
+            'secret_key': self._current.secret_key,
+            'token': self._current.session_token,
+            'expiry_time': self._current.expiration.isoformat(),
+        }
+
+    def get(self) -> Credentials:
+        cached = self._current
+        self._refreshable.get_frozen_credentials()  # refreshes them first when they expire soon
+        if cached is not None and cached is self._current:
+            self._stats.record_cache_hit()
+        return self._current  # type: ignore[return-value]
+
+
+def get_ssm_parameters(consumer_name: str, product_version: str) -> tuple[str, str, str]:
+    # powertools caches the parameter in memory for max_age seconds
+    ssm_dict = json.loads(parameters.get_parameter(f'/orders/{consumer_name}/{product_version}', max_age=SSM_MAX_AGE_SECONDS))  # type: ignore[arg-type]
+    return ssm_dict['mediatorRoleArn'], ssm_dict['ordersAssumeRoleArn'], ssm_dict['ordersExternalId']
+
+
+def assume_role(role_arn: str, session_name: str, external_id: Optional[str] = None, credentials: Optional[Credentials] = None) -> Credentials:
+    client_credentials = {}
+    if credentials:
+        client_credentials = {
+            'aws_access_key_id': credentials.access_key,
+            'aws_secret_access_key': credentials.secret_key,
+            'aws_session_token': credentials.session_token,
+        }
+    client = boto3.client('sts', **client_credentials)
+    params = {'RoleArn': role_arn, 'RoleSessionName': session_name}
+    if external_id:
+        params['ExternalId'] = external_id
+    response = client.assume_role(**params)
+    stats.record_sts_call()
+    assumed = response['Credentials']
+    return Credentials(assumed['AccessKeyId'], assumed['SecretAccessKey'], assumed['SessionToken'], assumed['Expiration'])
+
+
+def assume_role_chain(mediator_role_arn: str, orders_role_arn: str, external_id: str) -> Credentials:
+    logger.info('assuming mediator role and orders role')
+    mediator = assume_role(mediator_role_arn, 'mysession')
+    return assume_role(orders_role_arn, 'secondSession', external_id=external_id, credentials=mediator)
+
+
+# one cache per role chain, kept for the lifetime of the execution environment
+_role_chains: dict[tuple[str, str, str], RefreshingCredentials] = {}
+_role_chains_lock = threading.Lock()
+
+
+def get_orders_credentials(consumer_name: str, product_version: str) -> Credentials:
+    chain = get_ssm_parameters(consumer_name, product_version)
+    with _role_chains_lock:
+        cache = _role_chains.get(chain)
+        if cache is None:
+            cache = _role_chains[chain] = RefreshingCredentials(lambda: assume_role_chain(*chain))
+    return cache.get()
@@ -0,0 +1,132 @@
+import hashlib
+import hmac
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Optional
+from urllib.parse import urlparse
+
+import requests
+from botocore import auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials as BotocoreCredentials
+from requests.adapters import HTTPAdapter
+
+from catalog_backend.logic.rate_limiter import TokenBucket
+from demo.handlers.credentials import Credentials
+from demo.handlers.throttling import RETRYABLE_STATUS_CODES, ThrottleStats, backoff_seconds
+
+_EXECUTE_API_HOST = re.compile(r'\.execute-api\.(?P<region>[a-z0-9-]+)\.amazonaws\.com$')
+
+
+def region_of(url: str) -> str:
+    """The region of an API Gateway URL, custom domains fall back to the function's region."""
+    match = _EXECUTE_API_HOST.search(urlparse(url).hostname or '')
+    if match:
+        return match['region']
+    return os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION') or 'us-east-1'
+
+
+@lru_cache(maxsize=16)
+def _signing_key(secret_key: str, date_stamp: str, region: str, service: str) -> bytes:
+    # four HMACs that only change with the day, region or credentials, derived once instead of per request
+    key = f'AWS4{secret_key}'.encode()
+    for part in (date_stamp, region, service, 'aws4_request'):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    return key
+
+
+class _CachedKeySigner(auth.SigV4Auth):
+    # botocore builds the canonical request, only the date-scoped signing key comes from the cache
+    def signature(self, string_to_sign: str, request: AWSRequest) -> str:
+        key = _signing_key(self.credentials.secret_key, request.context['timestamp'][:8], self._region_name, self._service_name)
+        return self._sign(key, string_to_sign, hex=True)
+
+
+class SigV4Auth(requests.auth.AuthBase):
+    """Signs requests with botocore's SigV4 signer and a cached date-scoped signing key, credentials are read from the provider per request."""
+
+    def __init__(self, credentials: Callable[[], Credentials], region: str, service: str = 'execute-api'):
+        self.credentials = credentials
+        self.region = region
+        self.service = service
+
+    def sign(self, method: str, url: str, body: bytes) -> dict[str, str]:
+        """The headers that sign the request."""
+        credentials = self.credentials()
+        request = AWSRequest(method=method, url=url, data=body)
+        signer = _CachedKeySigner(
+            BotocoreCredentials(credentials.access_key, credentials.secret_key, credentials.session_token), self.service, self.region
+        )
+        signer.add_auth(request)
+        return dict(request.headers.items())
+
+    def __call__(self, request: requests.PreparedRequest) -> requests.PreparedRequest:
+        body = request.body or b''
+        body = body.encode() if isinstance(body, str) else body
+        request.headers.update(self.sign(request.method or 'GET', request.url or '', body))  # type: ignore[arg-type]
+        return request
+
+
+class OrdersClient:
+    """
+    Client of the IAM protected orders API.
+    Connections are pooled and kept alive across calls and warm invocations, only the first call to a host pays for the TLS handshake.
+    With 'rate_limit' set, requests are paced through a client side model of the stage's token bucket.
+    429 and 5xx responses are retried with jittered exponential backoff, 'stats' reports the achieved throughput and throttles.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        credentials: Callable[[], Credentials],
+        region: Optional[str] = None,
+        timeout: float = 10,
+        pool_size: int = 10,
+        session: Optional[requests.Session] = None,
+        rate_limit: Optional[float] = None,
+        burst_limit: Optional[int] = None,
+        max_retries: int = 4,
+        backoff_base_seconds: float = 0.1,
+        backoff_cap_seconds: float = 5,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.orders_url = f'{api_url}api/orders'
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.auth = SigV4Auth(credentials, region or region_of(api_url))
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.bucket = TokenBucket(rate_limit, burst_limit or max(1, rate_limit), sleep=sleep) if rate_limit else None
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_cap_seconds = backoff_cap_seconds
+        self._sleep = sleep
+        self.stats = ThrottleStats()
+
+    def _retry_delay(self, response: requests.Response, attempt: int) -> float:
+        delay = backoff_seconds(attempt, self.backoff_base_seconds, self.backoff_cap_seconds)
+        retry_after = response.headers.get('Retry-After', '')
+        return max(delay, float(retry_after)) if retry_after.isdigit() else delay
+
+    def post_order(self, order: dict[str, Any], signed: bool = True) -> requests.Response:
+        """Posts an order, returns the last response once it succeeds, fails with a non retryable status or runs out of retries."""
+        for attempt in range(self.max_retries + 1):
+            if self.bucket:
+                self.stats.record_pacing(self.bucket.acquire())
+            response = self.session.post(self.orders_url, json=order, auth=self.auth if signed else None, timeout=self.timeout)
+            retry = response.status_code in RETRYABLE_STATUS_CODES and attempt < self.max_retries
+            self.stats.record(response.status_code, retried=retry)
+            if not retry:
+                return response
+            self._sleep(self._retry_delay(response, attempt))
+        raise AssertionError('unreachable')  # pragma: no cover
+
+    def post_orders(self, orders: list[dict[str, Any]], max_workers: int = 4) -> list[requests.Response]:
+        """Submits the orders concurrently over the pooled connections, responses are returned in the order of 'orders'."""
+        with ThreadPoolExecutor(max_workers=min(max_workers, self.pool_size)) as executor:
+            return list(executor.map(self.post_order, orders))
@@ -0,0 +1,51 @@
+import random
+import threading
+import time
+from typing import Callable
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def backoff_seconds(attempt: int, base_seconds: float, cap_seconds: float) -> float:
+    # exponential backoff with full jitter, so throttled clients don't retry in lockstep
+    return random.uniform(0, min(cap_seconds, base_seconds * 2**attempt))
+
+
+class ThrottleStats:
+    """Thread safe counters of a client's requests, throttles and achieved throughput."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._started_at = clock()
+        self.requests = 0  # HTTP requests sent, retries included
+        self.succeeded = 0
+        self.throttled = 0  # 429 responses
+        self.server_errors = 0  # 5xx responses
+        self.retries = 0
+        self.paced_seconds = 0.0  # time spent waiting for the client side token bucket
+
+    def record(self, status_code: int, retried: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.succeeded += status_code < 400
+            self.throttled += status_code == 429
+            self.server_errors += status_code >= 500
+            self.retries += retried
+
+    def record_pacing(self, seconds: float) -> None:
+        with self._lock:
+            self.paced_seconds += seconds
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            elapsed = max(self._clock() - self._started_at, 1e-9)
+            return {
+                'requests': self.requests,
+                'succeeded': self.succeeded,
+                'throttled': self.throttled,
+                'server_errors': self.server_errors,
+                'retries': self.retries,
+                'paced_seconds': round(self.paced_seconds, 3),
+                'requests_per_second': round(self.succeeded / elapsed, 2),
+            }
@@ -0,0 +1,17 @@
+import os
+
+import pytest
+
+from tests.local_aws import LocalAws, reset_caches
+
+# crhelper creates its boto3 clients when the handler module is imported, without a region it fails every later request
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+
+@pytest.fixture
+def local_aws(monkeypatch):
+    with LocalAws() as aws:
+        for name, value in aws.setup_governance_service().items():
+            monkeypatch.setenv(name, value)
+        reset_caches()
+        yield aws
@@ -0,0 +1,102 @@
+"""
+Micro-benchmark of the Table resource DAL against the low-level client DAL.
+
+The codec section isolates item serialization, the DAL section runs full DAL calls through botocore against the local DynamoDB stand-in.
+Usage: python -m tests.benchmark.dal_paths [--items 400] [--shards 4] [--page 50]
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Callable
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from catalog_backend.dal.dynamo_client_dal_handler import DynamoClientDalHandler, entry_to_wire, from_wire
+from catalog_backend.dal.dynamo_dal_handler import DynamoDalHandler
+from tests.benchmark.item_size import sample_entries
+from tests.local_aws import LocalAws, reset_caches
+
+TABLE_NAME = 'governance'
+PORTFOLIO_ID = 'port-abcdefghijklm'
+
+
+def _microseconds_per_call(function: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return round((time.perf_counter() - start) / repeat * 1_000_000, 2)
+
+
+def _function_calls(function: Callable[[], Any]) -> int:
+    # python and builtin function calls made by one call, unlike its timing it doesn't depend on the machine or its load
+    calls = 0
+
+    def count(frame: Any, event: str, arg: Any) -> None:
+        nonlocal calls
+        calls += event in ('call', 'c_call')
+
+    sys.setprofile(count)
+    try:
+        function()
+    finally:
+        sys.setprofile(None)
+    return calls
+
+
+def _codec_paths() -> dict[str, Callable[[], Any]]:
+    entry = sample_entries(1)[0]
+    serializer, deserializer = TypeSerializer(), TypeDeserializer()
+    wire_item = entry_to_wire(entry)
+    return {
+        'resource_serialize': lambda: {k: serializer.serialize(v) for k, v in entry.model_dump().items()},
+        'client_serialize': lambda: entry_to_wire(entry),
+        'resource_deserialize': lambda: {k: deserializer.deserialize(v) for k, v in wire_item.items()},
+        'client_deserialize': lambda: from_wire(wire_item),
+    }
+
+
+def codec_costs(repeat: int = 2000) -> dict[str, float]:
+    return {f'{path}_us': _microseconds_per_call(function, repeat) for path, function in _codec_paths().items()}
+
+
+def codec_calls() -> dict[str, int]:
+    """Function calls of serializing and deserializing a product entry on each path, a deterministic proxy of their cost."""
+    return {f'{path}_calls': _function_calls(function) for path, function in _codec_paths().items()}
+
+
+def dal_costs(dal_handler_cls: type[DynamoDalHandler], items: int, shards: int, page: int) -> dict[str, float]:
+    with LocalAws() as local_aws:
+        local_aws.dynamodb.create_table(TABLE_NAME, partition_key='portfolio_id', sort_key='product_stack_id')
+        reset_caches()
+        dal_handler = dal_handler_cls(TABLE_NAME, shard_count=shards)
+        entries = iter(sample_entries(items))
+
+        def add() -> None:
+            entry = next(entries)
+            dal_handler.add_product_deployment(
+                PORTFOLIO_ID, entry.product_stack_id, entry.name, entry.version, entry.account_id, entry.consumer_name, entry.region
+            )
+
+        add_us = _microseconds_per_call(add, items)
+        list_us = _microseconds_per_call(lambda: dal_handler.list_product_deployments(PORTFOLIO_ID, limit=page), 50)
+    return {'add_us': add_us, 'list_page_us': list_us}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='compare the resource and low-level client DAL paths')
+    parser.add_argument('--items', type=int, default=400)
+    parser.add_argument('--shards', type=int, default=4)
+    parser.add_argument('--page', type=int, default=50)
+    args = parser.parse_args()
+    report = {
+        'codec': {**codec_costs(), **codec_calls()},
+        'resource_dal': dal_costs(DynamoDalHandler, args.items, args.shards, args.page),
+        'client_dal': dal_costs(DynamoClientDalHandler, args.items, args.shards, args.page),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
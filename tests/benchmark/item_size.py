@@ -0,0 +1,82 @@
+"""
+Compares the DynamoDB item size and capacity units of the legacy and compact ProductEntry layouts.
+
+Usage: python -m tests.benchmark.item_size [--items 1000]
+"""
+
+import argparse
+import json
+import math
+from decimal import Decimal
+from typing import Any
+
+from catalog_backend.dal import codec
+from catalog_backend.dal.models.db import ProductEntry
+from tests.benchmark.traffic import stack_id
+
+WRITE_UNIT_BYTES = 1024
+READ_UNIT_BYTES = 4096
+
+
+def _value_size(value: Any) -> int:
+    # https://docs.aws.amazon.com/amazondynamodb/latest/developerguide/CapacityUnitCalculations.html
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, (int, float, Decimal)):
+        digits = Decimal(value).normalize().as_tuple().digits
+        return math.ceil(len(digits) / 2) + 1
+    raise TypeError(f'unsupported attribute type {type(value)}')
+
+
+def item_size(item: dict[str, Any]) -> int:
+    return sum(len(name.encode()) + _value_size(value) for name, value in item.items())
+
+
+def write_units(item: dict[str, Any]) -> int:
+    return math.ceil(item_size(item) / WRITE_UNIT_BYTES)
+
+
+def query_read_units(items: list[dict[str, Any]]) -> int:
+    # a strongly consistent query is charged for the total size of the items it reads, not per item
+    return math.ceil(sum(item_size(item) for item in items) / READ_UNIT_BYTES)
+
+
+def sample_entries(count: int) -> list[ProductEntry]:
+    return [
+        ProductEntry(
+            portfolio_id='port-abcdefghijklm',
+            product_stack_id=stack_id(index),
+            name='CI/CD IAM Role Product',
+            version='1.0.0',
+            account_id='123456789012',
+            consumer_name='Ran isenberg',
+            region='us-east-1',
+            created_at=1716017284 + index,
+        )
+        for index in range(count)
+    ]
+
+
+def compare(entries: list[ProductEntry]) -> dict[str, Any]:
+    layouts = {'legacy': [entry.model_dump() for entry in entries], 'compact': [codec.encode(entry) for entry in entries]}
+    report: dict[str, Any] = {
+        name: {
+            'avg_item_bytes': round(sum(item_size(item) for item in items) / len(items), 1),
+            'write_units': sum(write_units(item) for item in items),
+            'query_read_units': query_read_units(items),
+        }
+        for name, items in layouts.items()
+    }
+    report['item_bytes_saved_pct'] = round(100 * (1 - report['compact']['avg_item_bytes'] / report['legacy']['avg_item_bytes']), 1)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='compare legacy and compact product entry item sizes')
+    parser.add_argument('--items', type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(compare(sample_entries(args.items)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+"""
+Macro load test of the whole SNS -> SQS -> Lambda path, in process against the local AWS stand-ins.
+
+A seeded stream of create, update and delete custom resource requests is published to an emulated topic. The topic fans them out
+to the lanes' emulated queues with the stacks' filter policies, and emulated event source mappings invoke handle_product_event
+with the lanes' batch size and maximum concurrency. Time is virtual: arrivals follow a Poisson process, every invocation really runs
+and takes as long as it measured, so an hour of traffic takes only the handler's own processing time.
+
+Usage: python -m tests.benchmark.load [--events-per-hour 10000] [--minutes 10] [--trust-ratio 0.5] [--faults degraded] [--window 60]
+"""
+
+import argparse
+import contextlib
+import heapq
+import itertools
+import json
+import os
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Any, Optional
+
+from cdk.demo import constants
+from tests.benchmark.stats import summarize
+from tests.benchmark.stress import SCENARIOS
+from tests.benchmark.traffic import product_body
+from tests.integration.utils import create_sqs_records
+from tests.local_aws import LocalAws, LocalLambdaContext, reset_caches
+
+# share of requests per type, updates and deletes need a stack that was created before and has no request in flight
+REQUEST_MIX = {'Create': 0.5, 'Update': 0.2, 'Delete': 0.3}
+# the lanes' queue and event source mapping settings, see GovernanceConstruct
+LANES = {
+    'provision': (constants.PROVISION_LANE_REQUEST_TYPES, constants.PROVISION_LANE_MAX_CONCURRENCY),
+    'delete': (constants.DELETE_LANE_REQUEST_TYPES, constants.DELETE_LANE_MAX_CONCURRENCY),
+}
+BATCH_SIZE = 1
+VISIBILITY_TIMEOUT_SECONDS = 300
+MAX_RECEIVE_COUNT = 3
+
+
+class Message:
+    def __init__(self, body: str, sent_at: float) -> None:
+        self.message_id = str(uuid.uuid4())
+        self.body = body
+        self.request_id = json.loads(body)['RequestId']
+        self.sent_at = sent_at
+        self.visible_at = sent_at
+        self.first_received_at: Optional[float] = None
+        self.receive_count = 0
+
+
+class EmulatedQueue:
+    """An SQS queue with a redrive policy, messages a failed invocation returns are visible again after the visibility timeout."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.messages: list[Message] = []
+        self.dead_letters: list[Message] = []
+
+    def send(self, message: Message) -> None:
+        self.messages.append(message)
+
+    def receive(self, now: float, max_messages: int) -> list[Message]:
+        received = []
+        for message in [message for message in self.messages if message.visible_at <= now]:
+            self.messages.remove(message)
+            if message.receive_count >= MAX_RECEIVE_COUNT:
+                self.dead_letters.append(message)
+                continue
+            message.receive_count += 1
+            message.first_received_at = message.first_received_at if message.first_received_at is not None else now
+            received.append(message)
+            if len(received) == max_messages:
+                break
+        return received
+
+    def return_message(self, message: Message, now: float) -> None:
+        message.visible_at = now + VISIBILITY_TIMEOUT_SECONDS
+        self.messages.append(message)
+
+
+class EmulatedTopic:
+    """An SNS topic with raw message delivery, every subscription filters on the body's ResourceType and RequestType."""
+
+    def __init__(self) -> None:
+        self.subscriptions: list[tuple[EmulatedQueue, list[str]]] = []
+        self.filtered = 0
+
+    def subscribe(self, queue: EmulatedQueue, request_types: list[str]) -> None:
+        self.subscriptions.append((queue, request_types))
+
+    def publish(self, body: str, now: float) -> None:
+        request = json.loads(body)
+        matches = [
+            queue
+            for queue, request_types in self.subscriptions
+            if request.get('ResourceType') == constants.CUSTOM_RESOURCE_TYPE and request.get('RequestType') in request_types
+        ]
+        self.filtered += 0 if matches else 1
+        for queue in matches:
+            queue.send(Message(body, now))
+
+
+class StackPopulation:
+    """The product stacks the load creates, updates and deletes, only stacks without a request in flight get another one."""
+
+    def __init__(self, rng: random.Random, trust_ratio: float, mix: dict[str, float]) -> None:
+        self.rng = rng
+        self.trust_ratio = trust_ratio
+        self.mix = mix
+        self.idle: dict[int, bool] = {}  # stack index to whether it has a trust role
+        self.in_flight: dict[str, tuple[str, int, bool]] = {}  # request id to the request type, stack index and trust role
+        self._next_index = itertools.count()
+
+    def next_request(self) -> str:
+        request_type = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if request_type == 'Create' or not self.idle:
+            request_type, index, with_trust_role = 'Create', next(self._next_index), self.rng.random() < self.trust_ratio
+        else:
+            index = self.rng.choice(list(self.idle))
+            with_trust_role = self.idle.pop(index)
+        request = json.loads(product_body(request_type, index, with_trust_role))
+        request['RequestId'] = str(uuid.uuid4())
+        self.in_flight[request['RequestId']] = (request_type, index, with_trust_role)
+        return json.dumps(request)
+
+    def completed(self, request_id: str, succeeded: bool) -> None:
+        request_type, index, with_trust_role = self.in_flight.pop(request_id)
+        # a failed create rolls back and leaves no stack behind, a deleted stack is gone
+        if (request_type == 'Create' and not succeeded) or (request_type == 'Delete' and succeeded):
+            return
+        self.idle[index] = with_trust_role
+
+
+def _sqs_event(messages: list[Message], epoch: float) -> dict[str, Any]:
+    records = []
+    for message in messages:
+        (record,) = create_sqs_records(message.body)['Records']
+        record['messageId'] = message.message_id
+        record['attributes'] = {
+            **record['attributes'],
+            'ApproximateReceiveCount': str(message.receive_count),
+            'SentTimestamp': str(int((epoch + message.sent_at) * 1000)),
+            'ApproximateFirstReceiveTimestamp': str(int((epoch + (message.first_received_at or message.sent_at)) * 1000)),
+        }
+        records.append(record)
+    return {'Records': records}
+
+
+def _new_window() -> dict[str, Any]:
+    return {'arrivals': 0, 'statuses': [], 'queue_ages': []}
+
+
+def _window_report(window_start: float, window_seconds: float, samples: dict[str, Any], backlog: int) -> dict[str, Any]:
+    processed = len(samples['statuses'])
+    errors = sum(1 for status in samples['statuses'] if status != 'SUCCESS')
+    return {
+        'window_start_seconds': window_start,
+        'arrivals': samples['arrivals'],
+        'processed': processed,
+        'throughput_per_second': round(processed / window_seconds, 2),
+        'errors': errors,
+        'error_rate': round(errors / processed, 4) if processed else 0.0,
+        'queue_age_seconds': summarize(samples['queue_ages']),
+        'backlog': backlog,
+    }
+
+
+class PipelineEmulation:
+    """
+    Discrete event emulation of the topic, the lanes' queues and their event source mappings on a virtual clock.
+    The handler runs for real, one invocation at a time, its CfnResource keeps per request state and isn't safe to invoke concurrently.
+    """
+
+    def __init__(
+        self,
+        local_aws: LocalAws,
+        population: StackPopulation,
+        window_seconds: float,
+        batch_size: int,
+        max_concurrency: dict[str, int],
+        service_time_scale: float,
+    ) -> None:
+        self.local_aws = local_aws
+        self.population = population
+        self.window_seconds = window_seconds
+        self.batch_size = batch_size
+        self.service_time_scale = service_time_scale
+        self.topic = EmulatedTopic()
+        self.queues = {lane: EmulatedQueue(lane) for lane in LANES}
+        self.free_workers = {lane: max_concurrency.get(lane, lane_concurrency) for lane, (_, lane_concurrency) in LANES.items()}
+        for lane, (request_types, _) in LANES.items():
+            self.topic.subscribe(self.queues[lane], request_types)
+        self.epoch = time.time()
+        self.now = 0.0
+        self.windows: dict[int, dict[str, Any]] = {}
+        self.backlog_samples: dict[int, int] = {}
+        self.outcomes: list[dict[str, Any]] = []
+        self.invocation_ms: list[float] = []
+        self._events: list[tuple[float, int, str, Any]] = []
+        self._sequence = itertools.count()
+
+    def schedule(self, at: float, kind: str, payload: Any = None) -> None:
+        heapq.heappush(self._events, (at, next(self._sequence), kind, payload))
+
+    def window(self, at: float) -> dict[str, Any]:
+        return self.windows.setdefault(int(at // self.window_seconds), _new_window())
+
+    def run(self) -> None:
+        while self._events:
+            self.now, _, kind, payload = heapq.heappop(self._events)
+            # the backlog at the end of every window that passed, what ApproximateNumberOfMessagesVisible would show
+            for index in range(len(self.backlog_samples), int(self.now // self.window_seconds)):
+                self.backlog_samples[index] = sum(len(queue.messages) for queue in self.queues.values())
+            if kind == 'arrival':
+                self.window(self.now)['arrivals'] += 1
+                self.topic.publish(self.population.next_request(), self.now)
+            elif kind == 'done':
+                self._complete(*payload)
+            # a 'visible' event only wakes up the lanes, messages past their receive count move to the DLQ when they're received again
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        for lane, queue in self.queues.items():
+            while self.free_workers[lane] and (batch := queue.receive(self.now, self.batch_size)):
+                self.free_workers[lane] -= 1
+                for message in batch:
+                    self.window(self.now)['queue_ages'].append(self.now - message.sent_at)
+                statuses, failed, duration_ms = self._invoke(batch)
+                self.schedule(self.now + duration_ms / 1000 * self.service_time_scale, 'done', (lane, batch, statuses, failed))
+
+    def _invoke(self, batch: list[Message]) -> tuple[dict[str, dict], bool, float]:
+        from catalog_backend.handlers.product_callback_handler import handle_product_event
+
+        responded = len(self.local_aws.cfn.responses)
+        started_at = time.perf_counter()
+        try:
+            handle_product_event(_sqs_event(batch, self.epoch), LocalLambdaContext())
+            failed = False
+        except Exception:
+            failed = True  # the whole batch returns to the queue
+        duration_ms = (time.perf_counter() - started_at) * 1000
+        self.invocation_ms.append(duration_ms)
+        statuses = {response['body']['RequestId']: response['body'] for response in self.local_aws.cfn.responses[responded:]}
+        return statuses, failed, duration_ms
+
+    def _complete(self, lane: str, batch: list[Message], statuses: dict[str, dict], failed: bool) -> None:
+        self.free_workers[lane] += 1
+        for message in batch:
+            if failed:
+                self.queues[lane].return_message(message, self.now)
+                self.schedule(message.visible_at, 'visible')
+                continue
+            response = statuses.get(message.request_id, {'Status': 'NO_RESPONSE', 'Reason': 'no custom resource response was sent'})
+            self.population.completed(message.request_id, response['Status'] == 'SUCCESS')
+            self.window(self.now)['statuses'].append(response['Status'])
+            self.outcomes.append(
+                {
+                    'request_type': json.loads(message.body)['RequestType'],
+                    'status': response['Status'],
+                    'reason': response.get('Reason', ''),
+                    'end_to_end_seconds': self.now - message.sent_at,
+                }
+            )
+
+    def report(self) -> dict[str, Any]:
+        outcomes = self.outcomes
+        errors = [outcome for outcome in outcomes if outcome['status'] != 'SUCCESS']
+        return {
+            'published': sum(samples['arrivals'] for samples in self.windows.values()),
+            'filtered': self.topic.filtered,
+            'processed': len(outcomes),
+            'dead_lettered': sum(len(queue.dead_letters) for queue in self.queues.values()),
+            'makespan_seconds': round(self.now, 3),
+            'throughput_per_second': round(len(outcomes) / self.now, 2) if self.now else 0.0,
+            'request_types': dict(Counter(outcome['request_type'] for outcome in outcomes)),
+            'responses': dict(Counter(outcome['status'] for outcome in outcomes)),
+            'error_rate': round(len(errors) / len(outcomes), 4) if outcomes else 0.0,
+            'failure_reasons': dict(Counter(outcome['reason'][:120] for outcome in errors).most_common(5)),
+            'queue_age_seconds': summarize([age for samples in self.windows.values() for age in samples['queue_ages']]),
+            'end_to_end_seconds': summarize([outcome['end_to_end_seconds'] for outcome in outcomes]),
+            'invocation_ms': summarize(self.invocation_ms),
+            'timeline': [
+                _window_report(
+                    index * self.window_seconds, self.window_seconds, self.windows.get(index, _new_window()), self.backlog_samples.get(index, 0)
+                )
+                for index in range(max(self.windows, default=0) + 1)
+            ],
+        }
+
+
+def run_load(
+    local_aws: LocalAws,
+    events_per_hour: float,
+    minutes: float,
+    trust_ratio: float = 0.5,
+    mix: Optional[dict[str, float]] = None,
+    window_seconds: float = 60,
+    batch_size: int = BATCH_SIZE,
+    max_concurrency: Optional[dict[str, int]] = None,
+    service_time_scale: float = 1.0,
+    seed: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    Publishes 'minutes' of Poisson arrivals at 'events_per_hour' and runs the lanes until their queues drain.
+    Invocations take their measured time multiplied by 'service_time_scale', e.g. to model a slower Lambda CPU share.
+    """
+    rng = random.Random(seed)
+    emulation = PipelineEmulation(
+        local_aws, StackPopulation(rng, trust_ratio, mix or REQUEST_MIX), window_seconds, batch_size, max_concurrency or {}, service_time_scale
+    )
+    arrival_at = rng.expovariate(events_per_hour / 3600)
+    while arrival_at <= minutes * 60:
+        emulation.schedule(arrival_at, 'arrival')
+        arrival_at += rng.expovariate(events_per_hour / 3600)
+
+    started_at = time.perf_counter()
+    emulation.run()
+    return {'events_per_hour': events_per_hour, 'real_seconds': round(time.perf_counter() - started_at, 3), **emulation.report()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='macro load test of the SNS -> SQS -> Lambda path against local AWS stand-ins')
+    parser.add_argument('--events-per-hour', type=float, default=10_000)
+    parser.add_argument('--minutes', type=float, default=10, help='minutes of arrivals, the lanes then drain their queues')
+    parser.add_argument('--trust-ratio', type=float, default=0.5, help='share of stacks created with a trust_role_arn')
+    parser.add_argument('--window', type=float, default=60, help='seconds per timeline window')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--service-time-scale', type=float, default=1.0, help='multiplies the measured invocation durations')
+    parser.add_argument('--trust-policy-quota', type=int, help="the stand-in's role trust policy length quota")
+    parser.add_argument('--faults', choices=list(SCENARIOS), default='healthy', help='dependency faults, see tests.benchmark.stress')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with LocalAws() as local_aws:
+        os.environ.update(local_aws.setup_governance_service())
+        reset_caches()
+        if args.trust_policy_quota:
+            local_aws.iam.trust_policy_quota = args.trust_policy_quota
+        local_aws.faults.reseed(args.seed)
+        SCENARIOS[args.faults](local_aws.faults)
+        # the handler's metrics are printed to stdout, only the report should be
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            report = run_load(
+                local_aws,
+                events_per_hour=args.events_per_hour,
+                minutes=args.minutes,
+                trust_ratio=args.trust_ratio,
+                window_seconds=args.window,
+                batch_size=args.batch_size,
+                service_time_scale=args.service_time_scale,
+                seed=args.seed,
+            )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Recommends a memory size for the governance function.
+
+Lambda allocates CPU in proportion to memory, a full vCPU at 1769 MB. The sweep replays synthetic product traffic through
+handle_product_event against the local AWS stand-ins, splits every invocation into CPU time and waiting time, and models the
+latency and cost of each memory size by scaling the CPU time to the CPU share of that size.
+
+Usage: python -m tests.benchmark.memory_sweep [--stacks 20] [--io-ms 150] [--cpu-scale 1.5]
+"""
+
+import argparse
+import json
+import math
+import os
+import resource
+import time
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from tests.benchmark.stats import percentile
+from tests.benchmark.traffic import stack_lifecycle_events
+from tests.local_aws import LocalAws, LocalLambdaContext, reset_caches
+
+FULL_VCPU_MEMORY_MB = 1769
+DEFAULT_MEMORY_SIZES = (128, 192, 256, 384, 512, 768, 1024, 1769, 3008)
+GB_SECOND_PRICE = 0.0000166667  # x86, us-east-1
+REQUEST_PRICE = 0.0000002
+
+
+class InvocationSample(BaseModel):
+    wall_ms: float
+    cpu_ms: float
+
+
+class MemoryEstimate(BaseModel):
+    memory_mb: int
+    cpu_share: float
+    p50_ms: float
+    p90_ms: float
+    cost_per_million_usd: float
+
+
+def measure(events: list[dict[str, Any]], warmup: int = 1) -> list[InvocationSample]:
+    from catalog_backend.handlers.product_callback_handler import handle_product_event
+
+    samples = []
+    for index, event in enumerate(events):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        handle_product_event(event, LocalLambdaContext())
+        if index >= warmup:  # the first invocations pay for lazy imports and client creation, a cold start is not what we size for
+            samples.append(InvocationSample(wall_ms=(time.perf_counter() - wall_start) * 1000, cpu_ms=(time.process_time() - cpu_start) * 1000))
+    return samples
+
+
+def estimate(samples: list[InvocationSample], memory_mb: int, io_ms: float = 0, cpu_scale: float = 1.0) -> MemoryEstimate:
+    """
+    io_ms adds the AWS API round trips the stand-ins answer instantly, cpu_scale is how much slower a Lambda vCPU is than this machine.
+    A Python handler is single threaded, so CPU shares above one vCPU don't make it faster.
+    """
+    cpu_share = min(memory_mb / FULL_VCPU_MEMORY_MB, 1.0)
+    latencies = [sample.cpu_ms * cpu_scale / cpu_share + max(sample.wall_ms - sample.cpu_ms, 0) + io_ms for sample in samples]
+    # duration is billed per started millisecond
+    gb_seconds = sum(math.ceil(latency) for latency in latencies) / 1000 * memory_mb / 1024
+    cost = (gb_seconds * GB_SECOND_PRICE + len(latencies) * REQUEST_PRICE) / max(len(latencies), 1) * 1_000_000
+    return MemoryEstimate(
+        memory_mb=memory_mb,
+        cpu_share=round(cpu_share, 3),
+        p50_ms=round(percentile(latencies, 50), 2),
+        p90_ms=round(percentile(latencies, 90), 2),
+        cost_per_million_usd=round(cost, 4),
+    )
+
+
+def recommend(estimates: list[MemoryEstimate], footprint_mb: float, latency_slack: float = 1.1, headroom: float = 1.25) -> Optional[MemoryEstimate]:
+    """The cheapest memory size that fits the footprint with headroom and whose p90 is within latency_slack of the fastest one."""
+    candidates = [estimate for estimate in estimates if estimate.memory_mb >= footprint_mb * headroom]
+    if not candidates:
+        return None
+    fastest_p90 = min(estimate.p90_ms for estimate in candidates)
+    acceptable = [estimate for estimate in candidates if estimate.p90_ms <= fastest_p90 * latency_slack]
+    return min(acceptable, key=lambda estimate: (estimate.cost_per_million_usd, estimate.memory_mb))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='model latency and cost of the governance function per memory size')
+    parser.add_argument('--stacks', type=int, default=20, help='product stacks to create, update and delete')
+    parser.add_argument('--memory-sizes', type=int, nargs='+', default=list(DEFAULT_MEMORY_SIZES))
+    parser.add_argument('--io-ms', type=float, default=0, help='modeled AWS API latency per invocation')
+    parser.add_argument('--cpu-scale', type=float, default=1.0, help='Lambda vCPU time per local CPU time')
+    parser.add_argument('--latency-slack', type=float, default=1.1, help='accepted p90 relative to the fastest memory size')
+    args = parser.parse_args()
+
+    with LocalAws() as local_aws:
+        os.environ.update(local_aws.setup_governance_service())
+        reset_caches()
+        samples = measure(stack_lifecycle_events(args.stacks))
+    # ru_maxrss is in KB on Linux, the interpreter, dependencies and the replayed traffic
+    footprint_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    estimates = [estimate(samples, memory_mb, args.io_ms, args.cpu_scale) for memory_mb in sorted(args.memory_sizes)]
+    recommendation = recommend(estimates, footprint_mb, args.latency_slack)
+    report = {
+        'invocations': len(samples),
+        'footprint_mb': round(footprint_mb, 1),
+        'estimates': [estimate.model_dump() for estimate in estimates],
+        'recommended_memory_mb': recommendation.memory_mb if recommendation else None,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Throughput of the demo orders client against a local stand-in of the orders API.
+
+Compares the original call path, a new connection and signing key per request, with the pooled client sequentially and concurrently.
+Usage: python -m tests.benchmark.orders_client [--orders 200] [--workers 8] [--latency-ms 2]
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+import requests
+from aws_requests_auth.aws_auth import AWSRequestsAuth
+
+from demo.handlers.credentials import Credentials
+from demo.handlers.orders_client import OrdersClient, SigV4Auth
+from tests.local_aws.orders_api import LocalOrdersApi
+
+CREDENTIALS = Credentials('AKIDEXAMPLE', 'wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY', 'token', datetime.now(timezone.utc) + timedelta(hours=1))
+
+
+def _orders(count: int) -> list[dict[str, Any]]:
+    return [{'order': f'order-{index}'} for index in range(count)]
+
+
+def _run(latency_ms: float, orders: list[dict[str, Any]], submit: Callable[[str, list[dict[str, Any]]], list[int]]) -> dict[str, float]:
+    with LocalOrdersApi(latency_ms=latency_ms) as api:
+        start = time.perf_counter()
+        statuses = submit(api.url, orders)
+        elapsed = time.perf_counter() - start
+        connections = api.connections
+    assert statuses == [200] * len(orders)
+    return {'orders_per_second': round(len(orders) / elapsed, 1), 'connections': connections}
+
+
+def _unpooled(url: str, orders: list[dict[str, Any]]) -> list[int]:
+    # the original demo call path
+    auth = AWSRequestsAuth(
+        aws_access_key=CREDENTIALS.access_key,
+        aws_secret_access_key=CREDENTIALS.secret_key,
+        aws_token=CREDENTIALS.session_token,
+        aws_host=url.split('/')[2],
+        aws_region='us-east-1',
+        aws_service='execute-api',
+    )
+    return [requests.post(f'{url}api/orders', json=order, auth=auth, timeout=10).status_code for order in orders]
+
+
+def _pooled(url: str, orders: list[dict[str, Any]]) -> list[int]:
+    client = OrdersClient(url, credentials=lambda: CREDENTIALS, region='us-east-1')
+    return [client.post_order(order).status_code for order in orders]
+
+
+def _pooled_concurrent(workers: int) -> Callable[[str, list[dict[str, Any]]], list[int]]:
+    def submit(url: str, orders: list[dict[str, Any]]) -> list[int]:
+        client = OrdersClient(url, credentials=lambda: CREDENTIALS, region='us-east-1', pool_size=workers)
+        return [response.status_code for response in client.post_orders(orders, max_workers=workers)]
+
+    return submit
+
+
+def signing_costs(repeat: int = 2000) -> dict[str, float]:
+    url, body = 'https://abc123.execute-api.us-east-1.amazonaws.com/prod/api/orders', json.dumps({'order': 'my_order'}).encode()
+    request = requests.Request('POST', url, data=body).prepare()
+    per_request_key = AWSRequestsAuth(
+        CREDENTIALS.access_key,
+        CREDENTIALS.secret_key,
+        'abc123.execute-api.us-east-1.amazonaws.com',
+        'us-east-1',
+        'execute-api',
+        CREDENTIALS.session_token,
+    )
+    cached_key = SigV4Auth(lambda: CREDENTIALS, 'us-east-1')
+
+    def microseconds(function: Callable[[], Any]) -> float:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        return round((time.perf_counter() - start) / repeat * 1_000_000, 2)
+
+    return {
+        'per_request_key_us': microseconds(lambda: per_request_key.get_aws_request_headers_handler(request)),
+        'cached_key_us': microseconds(lambda: cached_key(request.copy())),
+    }
+
+
+def run_benchmark(orders: int, workers: int, latency_ms: float) -> dict[str, Any]:
+    batch = _orders(orders)
+    return {
+        'signing': signing_costs(),
+        'unpooled': _run(latency_ms, batch, _unpooled),
+        'pooled': _run(latency_ms, batch, _pooled),
+        'pooled_concurrent': _run(latency_ms, batch, _pooled_concurrent(workers)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='benchmark the demo orders client against a local orders API')
+    parser.add_argument('--orders', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=2, help='server side delay per request')
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.orders, args.workers, args.latency_ms), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Replays a captured stream of product SQS events through handle_product_event against the local AWS stand-ins.
+
+Usage: python -m tests.benchmark.replay capture.jsonl [--speed 10 | --max-speed]
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Optional
+
+from tests.benchmark.stats import summarize
+from tests.local_aws import LocalAws, LocalLambdaContext, reset_caches
+
+UNKNOWN_REQUEST_TYPE = 'Unknown'
+
+
+def load_capture(path: Path) -> list[dict[str, Any]]:
+    """Reads a capture file, accepts both file sink lines and structured log records written by the 'log' sink."""
+    captures = []
+    for line in path.read_text(encoding='utf-8').splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        captures.append(record.get('captured_event', record))
+    return sorted(captures, key=lambda capture: capture['captured_at_ms'])
+
+
+def _request_type(event: dict[str, Any]) -> str:
+    try:
+        return json.loads(event['Records'][0]['body'])['RequestType']
+    except (KeyError, IndexError, TypeError, ValueError):
+        return UNKNOWN_REQUEST_TYPE
+
+
+def replay(captures: list[dict[str, Any]], local_aws: LocalAws, speed: Optional[float] = 1.0) -> dict[str, Any]:
+    """
+    Feeds the captured events back through the handler, one at a time like the SQS event source with a batch size of 1.
+    Events keep their original inter-arrival timing divided by 'speed', a speed of None replays as fast as possible.
+    """
+    from catalog_backend.handlers.product_callback_handler import handle_product_event
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    lag_ms: list[float] = []
+    first_captured_at = captures[0]['captured_at_ms'] if captures else 0
+    start = time.monotonic()
+    for capture in captures:
+        if speed:
+            due = (capture['captured_at_ms'] - first_captured_at) / 1000 / speed
+            time.sleep(max(0.0, due - (time.monotonic() - start)))
+            lag_ms.append(max(0.0, (time.monotonic() - start - due) * 1000))
+        invoked_at = time.perf_counter()
+        handle_product_event(capture['event'], LocalLambdaContext())
+        latencies[_request_type(capture['event'])].append((time.perf_counter() - invoked_at) * 1000)
+
+    elapsed = time.monotonic() - start
+    return {
+        'events': len(captures),
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_per_second': round(len(captures) / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {request_type: summarize(values) for request_type, values in sorted(latencies.items())},
+        'schedule_lag_ms': summarize(lag_ms),
+        'cfn_responses': dict(Counter(response['body']['Status'] for response in local_aws.cfn.responses)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='replay captured product events against local AWS stand-ins')
+    parser.add_argument('capture', type=Path, help='JSONL capture file, CAPTURE_SINK output or exported log records')
+    pacing = parser.add_mutually_exclusive_group()
+    pacing.add_argument('--speed', type=float, default=1.0, help='replay at N times the original inter-arrival timing')
+    pacing.add_argument('--max-speed', action='store_true', help='ignore the original timing and replay back to back')
+    args = parser.parse_args()
+
+    with LocalAws() as local_aws:
+        os.environ.update(local_aws.setup_governance_service())
+        reset_caches()
+        report = replay(load_capture(args.capture), local_aws, speed=None if args.max_speed else args.speed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+import math
+
+
+def percentile(values: list[float], pct: float) -> float:
+    # nearest-rank percentile, good enough for latency reports and never interpolates a value that was not observed
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    return {
+        'count': len(values),
+        'p50': round(percentile(values, 50), 2),
+        'p90': round(percentile(values, 90), 2),
+        'p99': round(percentile(values, 99), 2),
+        'max': round(max(values, default=0.0), 2),
+    }
@@ -0,0 +1,89 @@
+"""
+Measures the tail latency and retry behaviour of the product lifecycle while the local stand-ins inject dependency faults.
+
+Usage: python -m tests.benchmark.stress [--scenario iam-throttling] [--stacks 20] [--seed 7] [--no-trust-role]
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Optional
+
+from catalog_backend.handlers.utils.api_calls import track_api_calls
+from tests.benchmark.replay import _request_type
+from tests.benchmark.stats import summarize
+from tests.benchmark.traffic import stack_lifecycle_events
+from tests.local_aws import FaultInjector, FaultProfile, FixedLatency, LocalAws, LocalLambdaContext, LongTailLatency, reset_caches
+
+# the dependency failures behind our incidents, each applied to a healthy set of stand-ins
+SCENARIOS: dict[str, Callable[[FaultInjector], None]] = {
+    'healthy': lambda faults: None,
+    'iam-throttling': lambda faults: faults.configure('iam', FaultProfile(latency=FixedLatency(20), throttle_rate=0.2)),
+    'dynamodb-latency-spikes': lambda faults: faults.configure('dynamodb', FaultProfile(latency=LongTailLatency(median_ms=5, p99_ms=250))),
+    'slow-response-url': lambda faults: faults.configure('cloudformation', FaultProfile(latency=LongTailLatency(median_ms=30, p99_ms=500))),
+    'degraded': lambda faults: (
+        faults.configure('iam', FaultProfile(latency=LongTailLatency(median_ms=20, p99_ms=300), throttle_rate=0.1)),
+        faults.configure('dynamodb', FaultProfile(latency=LongTailLatency(median_ms=5, p99_ms=250), throttle_rate=0.05)),
+    ),
+}
+
+
+def run_scenario(local_aws: LocalAws, scenario: str, stack_count: int, with_trust_role: bool = True, seed: Optional[int] = None) -> dict[str, Any]:
+    """Creates, updates and deletes 'stack_count' products through the handler, one request at a time, under the scenario's faults."""
+    from catalog_backend.handlers.product_callback_handler import handle_product_event
+
+    local_aws.faults.clear()
+    if seed is not None:
+        local_aws.faults.reseed(seed)
+    local_aws.cfn.responses.clear()
+    SCENARIOS[scenario](local_aws.faults)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    calls: Counter = Counter()
+    attempts: Counter = Counter()
+    failed_calls: Counter = Counter()
+    events = stack_lifecycle_events(stack_count, with_trust_role)
+    start = time.monotonic()
+    for event in events:
+        with track_api_calls() as ledger:
+            invoked_at = time.perf_counter()
+            handle_product_event(event, LocalLambdaContext())
+            latencies[_request_type(event)].append((time.perf_counter() - invoked_at) * 1000)
+        for operation, totals in ledger.operations.items():
+            calls[operation] += totals['calls']
+            attempts[operation] += totals['attempts']
+            failed_calls[operation] += totals['errors']
+
+    return {
+        'scenario': scenario,
+        'events': len(events),
+        'elapsed_seconds': round(time.monotonic() - start, 3),
+        'latency_ms': {request_type: summarize(values) for request_type, values in sorted(latencies.items())},
+        # retries are the attempts botocore made on top of every call, failed calls ran out of retries
+        'retries': {operation: attempts[operation] - calls[operation] for operation in sorted(calls)},
+        'failed_calls': {operation: failed_calls[operation] for operation in sorted(calls)},
+        'cfn_responses': dict(Counter(response['body']['Status'] for response in local_aws.cfn.responses)),
+        'injected': local_aws.faults.injected,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='benchmark the product lifecycle under injected dependency faults')
+    parser.add_argument('--scenario', choices=[*SCENARIOS, 'all'], default='all')
+    parser.add_argument('--stacks', type=int, default=20, help='products to create, update and delete per scenario')
+    parser.add_argument('--seed', type=int, default=7, help='seeds the injected faults, the same seed injects the same faults')
+    parser.add_argument('--no-trust-role', action='store_true', help='products without a trust role, no IAM calls')
+    args = parser.parse_args()
+
+    reports = []
+    for scenario in SCENARIOS if args.scenario == 'all' else [args.scenario]:
+        with LocalAws() as local_aws:
+            os.environ.update(local_aws.setup_governance_service())
+            reset_caches()
+            reports.append(run_scenario(local_aws, scenario, args.stacks, with_trust_role=not args.no_trust_role, seed=args.seed))
+    print(json.dumps(reports, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Synth time of the service stack with and without fast synth mode.
+
+Run 'make build' first, the function assets are staged from the build folders. Docker bundling of the common layer is skipped in every
+mode, so the report isolates asset hashing and staging, a deploy time synth also saves the layer bundling whenever the lock file is unchanged.
+Usage: python -m tests.benchmark.synth_timing [--repeat 3]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+
+from aws_cdk import App
+
+from cdk.demo.assets import fingerprint
+from cdk.demo.stack import ServiceStack
+
+
+def synth_seconds(outdir: str, fast_synth: bool) -> float:
+    # lookups and bundling are kept out, only the stack construction, asset staging and template synthesis are timed
+    context = {'aws:cdk:bundling-stacks': [], 'organization_id': 'o-timing', 'fast_synth': fast_synth}
+    fingerprint.cache_clear()
+    start = time.perf_counter()
+    app = App(outdir=outdir, context=context)
+    ServiceStack(app, 'synth-timing')
+    app.synth()
+    return round(time.perf_counter() - start, 3)
+
+
+def run_benchmark(repeat: int) -> dict[str, float]:
+    report: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as default_outdir:
+        report['default_seconds'] = min(synth_seconds(default_outdir, fast_synth=False) for _ in range(repeat))
+    with tempfile.TemporaryDirectory() as fast_outdir:
+        # the first fast synth stages the assets, later ones find them in cdk.out under the same fingerprint
+        report['fast_cold_seconds'] = synth_seconds(fast_outdir, fast_synth=True)
+        report['fast_warm_seconds'] = min(synth_seconds(fast_outdir, fast_synth=True) for _ in range(repeat))
+    report['speedup'] = round(report['default_seconds'] / report['fast_warm_seconds'], 2)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='compare synth time with and without fast synth mode')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import cdk.demo.constants as constants
+from catalog_backend.handlers.product_callback_handler import handle_product_event
+from tests.benchmark.traffic import product_event
+from tests.local_aws import LocalLambdaContext, call_budget, reset_caches
+
+# the governance table settings of the local stand-ins and of the deployed function, see cdk/demo/constants.py
+TABLE_CONFIGS = {
+    'local': {},
+    'deployed': {
+        'TABLE_SHARD_COUNT': str(constants.TABLE_SHARD_COUNT),
+        'TABLE_COMPACT_ITEMS': str(constants.TABLE_COMPACT_ITEMS).lower(),
+        'TABLE_LOW_LEVEL_CLIENT': str(constants.TABLE_LOW_LEVEL_CLIENT).lower(),
+        'TABLE_HISTORY_RETENTION_DAYS': str(constants.TABLE_HISTORY_RETENTION_DAYS),
+        'TABLE_AGGREGATES_ENABLED': str(constants.TABLE_AGGREGATES_ENABLED).lower(),
+    },
+    'history': {'TABLE_HISTORY_RETENTION_DAYS': '30'},
+    'counters': {'TABLE_HISTORY_RETENTION_DAYS': '30', 'TABLE_AGGREGATES_ENABLED': 'true'},
+}
+TRUST_CALLS = {'IAM.GetRole': 1, 'IAM.UpdateAssumeRolePolicy': (0, 1)}
+# the item is written with its history event in one transaction
+_HISTORY_WRITE = {'DynamoDB.TransactWriteItems': 1, 'CloudFormation.ResponseURL': 1}
+# counters read the current item first, then write it with its history event and counters in one transaction
+_COUNTED_WRITE = {'DynamoDB.GetItem': 1, 'DynamoDB.TransactWriteItems': 1, 'CloudFormation.ResponseURL': 1}
+_SINGLE_ITEM_WRITES = {
+    'Create': {'DynamoDB.PutItem': 1, 'CloudFormation.ResponseURL': 1},
+    'Update': {'DynamoDB.PutItem': 1, 'CloudFormation.ResponseURL': 1},
+    'Delete': {'DynamoDB.DeleteItem': 1, 'CloudFormation.ResponseURL': 1},
+}
+CALL_BUDGETS = {
+    'local': _SINGLE_ITEM_WRITES,
+    'deployed': _SINGLE_ITEM_WRITES,
+    'history': {'Create': _HISTORY_WRITE, 'Update': _HISTORY_WRITE, 'Delete': _HISTORY_WRITE},
+    'counters': {'Create': _COUNTED_WRITE, 'Update': _COUNTED_WRITE, 'Delete': _COUNTED_WRITE},
+}
+
+
+@pytest.mark.parametrize('table_config', sorted(TABLE_CONFIGS))
+@pytest.mark.parametrize('with_trust_role', [True, False])
+def test_lifecycle_stays_within_call_budget(local_aws, monkeypatch, table_config, with_trust_role):
+    for name, value in TABLE_CONFIGS[table_config].items():
+        monkeypatch.setenv(name, value)
+    reset_caches()
+    for request_type in ('Create', 'Update', 'Delete', 'Delete'):
+        # Given: the call budget of the request type with the table's settings, trust policy calls only with a trust role
+        budget = {**CALL_BUDGETS[table_config][request_type], **(TRUST_CALLS if with_trust_role else {})}
+
+        # When: handling the request, a repeated delete included
+        with call_budget(budget):
+            handle_product_event(product_event(request_type, 0, with_trust_role), LocalLambdaContext())
+
+    # Then: every request succeeded within its budget
+    assert [response['body']['Status'] for response in local_aws.cfn.responses] == ['SUCCESS'] * 4
+
+
+def test_repeated_delete_skips_the_trust_policy_update(local_aws):
+    # Given: a product that was already deleted
+    for request_type in ('Create', 'Delete'):
+        handle_product_event(product_event(request_type, 0), LocalLambdaContext())
+
+    # When: CloudFormation retries the delete
+    with call_budget({**CALL_BUDGETS['local']['Delete'], 'IAM.GetRole': 1}) as ledger:
+        handle_product_event(product_event('Delete', 0), LocalLambdaContext())
+
+    # Then: the trust policy was only read
+    assert ledger.calls('IAM.UpdateAssumeRolePolicy') == 0
+
+
+def test_invocation_reports_calls_per_operation(local_aws, capsys, monkeypatch):
+    # Given: a create request with a trust role, every invocation sampled for the per-operation breakdown
+    monkeypatch.setenv('API_CALLS_SAMPLE_RATE', '1')
+    reset_caches()
+    event = product_event('Create', 0)
+
+    # When: handling it
+    handle_product_event(event, LocalLambdaContext())
+
+    # Then: every operation's calls and latency are emitted in one blob, next to the invocation's total
+    blobs = [json.loads(line) for line in capsys.readouterr().out.splitlines() if '"_aws"' in line]
+    per_operation = [blob for blob in blobs if 'IAM.GetRole.Calls' in blob]
+    assert len(per_operation) == 1
+    operations = ['CloudFormation.ResponseURL', 'DynamoDB.PutItem', 'IAM.GetRole', 'IAM.UpdateAssumeRolePolicy']
+    assert sorted(name for name in per_operation[0] if name.endswith('.Calls')) == [f'{operation}.Calls' for operation in operations]
+    assert all(per_operation[0][f'{operation}.Calls'] == [1] and per_operation[0][f'{operation}.Latency'][0] >= 0 for operation in operations)
+    assert any(blob.get('ApiCalls') == [4] for blob in blobs)
+
+
+def test_per_operation_metrics_are_off_by_default(local_aws, capsys):
+    # Given: no per-operation sample rate configured
+    event = product_event('Create', 0)
+
+    # When: handling a request
+    handle_product_event(event, LocalLambdaContext())
+
+    # Then: only the invocation's total is emitted
+    blobs = [json.loads(line) for line in capsys.readouterr().out.splitlines() if '"_aws"' in line]
+    assert not any(name.endswith('.Calls') for blob in blobs for name in blob)
+    assert any(blob.get('ApiCalls') == [4] for blob in blobs)
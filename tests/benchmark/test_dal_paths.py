@@ -0,0 +1,22 @@
+from catalog_backend.dal.dynamo_client_dal_handler import DynamoClientDalHandler
+from catalog_backend.dal.dynamo_dal_handler import DynamoDalHandler
+from tests.benchmark.dal_paths import codec_calls, dal_costs
+
+
+def test_client_codec_is_cheaper():
+    # Given/When: counting the function calls of serializing and deserializing a product entry on both paths, timings are left to the report
+    calls = codec_calls()
+
+    # Then: the cached wire serializers do less work than model_dump with TypeSerializer, and plain parsing less than TypeDeserializer
+    assert calls['client_serialize_calls'] < calls['resource_serialize_calls'] / 2
+    assert calls['client_deserialize_calls'] < calls['resource_deserialize_calls']
+
+
+def test_dal_paths_run_against_stand_in():
+    # Given/When: running both DAL paths against the local DynamoDB stand-in
+    resource_costs = dal_costs(DynamoDalHandler, items=20, shards=2, page=10)
+    client_costs = dal_costs(DynamoClientDalHandler, items=20, shards=2, page=10)
+
+    # Then: both report timings, which are compared by the benchmark report rather than asserted, the stand-in adds noise
+    assert resource_costs['add_us'] > 0 and client_costs['add_us'] > 0
+    assert resource_costs['list_page_us'] > 0 and client_costs['list_page_us'] > 0
@@ -0,0 +1,22 @@
+from catalog_backend.dal import codec
+from tests.benchmark.item_size import compare, item_size, sample_entries
+
+
+def test_item_size_follows_dynamodb_rules():
+    # Given/When/Then: names and string values count their UTF-8 bytes, numbers one byte per two digits plus one
+    assert item_size({'pk': 'abc'}) == 5
+    assert item_size({'t': 1716017284}) == 1 + 6
+
+
+def test_compact_layout_shrinks_items():
+    # Given: product entries of Service Catalog provisioned stacks
+    entries = sample_entries(1000)
+
+    # When: comparing both layouts
+    report = compare(entries)
+
+    # Then: compact items are about half the size, a full page query costs fewer read units and writes never cost more
+    assert report['item_bytes_saved_pct'] > 40
+    assert report['compact']['query_read_units'] < report['legacy']['query_read_units']
+    assert report['compact']['write_units'] <= report['legacy']['write_units']
+    assert all(codec.decode(codec.encode(entry)) == entry for entry in entries)
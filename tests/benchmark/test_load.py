@@ -0,0 +1,76 @@
+import json
+
+from tests.benchmark.load import EmulatedQueue, EmulatedTopic, run_load
+from tests.benchmark.traffic import product_body
+
+
+def test_topic_routes_requests_to_their_lane():
+    # Given: the lanes subscribed to the topic
+    topic, provision, delete = EmulatedTopic(), EmulatedQueue('provision'), EmulatedQueue('delete')
+    topic.subscribe(provision, ['Create', 'Update'])
+    topic.subscribe(delete, ['Delete'])
+    foreign = json.dumps({**json.loads(product_body('Create', 0)), 'ResourceType': 'Custom::Other'})
+
+    # When: publishing a create, a delete and a foreign resource type
+    for body in (product_body('Create', 0), product_body('Delete', 0), foreign):
+        topic.publish(body, now=0)
+
+    # Then: every lane only got its own request types, the foreign one was filtered out
+    assert [json.loads(message.body)['RequestType'] for message in provision.messages] == ['Create']
+    assert [json.loads(message.body)['RequestType'] for message in delete.messages] == ['Delete']
+    assert topic.filtered == 1
+
+
+def test_load_drains_every_request(local_aws):
+    # Given: a minute of traffic at 3600 events per hour, stacks without a trust role
+
+    # When: running it through the topic, the lanes and the handler
+    report = run_load(local_aws, events_per_hour=3600, minutes=1, trust_ratio=0, window_seconds=20, seed=1)
+
+    # Then: every request was answered successfully and the timeline adds up
+    assert report['published'] > 0
+    assert report['processed'] == report['published']
+    assert report['responses'] == {'SUCCESS': report['processed']}
+    assert report['dead_lettered'] == 0
+    assert sum(window['arrivals'] for window in report['timeline']) == report['published']
+    assert sum(window['processed'] for window in report['timeline']) == report['processed']
+    assert set(report['request_types']) <= {'Create', 'Update', 'Delete'}
+
+
+def test_saturated_lanes_build_a_backlog(local_aws):
+    # Given: a single worker per lane, invocations modeled 100 times slower than measured
+
+    # When: arrivals outpace the workers
+    report = run_load(
+        local_aws,
+        events_per_hour=3600,
+        minutes=1,
+        trust_ratio=0,
+        window_seconds=20,
+        max_concurrency={'provision': 1, 'delete': 1},
+        service_time_scale=100,
+        seed=1,
+    )
+
+    # Then: the backlog and queue age grow until the queues drain, after the arrivals stopped
+    timeline = report['timeline']
+    assert timeline[2]['backlog'] > 0
+    # the last window can hold completions only, depending on the measured invocation times, so its queue age can be empty
+    queue_ages = [window['queue_age_seconds']['max'] for window in timeline]
+    assert max(queue_ages[1:]) > queue_ages[0]
+    assert report['makespan_seconds'] > 60
+    assert report['processed'] == report['published']
+
+
+def test_trust_policy_exhaustion_shows_in_the_error_rate(local_aws):
+    # Given: only creates with a trust role against a small trust policy quota
+    local_aws.iam.trust_policy_quota = 1024
+
+    # When: running them
+    report = run_load(local_aws, events_per_hour=3600, minutes=1, trust_ratio=1, mix={'Create': 1}, window_seconds=20, seed=1)
+
+    # Then: the first creates succeed, once the trust policy is full every create fails
+    timeline = report['timeline']
+    assert report['responses']['SUCCESS'] > 0
+    assert timeline[0]['error_rate'] < timeline[-1]['error_rate'] == 1
+    assert all('LimitExceeded' in reason for reason in report['failure_reasons'])
@@ -0,0 +1,48 @@
+import pytest
+
+from tests.benchmark.memory_sweep import InvocationSample, estimate, measure, recommend
+from tests.benchmark.traffic import stack_lifecycle_events
+
+CPU_BOUND = [InvocationSample(wall_ms=40, cpu_ms=40)] * 10
+IO_BOUND = [InvocationSample(wall_ms=200, cpu_ms=2)] * 10
+
+
+def test_estimate_scales_cpu_time_with_memory():
+    # Given/When: estimating a CPU bound workload at a quarter, one and two vCPUs
+    quarter, full, double = (estimate(CPU_BOUND, memory_mb) for memory_mb in (442, 1769, 3538))
+
+    # Then: latency follows the CPU share up to a single vCPU
+    assert quarter.p90_ms == pytest.approx(160, rel=0.01)
+    assert full.p90_ms == 40
+    assert double.p90_ms == full.p90_ms
+    assert double.cost_per_million_usd > full.cost_per_million_usd
+
+
+def test_recommend_cpu_bound_prefers_a_full_vcpu():
+    # Given: estimates for a CPU bound workload
+    estimates = [estimate(CPU_BOUND, memory_mb) for memory_mb in (128, 512, 1769, 3008)]
+
+    # When/Then: the smallest size that reaches the fastest latency wins
+    assert recommend(estimates, footprint_mb=80).memory_mb == 1769
+
+
+def test_recommend_io_bound_prefers_small_memory_that_fits():
+    # Given: estimates for a workload that mostly waits for AWS APIs
+    estimates = [estimate(IO_BOUND, memory_mb, io_ms=100) for memory_mb in (128, 192, 256, 1024)]
+
+    # When/Then: extra CPU barely helps, so the cheapest size that fits the footprint with headroom wins
+    assert recommend(estimates, footprint_mb=120).memory_mb == 192
+    assert recommend(estimates, footprint_mb=2000) is None
+
+
+def test_measure_runs_the_offline_pipeline(local_aws):
+    # Given: create, update and delete requests of two product stacks
+    events = stack_lifecycle_events(stack_count=2)
+
+    # When: measuring them against the local stand-ins
+    samples = measure(events, warmup=1)
+
+    # Then: every warm invocation is sampled and succeeded
+    assert len(samples) == 5
+    assert all(sample.wall_ms > 0 for sample in samples)
+    assert [response['body']['Status'] for response in local_aws.cfn.responses] == ['SUCCESS'] * 6
@@ -0,0 +1,12 @@
+from tests.benchmark.orders_client import run_benchmark
+
+
+def test_pooled_client_reuses_connections():
+    # Given/When: running the orders client benchmark against the local orders API
+    report = run_benchmark(orders=30, workers=4, latency_ms=0)
+
+    # Then: the original path opens a connection per order, the pooled client keeps them alive
+    assert report['unpooled']['connections'] == 30
+    assert report['pooled']['connections'] == 1
+    assert report['pooled_concurrent']['connections'] <= 4
+    assert all(report[path]['orders_per_second'] > 0 for path in ('unpooled', 'pooled', 'pooled_concurrent'))
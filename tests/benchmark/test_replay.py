@@ -0,0 +1,67 @@
+import json
+
+from catalog_backend.handlers.product_callback_handler import handle_product_event
+from tests.benchmark.replay import load_capture, replay
+from tests.benchmark.traffic import product_event
+from tests.local_aws import LocalLambdaContext, reset_caches
+
+
+def _capture_traffic(tmp_path, monkeypatch, stack_count: int):
+    sink = tmp_path / 'capture.jsonl'
+    monkeypatch.setenv('CAPTURE_SINK', str(sink))
+    monkeypatch.setenv('CAPTURE_SALT', 'benchmark')
+    reset_caches()
+    for index in range(stack_count):
+        for request_type in ('Create', 'Delete'):
+            handle_product_event(product_event(request_type, index), LocalLambdaContext())
+    monkeypatch.delenv('CAPTURE_SINK')
+    reset_caches()
+    return sink
+
+
+def test_capture_scrubs_response_url_and_arns(local_aws, tmp_path, monkeypatch):
+    # Given: the governance handler running with capture enabled
+    sink = _capture_traffic(tmp_path, monkeypatch, stack_count=1)
+
+    # When: reading the captured stream
+    captures = load_capture(sink)
+
+    # Then: every event was captured and succeeded, none of the ResponseURLs, role names or account ids leaked
+    assert len(captures) == 2
+    assert [response['body']['Status'] for response in local_aws.cfn.responses] == ['SUCCESS', 'SUCCESS']
+    raw_capture = sink.read_text()
+    assert '123456789012' not in raw_capture
+    assert 'product-role' not in raw_capture
+    assert 'cloudformation-custom-resource-response' not in raw_capture
+    body = json.loads(captures[0]['event']['Records'][0]['body'])
+    assert body['ResponseURL'].startswith('https://response-url.invalid/')
+    assert body['ResourceProperties']['trust_role_arn'].startswith('arn:aws:iam::')
+    assert 'AQEB' not in captures[0]['event']['Records'][0]['receiptHandle']
+
+
+def test_replay_reports_latency_per_request_type(local_aws, tmp_path, monkeypatch):
+    # Given: a captured stream of create and delete requests
+    captures = load_capture(_capture_traffic(tmp_path, monkeypatch, stack_count=3))
+    local_aws.cfn.responses.clear()
+
+    # When: replaying it as fast as possible against fresh stand-ins
+    report = replay(captures, local_aws, speed=None)
+
+    # Then: every request succeeded and latencies are reported per request type
+    assert report['events'] == 6
+    assert report['cfn_responses'] == {'SUCCESS': 6}
+    assert report['latency_ms']['Create']['count'] == 3
+    assert report['latency_ms']['Delete']['count'] == 3
+    assert report['latency_ms']['Create']['p50'] <= report['latency_ms']['Create']['max']
+
+
+def test_replay_keeps_inter_arrival_timing(local_aws, tmp_path, monkeypatch):
+    # Given: two captured events recorded 400ms apart
+    captures = load_capture(_capture_traffic(tmp_path, monkeypatch, stack_count=1))
+    captures[1]['captured_at_ms'] = captures[0]['captured_at_ms'] + 400
+
+    # When: replaying at 4x speed
+    report = replay(captures, local_aws, speed=4)
+
+    # Then: the replay is paced to a 100ms gap
+    assert report['elapsed_seconds'] >= 0.1
@@ -0,0 +1,74 @@
+import random
+import time
+
+import boto3
+
+from catalog_backend.handlers.product_callback_handler import handle_product_event
+from tests.benchmark.stats import percentile
+from tests.benchmark.stress import run_scenario
+from tests.benchmark.traffic import product_event, stack_id
+from tests.local_aws import TABLE_NAME, FaultProfile, FixedLatency, LocalLambdaContext, LongTailLatency
+
+
+def test_long_tail_latency_matches_its_percentiles():
+    # Given: a long tailed latency with a 10ms median and 200ms p99, capped at 1 second
+    latency = LongTailLatency(median_ms=10, p99_ms=200, max_ms=1000)
+    rng = random.Random(7)
+
+    # When: sampling it
+    samples = [latency.sample_ms(rng) for _ in range(20_000)]
+
+    # Then: the samples follow the fitted percentiles and never exceed the cap
+    assert 9 <= percentile(samples, 50) <= 11
+    assert 170 <= percentile(samples, 99) <= 230
+    assert max(samples) <= 1000
+
+
+def test_dependency_latency_is_injected_per_operation(local_aws):
+    # Given: a product to delete while DynamoDB deletes take 50ms
+    handle_product_event(product_event('Create', 0), LocalLambdaContext())
+    local_aws.faults.configure('dynamodb', FaultProfile(latency=FixedLatency(50)), operation='DeleteItem')
+
+    # When: deleting it
+    started_at = time.perf_counter()
+    handle_product_event(product_event('Delete', 0), LocalLambdaContext())
+
+    # Then: only the delete waited
+    assert (time.perf_counter() - started_at) * 1000 >= 50
+    assert local_aws.faults.injected['dynamodb.DeleteItem'] == {'requests': 1, 'delayed_ms': 50, 'throttled': 0, 'unprocessed': 0}
+    assert local_aws.faults.injected['dynamodb.PutItem']['delayed_ms'] == 0
+
+
+def test_throttled_iam_calls_are_retried(local_aws):
+    # Given: IAM throttling a fifth of the requests
+
+    # When: running a product lifecycle through it
+    report = run_scenario(local_aws, 'iam-throttling', stack_count=2, seed=3)
+
+    # Then: botocore retried every throttled request and every product still succeeded
+    throttled = sum(tally['throttled'] for operation, tally in report['injected'].items() if operation.startswith('iam.'))
+    assert throttled > 0
+    assert report['retries']['IAM.GetRole'] + report['retries']['IAM.UpdateAssumeRolePolicy'] == throttled
+    assert sum(report['failed_calls'].values()) == 0
+    assert report['cfn_responses'] == {'SUCCESS': 6}
+
+
+def test_batch_write_leaves_items_unprocessed(local_aws):
+    # Given: DynamoDB leaving half of a batch's put requests unprocessed
+    local_aws.faults.configure('dynamodb', FaultProfile(unprocessed_rate=0.5), operation='BatchWriteItem')
+    local_aws.faults.reseed(5)
+    items = [{'portfolio_id': 'port-stress', 'product_stack_id': stack_id(index)} for index in range(20)]
+
+    # When: writing a batch directly, and through boto3's batch writer that resends unprocessed items
+    response = boto3.client('dynamodb').batch_write_item(
+        RequestItems={TABLE_NAME: [{'PutRequest': {'Item': {name: {'S': value} for name, value in item.items()}}} for item in items[:10]]}
+    )
+    with boto3.resource('dynamodb').Table(TABLE_NAME).batch_writer() as writer:
+        for item in items:
+            writer.put_item(Item=item)
+
+    # Then: the direct batch reports what was left unprocessed, the batch writer eventually writes everything
+    unprocessed = len(response['UnprocessedItems'][TABLE_NAME])
+    assert 0 < unprocessed < 10
+    assert local_aws.faults.injected['dynamodb.BatchWriteItem']['unprocessed'] > unprocessed
+    assert len(local_aws.dynamodb.table(TABLE_NAME).items) == 20
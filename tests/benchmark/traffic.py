@@ -0,0 +1,31 @@
+from typing import Any
+
+from tests.integration.utils import NEW_RESOURCE_PROPERTIES, RESOURCE_PROPERTIES, create_product_body, create_sqs_records
+
+ACCOUNT_ID = '123456789012'
+
+
+def stack_id(index: int) -> str:
+    return f'arn:aws:cloudformation:us-east-1:{ACCOUNT_ID}:stack/SC-{ACCOUNT_ID}-pp-{index}/1dbb0a20-14e8-11ef-a95c-0eaa9ec0a8b1'
+
+
+def trust_role_arn(index: int) -> str:
+    return f'arn:aws:iam::{ACCOUNT_ID}:role/product-role-{index}'
+
+
+def product_body(request_type: str, index: int, with_trust_role: bool = True) -> str:
+    """A product custom resource request, as CloudFormation publishes it to the topic."""
+    trust = {'trust_role_arn': trust_role_arn(index)} if with_trust_role else {}
+    properties = {**(NEW_RESOURCE_PROPERTIES if request_type == 'Update' else RESOURCE_PROPERTIES), **trust}
+    old_properties = {**RESOURCE_PROPERTIES, **trust} if request_type == 'Update' else None
+    return create_product_body(request_type, stack_id(index), properties, old_properties)
+
+
+def product_event(request_type: str, index: int, with_trust_role: bool = True) -> dict[str, Any]:
+    """An SQS event that carries a single product custom resource request, as delivered to handle_product_event."""
+    return create_sqs_records(product_body(request_type, index, with_trust_role))
+
+
+def stack_lifecycle_events(stack_count: int, with_trust_role: bool = True) -> list[dict[str, Any]]:
+    # every stack is created, updated and deleted before the next one starts, so the service role trust policy never outgrows its quota
+    return [product_event(request_type, index, with_trust_role) for index in range(stack_count) for request_type in ('Create', 'Update', 'Delete')]
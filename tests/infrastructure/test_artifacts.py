@@ -0,0 +1,173 @@
+import importlib
+import shutil
+import subprocess
+import sys
+import tomllib
+from importlib import metadata
+from pathlib import Path
+
+import pytest
+from packaging.requirements import Requirement
+
+import cdk.demo.constants as constants
+from cdk.demo import artifacts
+from cdk.demo.assets import SlimLayerHooks
+
+REPO_ROOT = Path(__file__).parents[2]
+# the sources 'make build' copies into every function artifact, and every module a handler setting of the artifact points to
+ARTIFACT_HANDLERS = {
+    constants.LAMBDA_SOURCES: (
+        'catalog_backend.handlers.product_callback_handler',
+        'catalog_backend.handlers.views_stream_handler',
+        'catalog_backend.handlers.dlq_redrive_handler',
+        'catalog_backend.logic.inventory_export',
+    ),
+    constants.DEMO_SOURCES: ('demo.handlers.handler',),
+}
+
+
+def _write(path, content: str = 'x = 1\n') -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_prune_requirements_drops_runtime_sdks_and_stubs():
+    # Given: a poetry export with hashes on continuation lines
+    text = (
+        'boto3==1.35.0 ; python_version >= "3.13" \\\n    --hash=sha256:aaa\n'
+        'mypy-boto3-dynamodb==1.35.0 \\\n    --hash=sha256:bbb\n'
+        'types-cachetools==5.5.0\n'
+        'pydantic==2.9.0 \\\n    --hash=sha256:ccc\n'
+        'botocore==1.35.0\n'
+        'cachetools==5.5.0\n'
+    )
+
+    # When: pruning it
+    pruned, dropped = artifacts.prune_requirements(text)
+
+    # Then: the runtime provided SDKs and the stubs are dropped with their hashes, the rest is kept as is
+    assert dropped == ['boto3', 'types-cachetools', 'botocore']
+    assert pruned == 'mypy-boto3-dynamodb==1.35.0 \\\n    --hash=sha256:bbb\npydantic==2.9.0 \\\n    --hash=sha256:ccc\ncachetools==5.5.0\n'
+
+
+def test_prune_tree_keeps_only_runtime_files(tmp_path):
+    # Given: an installed layer
+    _write(tmp_path / 'pydantic' / 'main.py')
+    _write(tmp_path / 'pydantic' / '__pycache__' / 'main.cpython-311.pyc')
+    _write(tmp_path / 'pydantic' / 'py.typed', '')
+    _write(tmp_path / 'pydantic' / 'tests' / 'test_main.py')
+    _write(tmp_path / 'pydantic_core' / 'core_schema.pyi')
+    _write(tmp_path / 'pydantic-2.9.0.dist-info' / 'METADATA', 'Name: pydantic\nVersion: 2.9.0\n')
+    _write(tmp_path / 'pydantic-2.9.0.dist-info' / 'RECORD')
+    _write(tmp_path / 'boto3' / 'session.py')
+    _write(tmp_path / 'botocore-1.35.0.dist-info' / 'METADATA')
+    _write(tmp_path / 'mypy_boto3_dynamodb' / 'client.py')
+    _write(tmp_path / 'mypy_boto3_dynamodb' / 'client.pyi')
+    _write(tmp_path / 'types_cachetools-5.5.0.dist-info' / 'METADATA')
+
+    # When: pruning it
+    removed = artifacts.prune_tree(tmp_path)
+
+    # Then: only the modules and the metadata importlib needs are left
+    kept = sorted(path.relative_to(tmp_path).as_posix() for path in tmp_path.rglob('*') if path.is_file())
+    assert kept == ['mypy_boto3_dynamodb/client.py', 'pydantic-2.9.0.dist-info/METADATA', 'pydantic/main.py']
+    assert set(removed) == {'bytecode', 'stubs', 'tests', 'dist_info', 'runtime_sdk'}
+
+
+@pytest.mark.skipif(sys.version_info[:2] == artifacts.TARGET_PYTHON, reason='bytecode is only skipped for another interpreter')
+def test_slim_skips_bytecode_of_another_interpreter(tmp_path):
+    # Given: an artifact built with an interpreter other than the runtime's
+    _write(tmp_path / 'catalog_backend' / 'handler.py')
+
+    # When: slimming it with bytecode
+    report = artifacts.slim(tmp_path, budget_mb=1, compile_bytecode=True)
+
+    # Then: no bytecode the runtime would ignore is shipped
+    assert report['precompiled'] is False
+    assert not list(tmp_path.rglob('*.pyc'))
+
+
+def test_slim_fails_over_budget(tmp_path, monkeypatch, capsys):
+    # Given: an artifact larger than its budget
+    _write(tmp_path / 'catalog_backend' / 'handler.py', 'x' * 2048)
+    monkeypatch.setattr(sys, 'argv', ['artifacts.py', 'slim', str(tmp_path), '--budget-mb', '0.001'])
+
+    # When: slimming it
+    with pytest.raises(SystemExit) as exit_info:
+        artifacts.main()
+
+    # Then: the build fails after reporting the artifact's size
+    assert 'over its 0.001 MB budget' in str(exit_info.value.code)
+    assert '"unzipped_bytes": 2048' in capsys.readouterr().out
+
+
+def test_layer_is_slimmed_after_bundling():
+    # When: the layer's bundling hooks run
+    commands = SlimLayerHooks().after_bundling('/asset-input', '/asset-output/python')
+
+    # Then: the installed layer is slimmed and compiled inside the bundling container
+    assert commands == ['python /asset-input/artifacts.py slim /asset-output/python --compile --budget-mb 40']
+
+
+def _install_layer(target: Path) -> None:
+    """Copies the installed runtime dependencies and their dependencies into 'target', like the layer's pip install, except the runtime's SDKs."""
+    dependencies = tomllib.loads((REPO_ROOT / 'pyproject.toml').read_text())['tool']['poetry']['dependencies']
+    pending = [
+        Requirement(f'{name}[{",".join(spec.get("extras", []) if isinstance(spec, dict) else [])}]')
+        for name, spec in dependencies.items()
+        if name != 'python'
+    ]
+    visited = set()
+    while pending:
+        requirement = pending.pop()
+        if (artifacts._normalize(requirement.name), frozenset(requirement.extras)) in visited:
+            continue
+        visited.add((artifacts._normalize(requirement.name), frozenset(requirement.extras)))
+        distribution = metadata.distribution(requirement.name)
+        for dependency in map(Requirement, distribution.requires or []):
+            if dependency.marker is None or any(dependency.marker.evaluate({'extra': extra}) for extra in requirement.extras or {''}):
+                pending.append(dependency)
+        if artifacts._pruned_kind(requirement.name) == 'runtime_sdk':
+            continue
+        for file in distribution.files or []:
+            source = Path(distribution.locate_file(file))
+            if '..' not in file.parts and source.is_file():
+                (target / file).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(source, target / file)
+
+
+def _copy_artifact(sources: tuple[str, ...], code: Path) -> None:
+    # the function's own sources, the slimming script is a build input only
+    for source in sources:
+        if source != f'cdk/demo/{constants.ARTIFACTS_SCRIPT}':
+            copy = shutil.copytree if (REPO_ROOT / source).is_dir() else shutil.copyfile
+            (code / source).parent.mkdir(parents=True, exist_ok=True)
+            copy(REPO_ROOT / source, code / source)
+    artifacts.prune_tree(code)
+
+
+def test_handlers_import_from_slimmed_artifacts(tmp_path):
+    # Given: the layer and every function's code slimmed like 'make build' does, next to the SDKs the Lambda runtime ships
+    layer, runtime = tmp_path / 'layer', tmp_path / 'runtime'
+    _install_layer(layer)
+    artifacts.prune_tree(layer)
+    runtime.mkdir()
+    for package in artifacts.RUNTIME_PROVIDED:
+        (runtime / package).symlink_to(Path(importlib.import_module(package).__file__).parent)
+
+    for index, (sources, handler_modules) in enumerate(ARTIFACT_HANDLERS.items()):
+        code = tmp_path / f'code-{index}'
+        _copy_artifact(sources, code)
+
+        # When: importing every handler module of the artifact without any site packages
+        script = f'import importlib\nfor module in {handler_modules!r}:\n    importlib.import_module(module)\n'
+        result = subprocess.run(
+            [sys.executable, '-S', '-c', script],
+            env={'PYTHONPATH': f'{code}:{layer}:{runtime}', 'AWS_DEFAULT_REGION': 'us-east-1', 'POWERTOOLS_TRACE_DISABLED': 'true'},
+            cwd=tmp_path,
+            capture_output=True,
+            text=True,
+        )
+
+        # Then: nothing the handlers import was pruned or left out of their artifact
+        assert result.returncode == 0, result.stderr
@@ -1,17 +1,220 @@
+import hashlib
+import json
+import os
+
+import pytest
 from aws_cdk import App
-from aws_cdk.assertions import Template
+from aws_cdk.assertions import Match, Template
 
+import cdk.demo.constants as constants
+from cdk.demo.assets import check_build_is_fresh, fingerprint, record_build
 from cdk.demo.stack import ServiceStack
+from cdk.demo.utils import get_organization_id
 
 
 def test_synthesizes_properly():
-    app = App()
+    # the organization id comes from the context, synth runs without calling AWS, and Docker bundling is skipped
+    app = App(context={'organization_id': 'o-test', 'aws:cdk:bundling-stacks': []})
 
     service_stack = ServiceStack(app, 'service-test')
 
     # Prepare the stack for assertions.
     template = Template.from_stack(service_stack)
 
-    template.resource_count_is('AWS::DynamoDB::GlobalTable', 1)  # main db
+    template.resource_count_is('AWS::DynamoDB::GlobalTable', 2)  # main db and views db
     template.resource_count_is('AWS::ServiceCatalog::CloudFormationProduct', 3)  # two products
     template.resource_count_is('AWS::ServiceCatalog::Portfolio', 1)  # one portfolio
+    template.resource_count_is('AWS::Lambda::EventSourceMapping', 3)  # provision and delete lanes, views stream
+    template.has_resource_properties(
+        'AWS::SNS::Subscription',
+        {'FilterPolicyScope': 'MessageBody', 'FilterPolicy': {'ResourceType': ['Custom::PlatformEngGovernanceEnabler'], 'RequestType': ['Delete']}},
+    )
+
+
+def test_organization_id_comes_from_the_override_or_context():
+    # Given/When/Then: the explicit override wins over the context
+    assert get_organization_id(App(context={'organization_id': 'o-context'}), 'o-override') == 'o-override'
+    assert get_organization_id(App(context={'organization_id': 'o-context'})) == 'o-context'
+
+
+def test_missing_organization_id_fails_synth_without_calling_aws(mocker):
+    # Given: no organization id in the context, and any AWS call failing the test
+    client = mocker.patch('boto3.client')
+
+    # When/Then: synth stops and tells how to set it
+    with pytest.raises(ValueError, match='-c organization_id=o-'):
+        get_organization_id(App())
+    client.assert_not_called()
+
+
+def test_fast_synth_fingerprints_assets_by_source():
+    # Given: an app in fast synth mode
+    app = App(context={'organization_id': 'o-test', 'aws:cdk:bundling-stacks': [], 'fast_synth': True})
+
+    # When: synthesizing the stack
+    template = Template.from_stack(ServiceStack(app, 'service-test')).to_json()
+
+    # Then: function assets are keyed by the fingerprint of their source trees, not by a hash of the copied build folder
+    code_keys = {
+        resource['Properties']['Code'].get('S3Key') for resource in template['Resources'].values() if resource['Type'] == 'AWS::Lambda::Function'
+    }
+    # CDK hashes the custom hash once more
+    assert f'{hashlib.sha256(fingerprint(*constants.LAMBDA_SOURCES).encode()).hexdigest()}.zip' in code_keys
+    assert f'{hashlib.sha256(fingerprint(*constants.DEMO_SOURCES).encode()).hexdigest()}.zip' in code_keys
+
+
+def test_fast_synth_fails_on_a_stale_build(tmp_path, monkeypatch):
+    # Given: a build recorded from its sources
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'catalog_backend').mkdir()
+    (tmp_path / 'catalog_backend' / 'handler.py').write_text('x = 1')
+    monkeypatch.setattr(constants, 'BUILD_SOURCES', {'.build/lambdas/': ('catalog_backend',)})
+    record_file = str(tmp_path / 'fingerprints.json')
+    fingerprint.cache_clear()
+    record_build(record_file)
+    check_build_is_fresh('.build/lambdas/', 'catalog_backend', record_file=record_file)
+
+    # When: the source changes after the build, with a file time older than the build's like a checkout of an older commit can leave
+    (tmp_path / 'catalog_backend' / 'handler.py').write_text('x = 2')
+    os.utime(tmp_path / 'catalog_backend' / 'handler.py', (1000, 1000))
+    fingerprint.cache_clear()
+
+    # Then: synth fails instead of deploying the stale build under the fingerprint of the new source
+    with pytest.raises(ValueError, match='run "make build"'):
+        check_build_is_fresh('.build/lambdas/', 'catalog_backend', record_file=record_file)
+    with pytest.raises(ValueError, match='no recorded build'):
+        check_build_is_fresh('.build/demo/', 'catalog_backend', record_file=record_file)
+
+
+def test_fingerprint_ignores_bytecode(tmp_path):
+    # Given: a source tree
+    (tmp_path / 'handler.py').write_text('x = 1')
+    before = fingerprint.__wrapped__(str(tmp_path))
+
+    # When: bytecode is generated next to it
+    (tmp_path / '__pycache__').mkdir()
+    (tmp_path / '__pycache__' / 'handler.cpython-313.pyc').write_bytes(b'bytecode')
+
+    # Then: the fingerprint only changes with the sources
+    assert fingerprint.__wrapped__(str(tmp_path)) == before
+    (tmp_path / 'handler.py').write_text('x = 2')
+    assert fingerprint.__wrapped__(str(tmp_path)) != before
+
+
+def test_snap_start_lanes_invoke_the_published_alias():
+    # Given: an app with SnapStart enabled for the governance function
+    app = App(context={'organization_id': 'o-test', 'aws:cdk:bundling-stacks': []})
+
+    # When: synthesizing the stack
+    template = Template.from_stack(ServiceStack(app, 'service-test', snap_start=True))
+
+    # Then: the function warms up during its init phase and is snapshotted, both lanes invoke its live alias
+    template.has_resource_properties(
+        'AWS::Lambda::Function',
+        {
+            'Handler': 'catalog_backend.handlers.product_callback_handler.handle_product_event',
+            'SnapStart': {'ApplyOn': 'PublishedVersions'},
+            'Environment': {'Variables': Match.object_like({'PREWARM_ON_INIT': 'true'})},
+        },
+    )
+    template.resource_properties_count_is('AWS::Lambda::Alias', {'Name': 'live'}, 1)
+    mappings = template.find_resources('AWS::Lambda::EventSourceMapping')
+    alias_targets = [mapping for mapping in mappings.values() if json.dumps(mapping['Properties']['FunctionName']).endswith(':live"]]}')]
+    assert len(alias_targets) == 2
+
+
+def test_on_demand_function_does_not_prewarm_on_init():
+    # Given: an app with neither SnapStart nor provisioned concurrency
+    app = App(context={'organization_id': 'o-test', 'aws:cdk:bundling-stacks': []})
+
+    # When: synthesizing the stack
+    template = Template.from_stack(ServiceStack(app, 'service-test', snap_start=False, provisioned_concurrency=False))
+
+    # Then: cold starts leave the one time work to the first invocation instead of paying for it up front
+    template.has_resource_properties(
+        'AWS::Lambda::Function',
+        {
+            'Handler': 'catalog_backend.handlers.product_callback_handler.handle_product_event',
+            'Environment': {'Variables': Match.object_like({'PREWARM_ON_INIT': 'false'})},
+        },
+    )
+
+
+def test_provisioned_concurrency_scales_on_the_lanes_backlog():
+    # Given: an app with provisioned concurrency for the governance function
+    app = App(context={'organization_id': 'o-test', 'aws:cdk:bundling-stacks': []})
+
+    # When: synthesizing the stack
+    template = Template.from_stack(ServiceStack(app, 'service-test', provisioned_concurrency=True))
+
+    # Then: the live alias is provisioned and scaled on the lanes' backlog, up to the lanes' combined maximum concurrency
+    template.has_resource_properties('AWS::Lambda::Alias', {'Name': 'live', 'ProvisionedConcurrencyConfig': {'ProvisionedConcurrentExecutions': 1}})
+    template.has_resource_properties(
+        'AWS::Lambda::Function',
+        {
+            'Handler': 'catalog_backend.handlers.product_callback_handler.handle_product_event',
+            'Environment': {'Variables': Match.object_like({'PREWARM_ON_INIT': 'true'})},
+        },
+    )
+    template.has_resource_properties(
+        'AWS::ApplicationAutoScaling::ScalableTarget',
+        {'ScalableDimension': 'lambda:function:ProvisionedConcurrency', 'MinCapacity': 1, 'MaxCapacity': 10},
+    )
+    template.resource_properties_count_is('AWS::ApplicationAutoScaling::ScalingPolicy', {'PolicyType': 'StepScaling'}, 2)  # scale out and in
+    backlog = Match.array_with([Match.object_like({'Expression': 'MAX([depth0 + depth1, IF(MAX([age0, age1]) >= 60, 100, 0)])'})])
+    assert len(template.find_resources('AWS::CloudWatch::Alarm', {'Properties': {'Metrics': backlog}})) == 2
+    template.has_resource_properties('AWS::Lambda::EventSourceMapping', {'ScalingConfig': {'MaximumConcurrency': 5}})
+
+
+def test_snap_start_and_provisioned_concurrency_are_exclusive():
+    # When/Then: enabling both fails the synth
+    with pytest.raises(ValueError):
+        ServiceStack(
+            App(context={'organization_id': 'o-test', 'aws:cdk:bundling-stacks': []}), 'service-test', snap_start=True, provisioned_concurrency=True
+        )
+
+
+def test_end_to_end_latency_slo_alarm():
+    # Given: the service stack
+    app = App(context={'organization_id': 'o-test', 'aws:cdk:bundling-stacks': []})
+
+    # When: synthesizing it
+    template = Template.from_stack(ServiceStack(app, 'service-test'))
+
+    # Then: the slowest request type's p99 end-to-end latency is alarmed on
+    template.has_resource_properties(
+        'AWS::CloudWatch::Alarm',
+        {
+            'Threshold': 60_000,
+            'EvaluationPeriods': 5,
+            'DatapointsToAlarm': 3,
+            'TreatMissingData': 'notBreaching',
+            'Metrics': Match.array_with([Match.object_like({'Expression': 'MAX([p99create, p99update, p99delete])'})]),
+        },
+    )
+
+
+def test_trust_policy_headroom_alarm():
+    # Given: the service stack
+    app = App(context={'organization_id': 'o-test', 'aws:cdk:bundling-stacks': []})
+
+    # When: synthesizing it
+    template = Template.from_stack(ServiceStack(app, 'service-test'))
+
+    # Then: the governance function knows the quota and low trust policy headroom is alarmed on
+    template.has_resource_properties('AWS::Lambda::Function', {'Environment': {'Variables': Match.object_like({'TRUST_POLICY_QUOTA': '2048'})}})
+    template.has_resource_properties(
+        'AWS::CloudWatch::Alarm',
+        {
+            'Metrics': Match.array_with(
+                [
+                    Match.object_like(
+                        {'MetricStat': Match.object_like({'Metric': Match.object_like({'MetricName': 'TrustPolicyHeadroom'}), 'Stat': 'Minimum'})}
+                    )
+                ]
+            ),
+            'Threshold': 20,
+            'ComparisonOperator': 'LessThanThreshold',
+            'TreatMissingData': 'notBreaching',
+        },
+    )
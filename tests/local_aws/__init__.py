@@ -0,0 +1,163 @@
+import json
+import time
+from typing import Any, Optional
+from unittest import mock
+
+import boto3
+from aws_lambda_env_modeler import modeler_impl
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from botocore.awsrequest import AWSResponse
+
+from catalog_backend.dal.history import RECENT_CHANGES_INDEX, RECENT_PARTITION_KEY, RECENT_SORT_KEY
+from tests.local_aws import dynamodb, iam
+from tests.local_aws.budget import assert_call_budget, call_budget
+from tests.local_aws.cfn import CfnResponseCollector
+from tests.local_aws.dynamodb import DynamoDbStandIn
+from tests.local_aws.errors import LocalAwsError
+from tests.local_aws.faults import FaultInjector, FaultProfile, FixedLatency, LongTailLatency
+from tests.local_aws.iam import IamStandIn
+
+__all__ = [
+    'FaultInjector',
+    'FaultProfile',
+    'FixedLatency',
+    'LocalAws',
+    'LocalAwsError',
+    'LocalLambdaContext',
+    'LongTailLatency',
+    'assert_call_budget',
+    'call_budget',
+    'reset_caches',
+]
+
+TABLE_NAME = 'local-governance'
+PORTFOLIO_ID = 'port-localportfolio'
+SERVICE_ROLE_NAME = 'local-service-role'
+VIEWS_TABLE_NAME = 'local-views'
+
+
+class _RawBody:
+    def __init__(self, body: bytes) -> None:
+        self._body = body
+
+    def stream(self, **kwargs: Any):
+        yield self._body
+
+
+def _response(request: Any, status_code: int, body: str, content_type: str) -> AWSResponse:
+    headers = {'content-type': content_type, 'x-amzn-requestid': 'local-request'}
+    return AWSResponse(request.url, status_code, headers, _RawBody(body.encode()))
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else (value or '')
+
+
+def reset_caches() -> None:
+    # boto3 clients, tables and parsed environment variables are cached across invocations, drop them so they are rebuilt against the stand-ins
+    from catalog_backend.dal import reset_dal_handlers
+    from catalog_backend.logic.iam.helpers import get_iam_client
+
+    reset_dal_handlers()
+    get_iam_client.cache_clear()
+    getattr(modeler_impl, '__parse_model_with_cache').cache_clear()
+
+
+class LocalLambdaContext(LambdaContext):
+    def __init__(self, timeout_ms: int = 30_000, memory_limit_in_mb: int = 192) -> None:
+        self._aws_request_id = 'local-request'
+        self._function_name = 'local-governance'
+        self._memory_limit_in_mb = memory_limit_in_mb
+        self._invoked_function_arn = 'arn:aws:lambda:us-east-1:123456789012:function:local-governance'
+        self._deadline = time.monotonic() + timeout_ms / 1000
+
+    def get_remaining_time_in_millis(self) -> int:  # type: ignore[override]
+        return int((self._deadline - time.monotonic()) * 1000)
+
+
+class LocalAws:
+    """
+    Local stand-ins for IAM, DynamoDB and the CloudFormation ResponseURL.
+    Real boto3 clients are used, requests are answered at botocore's 'before-send' hook, so serialization, retries and event hooks all run.
+    Latency, throttling and partial batch failures are injected with self.faults, nothing is injected until a FaultProfile is configured.
+    """
+
+    def __init__(self, region: str = 'us-east-1', faults: Optional[FaultInjector] = None) -> None:
+        self.faults = faults or FaultInjector()
+        self.dynamodb = DynamoDbStandIn(self.faults)
+        self.iam = IamStandIn()
+        self.cfn = CfnResponseCollector(self.faults)
+        self.session = boto3.Session(aws_access_key_id='local', aws_secret_access_key='local', region_name=region)
+        self.session.events.register('before-send.dynamodb', self._send_dynamodb)
+        self.session.events.register('before-send.iam', self._send_iam)
+        self._previous_session: Optional[boto3.Session] = None
+        self._cfn_patch = mock.patch('crhelper.utils.HTTPSConnection', self.cfn.connection)
+
+    def __enter__(self) -> 'LocalAws':
+        self._previous_session = boto3.DEFAULT_SESSION
+        boto3.DEFAULT_SESSION = self.session
+        self._cfn_patch.start()
+        reset_caches()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._cfn_patch.stop()
+        boto3.DEFAULT_SESSION = self._previous_session
+        reset_caches()
+
+    def setup_governance_service(
+        self, table_name: str = TABLE_NAME, portfolio_id: str = PORTFOLIO_ID, service_role_name: str = SERVICE_ROLE_NAME
+    ) -> dict[str, str]:
+        """Creates the governance table and service role, returns the environment variables the governance function expects."""
+        self.dynamodb.create_table(
+            table_name,
+            partition_key='portfolio_id',
+            sort_key='product_stack_id',
+            indexes={RECENT_CHANGES_INDEX: (RECENT_PARTITION_KEY, RECENT_SORT_KEY)},
+        )
+        env = {
+            'POWERTOOLS_SERVICE_NAME': 'IamPortfolio',
+            'POWERTOOLS_METRICS_NAMESPACE': 'IamPlatformEngineering',
+            'POWERTOOLS_TRACE_DISABLED': 'true',
+            'LOG_LEVEL': 'ERROR',
+            'AWS_DEFAULT_REGION': self.session.region_name,
+            'TABLE_NAME': table_name,
+            'PORTFOLIO_ID': portfolio_id,
+            'SERVICE_ROLE_NAME': service_role_name,
+            'SERVICE_ROLE_ARN': self.iam.create_role(service_role_name),
+        }
+        return env
+
+    def setup_views_service(self, table_name: str = TABLE_NAME, views_table_name: str = VIEWS_TABLE_NAME) -> dict[str, str]:
+        """
+        Enables the stream of an existing governance table and creates the views table, returns the environment variables the views function expects.
+        Replay the recorded changes with self.dynamodb.table(table_name).stream_events().
+        """
+        self.dynamodb.table(table_name).enable_stream()
+        self.dynamodb.create_table(views_table_name, partition_key='view_id', sort_key='item_id')
+        return {
+            'POWERTOOLS_SERVICE_NAME': 'IamPortfolioViews',
+            'POWERTOOLS_METRICS_NAMESPACE': 'IamPlatformEngineering',
+            'POWERTOOLS_TRACE_DISABLED': 'true',
+            'LOG_LEVEL': 'ERROR',
+            'AWS_DEFAULT_REGION': self.session.region_name,
+            'VIEWS_TABLE_NAME': views_table_name,
+        }
+
+    def _send_dynamodb(self, request: Any, **kwargs: Any) -> AWSResponse:
+        operation, params = dynamodb.parse_request(_text(request.headers.get('X-Amz-Target')), request.body)
+        content_type = 'application/x-amz-json-1.0'
+        try:
+            self.faults.before_request('dynamodb', operation)
+            return _response(request, 200, json.dumps(self.dynamodb.handle(operation, params)), content_type)
+        except LocalAwsError as error:
+            body = json.dumps({'__type': f'com.amazonaws.dynamodb.v20120810#{error.code}', 'message': error.message, **error.details})
+            return _response(request, error.status_code, body, content_type)
+
+    def _send_iam(self, request: Any, **kwargs: Any) -> AWSResponse:
+        operation, params = iam.parse_request(request.body if isinstance(request.body, bytes) else _text(request.body).encode())
+        try:
+            self.faults.before_request('iam', operation)
+            return _response(request, 200, self.iam.handle(operation, params), 'text/xml')
+        except LocalAwsError as error:
+            return _response(request, error.status_code, iam.error_response(error), 'text/xml')
@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+from typing import Iterator, Union
+
+from catalog_backend.handlers.utils.api_calls import ApiCallLedger, track_api_calls
+
+# an exact number of calls, or an inclusive (min, max) range
+CallBudget = dict[str, Union[int, tuple[int, int]]]
+
+
+def assert_call_budget(ledger: ApiCallLedger, budget: CallBudget) -> None:
+    """
+    Fails unless every operation was called within its budget, operations missing from the budget may not be called at all, e.g.
+    {'IAM.GetRole': 1, 'IAM.UpdateAssumeRolePolicy': (0, 1), 'DynamoDB.DeleteItem': 1, 'CloudFormation.ResponseURL': 1}
+    """
+    violations = []
+    for operation in sorted(set(budget) | set(ledger.operations)):
+        allowed = budget.get(operation, 0)
+        low, high = allowed if isinstance(allowed, tuple) else (allowed, allowed)
+        calls = ledger.calls(operation)
+        if not low <= calls <= high:
+            violations.append(f'{operation}: {calls} calls, budget {allowed}')
+    assert not violations, f'AWS call budget exceeded: {"; ".join(violations)}, all calls: {ledger.counts()}'
+
+
+@contextmanager
+def call_budget(budget: CallBudget) -> Iterator[ApiCallLedger]:
+    """Tracks the AWS calls made inside the block and asserts them against the budget when it exits."""
+    with track_api_calls() as ledger:
+        yield ledger
+    assert_call_budget(ledger, budget)
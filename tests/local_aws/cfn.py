@@ -0,0 +1,45 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Optional
+
+from tests.local_aws.errors import LocalAwsError
+from tests.local_aws.faults import FaultInjector
+
+
+class CfnResponseCollector:
+    """Stands in for the CloudFormation ResponseURL, records every custom resource response crhelper sends."""
+
+    def __init__(self, faults: Optional[FaultInjector] = None) -> None:
+        self.faults = faults or FaultInjector()
+        self.responses: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def connection(self, host: str, context: Any = None) -> '_CfnConnection':
+        return _CfnConnection(self, host)
+
+    def record(self, url: str, body: str) -> None:
+        with self._lock:
+            self.responses.append({'url': url, 'body': json.loads(body), 'sent_at': time.time()})
+
+    def last_response(self, request_id: Optional[str] = None) -> dict[str, Any]:
+        responses = [response for response in self.responses if request_id in (None, response['body']['RequestId'])]
+        return responses[-1]['body']
+
+
+class _CfnConnection:
+    def __init__(self, collector: CfnResponseCollector, host: str) -> None:
+        self.collector = collector
+        self.host = host
+
+    def request(self, method: str, url: str, body: str, headers: dict) -> None:
+        try:
+            self.collector.faults.before_request('cloudformation', 'ResponseURL')
+        except LocalAwsError as error:
+            # a failed PUT to the presigned S3 URL, crhelper retries it after 2 seconds
+            raise ConnectionResetError(error.message) from error
+        self.collector.record(f'https://{self.host}{url}', body)
+
+    def getresponse(self) -> SimpleNamespace:
+        return SimpleNamespace(status=200, reason='OK')
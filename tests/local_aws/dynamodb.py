@@ -0,0 +1,338 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+from tests.local_aws.errors import LocalAwsError
+from tests.local_aws.faults import FaultInjector
+
+# a small, in-memory DynamoDB that speaks the JSON wire protocol, it supports the expressions the DAL emits, not the full grammar
+_CLAUSE_SPLIT = re.compile(r'\s+AND\s+(?![^()]*\))', re.IGNORECASE)
+_OR_SPLIT = re.compile(r'\s+OR\s+(?![^()]*\))', re.IGNORECASE)
+_BEGINS_WITH = re.compile(r'begins_with\(\s*([#\w]+)\s*,\s*(:\w+)\s*\)', re.IGNORECASE)
+_BETWEEN = re.compile(r'([#\w]+)\s+BETWEEN\s+(:\w+)\s+AND\s+(:\w+)', re.IGNORECASE)
+_COMPARISON = re.compile(r'([#\w]+)\s*(=|<>|<=|>=|<|>)\s*(:\w+)')
+_UPDATE_CLAUSE = re.compile(r'(SET|ADD)\s+(.+?)(?=\s+(?:SET|ADD)\s+|$)', re.IGNORECASE)
+_ATTRIBUTE_EXISTS = re.compile(r'(attribute_exists|attribute_not_exists)\(\s*([#\w]+)\s*\)', re.IGNORECASE)
+_MAX_BATCH_WRITE_REQUESTS = 25
+
+Item = dict[str, dict]
+Key = tuple
+
+
+def _sortable(value: dict) -> Any:
+    value_type, raw = next(iter(value.items()))
+    return Decimal(raw) if value_type == 'N' else raw
+
+
+def _segment_of(partition: Any, total_segments: int) -> int:
+    return int(hashlib.md5(str(partition).encode(), usedforsecurity=False).hexdigest()[:8], 16) % total_segments
+
+
+def _apply_update(item: Item, params: dict) -> Item:
+    # supports 'SET #a = :v' and 'ADD #n :delta' clauses, comma separated
+    expression = Expression(params.get('ExpressionAttributeNames'), params.get('ExpressionAttributeValues'))
+    item = dict(item)
+    for action, assignments in _UPDATE_CLAUSE.findall(params['UpdateExpression'].strip()):
+        for assignment in assignments.split(','):
+            if action.upper() == 'SET':
+                name, value = (token.strip() for token in assignment.split('='))
+                item[expression.name(name)] = expression.values[value]
+            else:
+                name, value = assignment.split()
+                current = _sortable(item.get(expression.name(name), {'N': '0'}))
+                item[expression.name(name)] = {'N': str(current + _sortable(expression.values[value]))}
+    return item
+
+
+class Expression:
+    def __init__(self, names: Optional[dict], values: Optional[dict]) -> None:
+        self.names = names or {}
+        self.values = values or {}
+
+    def name(self, token: str) -> str:
+        return self.names.get(token, token)
+
+    def _clause_matcher(self, clause: str) -> Callable[[Item], bool]:
+        clause = clause.strip()
+        if clause.startswith('(') and clause.endswith(')'):
+            return self.matcher(clause[1:-1])
+        if match := _BEGINS_WITH.fullmatch(clause):
+            name, prefix = self.name(match.group(1)), _sortable(self.values[match.group(2)])
+            return lambda item: name in item and str(_sortable(item[name])).startswith(prefix)
+        if match := _BETWEEN.fullmatch(clause):
+            name, low, high = self.name(match.group(1)), _sortable(self.values[match.group(2)]), _sortable(self.values[match.group(3)])
+            return lambda item: name in item and low <= _sortable(item[name]) <= high
+        if match := _ATTRIBUTE_EXISTS.fullmatch(clause):
+            name, should_exist = self.name(match.group(2)), match.group(1).lower() == 'attribute_exists'
+            return lambda item: (name in item) == should_exist
+        if match := _COMPARISON.fullmatch(clause):
+            return self._comparison(self.name(match.group(1)), match.group(2), _sortable(self.values[match.group(3)]))
+        raise LocalAwsError('ValidationException', f'unsupported expression clause: {clause}')
+
+    @staticmethod
+    def _comparison(name: str, operator: str, value: Any) -> Callable[[Item], bool]:
+        operators: dict[str, Callable[[Any, Any], bool]] = {
+            '=': lambda left, right: left == right,
+            '<>': lambda left, right: left != right,
+            '<': lambda left, right: left < right,
+            '<=': lambda left, right: left <= right,
+            '>': lambda left, right: left > right,
+            '>=': lambda left, right: left >= right,
+        }
+        return lambda item: name in item and operators[operator](_sortable(item[name]), value)
+
+    def matcher(self, expression: Optional[str]) -> Callable[[Item], bool]:
+        if not expression:
+            return lambda item: True
+        # AND binds tighter than OR
+        groups = [[self._clause_matcher(clause) for clause in _CLAUSE_SPLIT.split(group)] for group in _OR_SPLIT.split(expression.strip())]
+        return lambda item: any(all(matcher(item) for matcher in matchers) for matchers in groups)
+
+
+class Table:
+    def __init__(self, name: str, partition_key: str, sort_key: Optional[str], indexes: Optional[dict[str, tuple[str, str]]] = None) -> None:
+        self.name = name
+        self.partition_key = partition_key
+        self.sort_key = sort_key
+        self.indexes = indexes or {}  # global secondary indexes, name to (partition key, sort key), all attributes projected
+        self.items: dict[Key, Item] = {}
+        self.stream: Optional[list[dict]] = None  # NEW_AND_OLD_IMAGES stream records once enabled
+        self._sequence_number = 0
+
+    def enable_stream(self) -> None:
+        self.stream = []
+
+    def write(self, key: Key, item: Optional[Item]) -> None:
+        """Puts or, for None, deletes an item and records the change on the table's stream."""
+        previous = self.items.pop(key, None) if item is None else self.items.get(key)
+        if item is not None:
+            self.items[key] = item
+        if self.stream is None or (previous is None and item is None):
+            return
+        self._sequence_number += 1
+        change = {
+            'ApproximateCreationDateTime': time.time(),
+            'Keys': self.key_attributes(item or previous),  # type: ignore[arg-type]
+            'SequenceNumber': f'{self._sequence_number:021d}',
+            'SizeBytes': len(json.dumps(item or previous)),
+            'StreamViewType': 'NEW_AND_OLD_IMAGES',
+        }
+        if item is not None:
+            change['NewImage'] = item
+        if previous is not None:
+            change['OldImage'] = previous
+        self.stream.append(
+            {
+                'eventID': f'{self._sequence_number:032x}',
+                'eventName': 'INSERT' if previous is None else 'REMOVE' if item is None else 'MODIFY',
+                'eventVersion': '1.1',
+                'eventSource': 'aws:dynamodb',
+                'awsRegion': 'us-east-1',
+                'dynamodb': change,
+                'eventSourceARN': f'arn:aws:dynamodb:us-east-1:123456789012:table/{self.name}/stream/2024-01-01T00:00:00.000',
+            }
+        )
+
+    def stream_events(self, batch_size: int = 100) -> list[dict]:
+        """Drains the stream into Lambda event source mapping events of up to 'batch_size' records."""
+        records = self.stream or []
+        if self.stream is not None:
+            self.stream = []
+        return [{'Records': records[start : start + batch_size]} for start in range(0, len(records), batch_size)]
+
+    def key_of(self, item: Item) -> Key:
+        try:
+            partition = _sortable(item[self.partition_key])
+            return (partition, _sortable(item[self.sort_key])) if self.sort_key else (partition,)
+        except KeyError as exc:
+            raise LocalAwsError('ValidationException', f'missing key attribute {exc}') from exc
+
+    def key_attributes(self, item: Item) -> Item:
+        names = [self.partition_key] + ([self.sort_key] if self.sort_key else [])
+        return {name: item[name] for name in names}
+
+
+class DynamoDbStandIn:
+    def __init__(self, faults: Optional[FaultInjector] = None) -> None:
+        self.faults = faults or FaultInjector()
+        self.tables: dict[str, Table] = {}
+        # the items of a transaction stay locked for this long after it commits, a concurrent transaction on one of them is cancelled
+        # with a TransactionConflict like DynamoDB cancels transactions that overlap in flight
+        self.transaction_hold_seconds = 0.0
+        self._held: Counter = Counter()
+        self._lock = threading.RLock()
+
+    def create_table(
+        self, name: str, partition_key: str, sort_key: Optional[str] = None, indexes: Optional[dict[str, tuple[str, str]]] = None
+    ) -> Table:
+        self.tables[name] = Table(name, partition_key, sort_key, indexes)
+        return self.tables[name]
+
+    def table(self, name: str) -> Table:
+        if name not in self.tables:
+            raise LocalAwsError('ResourceNotFoundException', f'Requested resource not found: Table: {name} not found')
+        return self.tables[name]
+
+    def handle(self, operation: str, params: dict) -> dict:
+        handler = getattr(self, f'_{operation}', None)
+        if handler is None:
+            raise LocalAwsError('UnknownOperationException', f'{operation} is not supported by the local stand-in')
+        with self._lock:
+            response = handler(params)
+            held = self._transaction_keys(params) if operation == 'TransactWriteItems' and self.transaction_hold_seconds else []
+            self._held.update(held)
+        if held:
+            time.sleep(self.transaction_hold_seconds)
+            with self._lock:
+                self._held.subtract(held)
+        return response
+
+    def _transaction_keys(self, params: dict) -> list[tuple[str, Key]]:
+        keys = []
+        for transact_item in params['TransactItems']:
+            ((action, request),) = transact_item.items()
+            table = self.table(request['TableName'])
+            keys.append((table.name, table.key_of(request['Item'] if action == 'Put' else request['Key'])))
+        return keys
+
+    @staticmethod
+    def _check_condition(params: dict, current: Optional[Item]) -> None:
+        condition = params.get('ConditionExpression')
+        if condition:
+            expression = Expression(params.get('ExpressionAttributeNames'), params.get('ExpressionAttributeValues'))
+            if not expression.matcher(condition)(current or {}):
+                raise LocalAwsError('ConditionalCheckFailedException', 'The conditional request failed')
+
+    def _PutItem(self, params: dict) -> dict:
+        table = self.table(params['TableName'])
+        key = table.key_of(params['Item'])
+        previous = table.items.get(key)
+        self._check_condition(params, previous)
+        table.write(key, params['Item'])
+        return {'Attributes': previous} if previous and params.get('ReturnValues') == 'ALL_OLD' else {}
+
+    def _GetItem(self, params: dict) -> dict:
+        table = self.table(params['TableName'])
+        item = table.items.get(table.key_of(params['Key']))
+        return {'Item': item} if item else {}
+
+    def _DeleteItem(self, params: dict) -> dict:
+        table = self.table(params['TableName'])
+        key = table.key_of(params['Key'])
+        self._check_condition(params, table.items.get(key))
+        previous = table.items.get(key)
+        table.write(key, None)
+        return {'Attributes': previous} if previous and params.get('ReturnValues') == 'ALL_OLD' else {}
+
+    def _UpdateItem(self, params: dict) -> dict:
+        table = self.table(params['TableName'])
+        key = table.key_of(params['Key'])
+        previous = table.items.get(key)
+        self._check_condition(params, previous)
+        table.write(key, _apply_update({**(previous or {}), **params['Key']}, params))
+        return {'Attributes': table.items[key]} if params.get('ReturnValues') == 'ALL_NEW' else {}
+
+    def _cancellation_reason(self, table: Table, key: Key, request: dict) -> dict:
+        if self._held[(table.name, key)] > 0:
+            return {'Code': 'TransactionConflict', 'Message': 'Transaction is ongoing for the item'}
+        try:
+            self._check_condition(request, table.items.get(key))
+            return {'Code': 'None'}
+        except LocalAwsError:
+            return {'Code': 'ConditionalCheckFailed', 'Message': 'The conditional request failed'}
+
+    def _TransactWriteItems(self, params: dict) -> dict:
+        # validate every condition before applying any write, all or nothing
+        writes, reasons = [], []
+        for transact_item in params['TransactItems']:
+            ((action, request),) = transact_item.items()
+            table = self.table(request['TableName'])
+            key = table.key_of(request['Item'] if action == 'Put' else request['Key'])
+            reasons.append(self._cancellation_reason(table, key, request))
+            writes.append((action, table, key, request))
+        if len({(table.name, key) for _, table, key, _ in writes}) != len(writes):
+            raise LocalAwsError('ValidationException', 'Transaction request cannot include multiple operations on one item')
+        if any(reason['Code'] != 'None' for reason in reasons):
+            codes = ', '.join(reason['Code'] for reason in reasons)
+            message = f'Transaction cancelled, please refer cancellation reasons for specific reasons [{codes}]'
+            raise LocalAwsError('TransactionCanceledException', message, details={'CancellationReasons': reasons})
+        for action, table, key, request in writes:
+            if action == 'Put':
+                table.write(key, request['Item'])
+            elif action == 'Delete':
+                table.write(key, None)
+            elif action == 'Update':
+                table.write(key, _apply_update({**table.items.get(key, {}), **request['Key']}, request))
+        return {}
+
+    def _BatchWriteItem(self, params: dict) -> dict:
+        requests = [(table_name, request) for table_name, table_requests in params['RequestItems'].items() for request in table_requests]
+        if not 0 < len(requests) <= _MAX_BATCH_WRITE_REQUESTS:
+            raise LocalAwsError('ValidationException', f'Too many items requested for the BatchWriteItem call, at most {_MAX_BATCH_WRITE_REQUESTS}')
+        unprocessed: dict[str, list[dict]] = {}
+        for table_name, request in requests:
+            table = self.table(table_name)
+            if self.faults.unprocessed('dynamodb', 'BatchWriteItem'):
+                unprocessed.setdefault(table_name, []).append(request)
+            elif 'PutRequest' in request:
+                table.write(table.key_of(request['PutRequest']['Item']), request['PutRequest']['Item'])
+            else:
+                table.write(table.key_of(request['DeleteRequest']['Key']), None)
+        return {'UnprocessedItems': unprocessed}
+
+    def _Query(self, params: dict) -> dict:
+        table = self.table(params['TableName'])
+        expression = Expression(params.get('ExpressionAttributeNames'), params.get('ExpressionAttributeValues'))
+        key_matcher, filter_matcher = expression.matcher(params['KeyConditionExpression']), expression.matcher(params.get('FilterExpression'))
+        if 'IndexName' in params:
+            return self._query_index(table, params, key_matcher, filter_matcher)
+        candidates = sorted((key, item) for key, item in table.items.items() if key_matcher(item))
+        if not params.get('ScanIndexForward', True):
+            candidates.reverse()
+        return self._page(table, candidates, params, filter_matcher)
+
+    def _Scan(self, params: dict) -> dict:
+        table = self.table(params['TableName'])
+        expression = Expression(params.get('ExpressionAttributeNames'), params.get('ExpressionAttributeValues'))
+        candidates = sorted(table.items.items())
+        if 'TotalSegments' in params:
+            # segments split the partition key hash space, every partition belongs to exactly one segment
+            candidates = [(key, item) for key, item in candidates if _segment_of(key[0], params['TotalSegments']) == params['Segment']]
+        return self._page(table, candidates, params, expression.matcher(params.get('FilterExpression')))
+
+    def _query_index(self, table: Table, params: dict, key_matcher: Callable[[Item], bool], filter_matcher: Callable[[Item], bool]) -> dict:
+        index_partition_key, index_sort_key = table.indexes[params['IndexName']]
+        # sparse index, items without the index keys are not part of it
+        indexed = [item for item in table.items.values() if index_partition_key in item and index_sort_key in item and key_matcher(item)]
+        index = Table(params['IndexName'], index_partition_key, index_sort_key)
+        candidates = sorted(((index.key_of(item) + table.key_of(item), item) for item in indexed), key=lambda candidate: candidate[0])
+        if not params.get('ScanIndexForward', True):
+            candidates.reverse()
+        params = {key: value for key, value in params.items() if key != 'ExclusiveStartKey'}  # paging an index is not supported
+        return self._page(table, candidates, params, filter_matcher)
+
+    @staticmethod
+    def _page(table: Table, candidates: list, params: dict, filter_matcher: Callable[[Item], bool]) -> dict:
+        if 'ExclusiveStartKey' in params:
+            start_key = table.key_of(params['ExclusiveStartKey'])
+            forward = params.get('ScanIndexForward', True)
+            candidates = [(key, item) for key, item in candidates if (key > start_key if forward else key < start_key)]
+        limit = params.get('Limit', len(candidates))
+        page, has_more = candidates[:limit], len(candidates) > limit
+        items = [item for _, item in page if filter_matcher(item)]
+        response: dict[str, Any] = {'Count': len(items), 'ScannedCount': len(page)}
+        if params.get('Select') != 'COUNT':
+            response['Items'] = items
+        if has_more and page:
+            response['LastEvaluatedKey'] = table.key_attributes(page[-1][1])
+        return response
+
+
+def parse_request(target: str, body: bytes) -> tuple[str, dict]:
+    # X-Amz-Target: DynamoDB_20120810.PutItem
+    return target.split('.')[-1], json.loads(body or b'{}')
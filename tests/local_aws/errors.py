@@ -0,0 +1,12 @@
+from typing import Optional
+
+
+class LocalAwsError(Exception):
+    """Raised by a stand-in to answer with an AWS error response."""
+
+    def __init__(self, code: str, message: str, status_code: int = 400, details: Optional[dict] = None) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status_code = status_code
+        self.details = details or {}  # modeled error members, e.g. CancellationReasons
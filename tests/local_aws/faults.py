@@ -0,0 +1,117 @@
+import math
+import random
+import threading
+import time
+from typing import Callable, Optional, Protocol
+
+from tests.local_aws.errors import LocalAwsError
+
+# the error codes the real services throttle with, botocore retries all of them
+THROTTLING_ERRORS = {
+    'iam': ('Throttling', 'Rate exceeded', 400),
+    'dynamodb': ('ThrottlingException', 'Rate of requests exceeds the allowed throughput.', 400),
+}
+# z-score of the 99th percentile of a normal distribution
+_Z_P99 = 2.326
+
+
+class LatencyDistribution(Protocol):
+    def sample_ms(self, rng: random.Random) -> float: ...
+
+
+class FixedLatency:
+    def __init__(self, latency_ms: float) -> None:
+        self.latency_ms = latency_ms
+
+    def sample_ms(self, rng: random.Random) -> float:
+        return self.latency_ms
+
+
+class LongTailLatency:
+    """Log-normal latency fitted to a median and a p99, e.g. a 10ms median with 400ms spikes, optionally capped like a client timeout."""
+
+    def __init__(self, median_ms: float, p99_ms: float, max_ms: Optional[float] = None) -> None:
+        if not 0 < median_ms <= p99_ms:
+            raise ValueError('expected 0 < median_ms <= p99_ms')
+        self.median_ms = median_ms
+        self.p99_ms = p99_ms
+        self.max_ms = max_ms
+        self._sigma = math.log(p99_ms / median_ms) / _Z_P99
+
+    def sample_ms(self, rng: random.Random) -> float:
+        latency_ms = rng.lognormvariate(math.log(self.median_ms), self._sigma)
+        return min(latency_ms, self.max_ms) if self.max_ms else latency_ms
+
+
+class FaultProfile:
+    """
+    Faults injected into a dependency's requests: added latency, a rate of throttled requests and,
+    for BatchWriteItem, a rate of requests returned as UnprocessedItems.
+    """
+
+    def __init__(self, latency: Optional[LatencyDistribution] = None, throttle_rate: float = 0.0, unprocessed_rate: float = 0.0) -> None:
+        if not (0 <= throttle_rate <= 1 and 0 <= unprocessed_rate <= 1):
+            raise ValueError('rates must be between 0 and 1')
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.unprocessed_rate = unprocessed_rate
+
+
+class FaultInjector:
+    """
+    Injects faults into the local stand-ins per service ('iam', 'dynamodb', 'cloudformation') or per operation, e.g. ('iam', 'UpdateAssumeRolePolicy').
+    Seeded, so a benchmark replays the same faults run after run. Keeps a tally of what it injected.
+    """
+
+    def __init__(self, seed: Optional[int] = None, sleep: Callable[[float], None] = time.sleep) -> None:
+        self.profiles: dict[tuple[str, Optional[str]], FaultProfile] = {}
+        self.injected: dict[str, dict[str, float]] = {}
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def configure(self, service: str, profile: FaultProfile, operation: Optional[str] = None) -> 'FaultInjector':
+        self.profiles[(service, operation)] = profile
+        return self
+
+    def clear(self) -> None:
+        self.profiles.clear()
+        self.injected.clear()
+
+    def reseed(self, seed: Optional[int]) -> None:
+        self._rng.seed(seed)
+
+    def _profile(self, service: str, operation: str) -> Optional[FaultProfile]:
+        return self.profiles.get((service, operation)) or self.profiles.get((service, None))
+
+    def _tally(self, service: str, operation: str, fault: str, amount: float = 1) -> None:
+        tally = self.injected.setdefault(f'{service}.{operation}', {'requests': 0, 'delayed_ms': 0.0, 'throttled': 0, 'unprocessed': 0})
+        tally[fault] = round(tally[fault] + amount, 3)
+
+    def before_request(self, service: str, operation: str) -> None:
+        """Called by the stand-ins before answering a request: waits out the latency, raises a LocalAwsError when the request is throttled."""
+        profile = self._profile(service, operation)
+        with self._lock:
+            self._tally(service, operation, 'requests')
+            if profile is None:
+                return
+            latency_ms = profile.latency.sample_ms(self._rng) if profile.latency else 0.0
+            throttled = self._rng.random() < profile.throttle_rate
+            self._tally(service, operation, 'delayed_ms', latency_ms)
+            self._tally(service, operation, 'throttled', int(throttled))
+        # sleeps outside the lock, concurrent requests wait in parallel like they do against the real service
+        if latency_ms:
+            self._sleep(latency_ms / 1000)
+        if throttled:
+            code, message, status_code = THROTTLING_ERRORS.get(service, ('Throttling', 'Rate exceeded', 429))
+            raise LocalAwsError(code, message, status_code=status_code)
+
+    def unprocessed(self, service: str, operation: str) -> bool:
+        """Whether a single request of a batch is left unprocessed, e.g. one put request of a BatchWriteItem."""
+        profile = self._profile(service, operation)
+        if profile is None or not profile.unprocessed_rate:
+            return False
+        with self._lock:
+            unprocessed = self._rng.random() < profile.unprocessed_rate
+            self._tally(service, operation, 'unprocessed', int(unprocessed))
+        return unprocessed
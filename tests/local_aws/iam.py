@@ -0,0 +1,82 @@
+import json
+from typing import Optional
+from urllib.parse import parse_qs, quote
+from xml.sax.saxutils import escape
+
+from tests.local_aws.errors import LocalAwsError
+
+# IAM counts the trust policy length without whitespace, the default 'Role trust policy length' quota is 2048 characters
+DEFAULT_TRUST_POLICY_QUOTA = 2048
+_NAMESPACE = 'https://iam.amazonaws.com/doc/2010-05-08/'
+
+
+def trust_policy_length(policy_document: dict) -> int:
+    return len(json.dumps(policy_document, separators=(',', ':')))
+
+
+class IamStandIn:
+    """Roles and their trust policies, speaks the IAM query protocol for GetRole and UpdateAssumeRolePolicy."""
+
+    def __init__(self, account_id: str = '123456789012', trust_policy_quota: int = DEFAULT_TRUST_POLICY_QUOTA) -> None:
+        self.account_id = account_id
+        self.trust_policy_quota = trust_policy_quota
+        self.trust_policies: dict[str, dict] = {}
+
+    def create_role(self, role_name: str, trust_policy: Optional[dict] = None) -> str:
+        self.trust_policies[role_name] = trust_policy or {
+            'Version': '2012-10-17',
+            'Statement': [{'Effect': 'Allow', 'Principal': {'Service': 'lambda.amazonaws.com'}, 'Action': 'sts:AssumeRole'}],
+        }
+        return self.role_arn(role_name)
+
+    def role_arn(self, role_name: str) -> str:
+        return f'arn:aws:iam::{self.account_id}:role/{role_name}'
+
+    def _role(self, role_name: str) -> dict:
+        if role_name not in self.trust_policies:
+            raise LocalAwsError('NoSuchEntity', f'The role with name {role_name} cannot be found.', status_code=404)
+        return self.trust_policies[role_name]
+
+    def handle(self, operation: str, params: dict) -> str:
+        if operation == 'GetRole':
+            return self._get_role(params['RoleName'])
+        if operation == 'UpdateAssumeRolePolicy':
+            return self._update_assume_role_policy(params['RoleName'], params['PolicyDocument'])
+        raise LocalAwsError('InvalidAction', f'{operation} is not supported by the local stand-in')
+
+    def _get_role(self, role_name: str) -> str:
+        policy = quote(json.dumps(self._role(role_name)))
+        role = (
+            f'<Role><Path>/</Path><RoleName>{escape(role_name)}</RoleName><RoleId>AROALOCALSTANDIN</RoleId>'
+            f'<Arn>{escape(self.role_arn(role_name))}</Arn><CreateDate>2024-01-01T00:00:00Z</CreateDate>'
+            f'<AssumeRolePolicyDocument>{escape(policy)}</AssumeRolePolicyDocument></Role>'
+        )
+        return _response('GetRole', f'<GetRoleResult>{role}</GetRoleResult>')
+
+    def _update_assume_role_policy(self, role_name: str, policy_document: str) -> str:
+        self._role(role_name)
+        policy = json.loads(policy_document)
+        length = trust_policy_length(policy)
+        if length > self.trust_policy_quota:
+            raise LocalAwsError('LimitExceeded', f'Cannot exceed quota for ACLSizePerRole: {self.trust_policy_quota}', status_code=409)
+        self.trust_policies[role_name] = policy
+        return _response('UpdateAssumeRolePolicy', '')
+
+
+def _response(operation: str, result: str) -> str:
+    return (
+        f'<{operation}Response xmlns="{_NAMESPACE}">{result}'
+        f'<ResponseMetadata><RequestId>local-request</RequestId></ResponseMetadata></{operation}Response>'
+    )
+
+
+def error_response(error: LocalAwsError) -> str:
+    return (
+        f'<ErrorResponse xmlns="{_NAMESPACE}"><Error><Type>Sender</Type><Code>{error.code}</Code>'
+        f'<Message>{escape(error.message)}</Message></Error><RequestId>local-request</RequestId></ErrorResponse>'
+    )
+
+
+def parse_request(body: bytes) -> tuple[str, dict]:
+    params = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+    return params.pop('Action'), params
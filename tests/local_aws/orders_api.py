@@ -0,0 +1,87 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+_MESSAGES = {403: 'Forbidden', 429: 'Too Many Requests'}
+
+
+class LocalOrdersApi:
+    """
+    Stands in for the IAM protected orders API on a local port, unsigned requests get 403 like API Gateway's IAM authorizer.
+    Counts connections and requests so clients can be compared on connection reuse, 'latency_ms' adds a fixed server side delay.
+    'rate_limit' and 'burst_limit' emulate the stage's throttling with 429s, 'forced_statuses' answers the next requests with those statuses.
+    """
+
+    def __init__(
+        self, latency_ms: float = 0, rate_limit: Optional[float] = None, burst_limit: int = 1, forced_statuses: Optional[list[int]] = None
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.rate_limit = rate_limit
+        self.burst_limit = burst_limit
+        self.forced_statuses = list(forced_statuses or [])
+        self.throttled = 0
+        self._tokens = float(burst_limit)
+        self._last_refill = time.monotonic()
+        self.connections = 0
+        self.requests: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='local-orders-api', daemon=True)
+        self.url = f'http://127.0.0.1:{self._server.server_address[1]}/'
+
+    def __enter__(self) -> 'LocalOrdersApi':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _status(self, authorization: str) -> int:
+        with self._lock:
+            if self.forced_statuses:
+                return self.forced_statuses.pop(0)
+            if self.rate_limit:
+                now = time.monotonic()
+                self._tokens = min(self.burst_limit, self._tokens + (now - self._last_refill) * self.rate_limit)
+                self._last_refill = now
+                if self._tokens < 1:
+                    self.throttled += 1
+                    return 429
+                self._tokens -= 1
+        return 200 if authorization.startswith('AWS4-HMAC-SHA256') else 403
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        api = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+            disable_nagle_algorithm = True  # headers and body are written separately, Nagle would hold the body back on kept-alive connections
+
+            def setup(self) -> None:
+                super().setup()
+                with api._lock:
+                    api.connections += 1
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                authorization = self.headers.get('Authorization', '')
+                with api._lock:
+                    api.requests.append({'path': self.path, 'authorization': authorization, 'body': json.loads(body or b'null')})
+                if api.latency_ms:
+                    time.sleep(api.latency_ms / 1000)
+                status = api._status(authorization)
+                response = json.dumps({'order': 'created'} if status == 200 else {'message': _MESSAGES.get(status, 'Internal server error')}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass  # keep test output clean
+
+        return _Handler
@@ -0,0 +1,18 @@
+import pytest
+
+
+@pytest.fixture
+def env_vars(monkeypatch):
+    # the governance function's required environment variables, read fresh on every call instead of from the modeler's cache
+    monkeypatch.setenv('LAMBDA_ENV_MODELER_DISABLE_CACHE', 'true')
+    for name, value in {
+        'POWERTOOLS_SERVICE_NAME': 'IamPortfolio',
+        'POWERTOOLS_METRICS_NAMESPACE': 'IamPlatformEngineering',
+        'LOG_LEVEL': 'INFO',
+        'TABLE_NAME': 'table',
+        'PORTFOLIO_ID': 'portfolio',
+        'SERVICE_ROLE_NAME': 'role',
+        'SERVICE_ROLE_ARN': 'arn:aws:iam::123456789012:role/role',
+    }.items():
+        monkeypatch.setenv(name, value)
+    return monkeypatch
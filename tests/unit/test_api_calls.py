@@ -0,0 +1,44 @@
+import pytest
+from botocore.exceptions import ClientError
+
+from catalog_backend.handlers.utils.api_calls import ApiCallLedger, track_api_calls
+from catalog_backend.logic.iam.helpers import get_iam_client, get_trust_policy
+from tests.local_aws import LocalAws, assert_call_budget, call_budget
+
+
+def test_failed_calls_are_accounted():
+    with LocalAws():
+        # Given: a trust policy read of a role that doesn't exist
+        with track_api_calls() as outer, track_api_calls() as inner:
+            # When: IAM rejects it
+            with pytest.raises(ClientError):
+                get_trust_policy(get_iam_client(), 'missing-role')
+
+    # Then: every active ledger counted the call and its error
+    for ledger in (outer, inner):
+        assert ledger.operations['IAM.GetRole']['calls'] == 1
+        assert ledger.operations['IAM.GetRole']['errors'] == 1
+        assert ledger.operations['IAM.GetRole']['attempts'] == 1
+
+
+def test_call_budget_reports_every_violation():
+    # Given: an invocation that read the trust policy twice and wrote an unbudgeted item
+    ledger = ApiCallLedger()
+    for operation in ('IAM.GetRole', 'IAM.GetRole', 'DynamoDB.PutItem'):
+        ledger.record(operation, latency_ms=1.0)
+
+    # When: asserting a delete's budget
+    with pytest.raises(AssertionError) as error:
+        assert_call_budget(ledger, {'IAM.GetRole': 1, 'IAM.UpdateAssumeRolePolicy': (0, 1), 'DynamoDB.DeleteItem': 1})
+
+    # Then: every operation outside its budget is reported, the optional update isn't
+    message = str(error.value)
+    assert 'IAM.GetRole: 2 calls, budget 1' in message
+    assert 'DynamoDB.PutItem: 1 calls, budget 0' in message
+    assert 'DynamoDB.DeleteItem: 0 calls, budget 1' in message
+    assert 'UpdateAssumeRolePolicy: ' not in message
+
+
+def test_call_budget_passes_within_range():
+    with call_budget({'IAM.UpdateAssumeRolePolicy': (0, 1)}) as ledger:
+        ledger.record('IAM.UpdateAssumeRolePolicy', latency_ms=1.0)
@@ -0,0 +1,53 @@
+import json
+
+from catalog_backend.handlers.utils.capture import SCRUBBED_RESPONSE_URL, sanitize_sqs_event, scrub_text
+from tests.integration.utils import RESOURCE_PROPERTIES, create_product_body, create_sqs_records
+
+STACK_ID = 'arn:aws:cloudformation:us-east-1:123456789012:stack/SC-123456789012-pp-abc/1dbb0a20-14e8-11ef-a95c-0eaa9ec0a8b1'
+TRUST_ROLE_ARN = 'arn:aws:iam::123456789012:role/product-role'
+
+
+def test_scrub_text_keeps_arn_structure():
+    # Given/When: scrubbing an ARN and the bare account id it contains
+    scrubbed_arn = scrub_text(TRUST_ROLE_ARN, salt='salt')
+    scrubbed_account = scrub_text('123456789012', salt='salt')
+
+    # Then: the ARN keeps its shape, and the account maps to the same pseudonym inside and outside of the ARN
+    assert scrubbed_arn.startswith(f'arn:aws:iam::{scrubbed_account}:role/')
+    assert 'product-role' not in scrubbed_arn
+    assert len(scrubbed_account) == 12 and scrubbed_account != '123456789012'
+
+
+def test_scrub_text_depends_on_salt():
+    # Given/When/Then: different salts yield different pseudonyms, the same salt is deterministic
+    assert scrub_text(TRUST_ROLE_ARN, salt='a') == scrub_text(TRUST_ROLE_ARN, salt='a')
+    assert scrub_text(TRUST_ROLE_ARN, salt='a') != scrub_text(TRUST_ROLE_ARN, salt='b')
+
+
+def test_sanitize_sqs_event():
+    # Given: a product create SQS event with a pre-signed ResponseURL and a trust role
+    properties = {**RESOURCE_PROPERTIES, 'trust_role_arn': TRUST_ROLE_ARN}
+    event = create_sqs_records(create_product_body('Create', STACK_ID, properties))
+
+    # When: sanitizing it
+    sanitized = sanitize_sqs_event(event, salt='salt')
+
+    # Then: secrets and identifiers are scrubbed while the event stays a valid custom resource request
+    record = sanitized['Records'][0]
+    body = json.loads(record['body'])
+    assert body['RequestType'] == 'Create'
+    assert body['ResponseURL'].startswith(SCRUBBED_RESPONSE_URL)
+    assert body['ResourceProperties']['product_name'] == RESOURCE_PROPERTIES['product_name']
+    assert '123456789012' not in json.dumps(sanitized)
+    assert record['receiptHandle'] != event['Records'][0]['receiptHandle']
+    assert record['attributes']['SenderId'] != event['Records'][0]['attributes']['SenderId']
+
+
+def test_sanitize_sqs_event_keeps_malformed_body():
+    # Given: an SQS record whose body is not JSON
+    event = create_sqs_records('not json 123456789012')
+
+    # When/Then: the body is kept for replay with its account id scrubbed
+    body = sanitize_sqs_event(event, salt='salt')['Records'][0]['body']
+    assert body.startswith('not json ')
+    assert '123456789012' not in body
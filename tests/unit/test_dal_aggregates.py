@@ -0,0 +1,184 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from catalog_backend.dal.aggregates import COUNT_ATTRIBUTE, COUNTER_SHARDS, build_counts, counter_deltas, counter_keys
+from catalog_backend.dal.dynamo_client_dal_handler import DynamoClientDalHandler
+from catalog_backend.dal.dynamo_dal_handler import DynamoDalHandler
+from catalog_backend.dal.models.db import DeploymentCounts, ProductEntry
+from catalog_backend.handlers.utils.api_calls import track_api_calls
+from tests.local_aws import LocalAws
+
+TABLE_NAME = 'governance'
+PORTFOLIO_ID = 'port-abcdefghijklm'
+ROLE_PRODUCT = 'CI/CD IAM Role Product'
+WAF_PRODUCT = 'WAF Rules Product'
+
+
+@pytest.fixture
+def local_aws():
+    with LocalAws() as aws:
+        aws.dynamodb.create_table(TABLE_NAME, partition_key='portfolio_id', sort_key='product_stack_id')
+        yield aws
+
+
+def _stack_id(index: int) -> str:
+    return f'arn:aws:cloudformation:us-east-1:123456789012:stack/SC-123456789012-pp-{index}/uuid-{index}'
+
+
+def _entry(version: str, region: str = 'us-east-1') -> ProductEntry:
+    return ProductEntry(
+        portfolio_id=PORTFOLIO_ID,
+        product_stack_id=_stack_id(0),
+        name=ROLE_PRODUCT,
+        version=version,
+        account_id='123456789012',
+        consumer_name='consumer',
+        region=region,
+        created_at=1,
+    )
+
+
+def test_update_only_moves_changed_counters():
+    # Given/When/Then: a version upgrade moves the version counters only
+    assert counter_deltas(_entry('1.0.0'), _entry('2.0.0')) == {f'version#1.0.0#{ROLE_PRODUCT}': -1, f'version#2.0.0#{ROLE_PRODUCT}': 1}
+    assert counter_deltas(_entry('1.0.0'), _entry('1.0.0')) == {}
+    assert counter_deltas(None, _entry('1.0.0'))['total'] == 1
+    assert counter_deltas(_entry('1.0.0'), None)['total'] == -1
+
+
+def test_counter_keys_keep_separators_in_values():
+    # Given: a product whose name and version contain the key separator and its escape character
+    entry = _entry('1.0#rc%1').model_copy(update={'name': 'Role #2'})
+
+    # When: counting it from its counter items
+    counts = build_counts({'product_stack_id': key, COUNT_ATTRIBUTE: 1} for key in counter_keys(entry))
+
+    # Then: it is counted under its own name and version, and plain values keep their keys
+    assert counts.products == {'Role #2': 1}
+    assert counts.versions == {'Role #2': {'1.0#rc%1': 1}}
+    assert f'version#1.0.0#{ROLE_PRODUCT}' in counter_keys(_entry('1.0.0'))
+
+
+@pytest.mark.parametrize('dal_handler_cls', [DynamoDalHandler, DynamoClientDalHandler])
+def test_counters_follow_the_product_lifecycle(local_aws, dal_handler_cls):
+    # Given: a sharded DAL handler that maintains counters and history
+    dal_handler = dal_handler_cls(TABLE_NAME, shard_count=3, history_retention_days=30, aggregates_enabled=True)
+
+    # When: products are created, updated, deleted and a create is delivered twice
+    dal_handler.add_product_deployment(PORTFOLIO_ID, _stack_id(0), ROLE_PRODUCT, '1.0.0', '111111111111', 'consumer', 'us-east-1')
+    dal_handler.add_product_deployment(PORTFOLIO_ID, _stack_id(1), ROLE_PRODUCT, '1.0.0', '222222222222', 'consumer', 'eu-west-1')
+    dal_handler.add_product_deployment(PORTFOLIO_ID, _stack_id(2), WAF_PRODUCT, '3.1.0', '111111111111', 'consumer', 'us-east-1')
+    dal_handler.add_product_deployment(PORTFOLIO_ID, _stack_id(2), WAF_PRODUCT, '3.1.0', '111111111111', 'consumer', 'us-east-1')
+    dal_handler.update_product_deployment(PORTFOLIO_ID, _stack_id(0), ROLE_PRODUCT, '2.0.0', '111111111111', 'consumer', 'us-east-1')
+    dal_handler.delete_product_deployment(PORTFOLIO_ID, _stack_id(1))
+    dal_handler.delete_product_deployment(PORTFOLIO_ID, _stack_id(1))
+
+    # Then: the counters match the live deployments
+    assert dal_handler.get_deployment_counts(PORTFOLIO_ID) == DeploymentCounts(
+        total=2,
+        products={ROLE_PRODUCT: 1, WAF_PRODUCT: 1},
+        versions={ROLE_PRODUCT: {'2.0.0': 1}, WAF_PRODUCT: {'3.1.0': 1}},
+        accounts={'111111111111': 2},
+        regions={'us-east-1': 2},
+    )
+    entries, _ = dal_handler.list_product_deployments(PORTFOLIO_ID)
+    assert len(entries) == 2
+    assert [change.event for change in dal_handler.list_product_history(PORTFOLIO_ID, _stack_id(0))] == ['Update', 'Create']
+
+
+def test_concurrent_change_is_retried(local_aws, monkeypatch):
+    # Given: a product that another writer replaces right after it was read
+    dal_handler = DynamoDalHandler(TABLE_NAME, aggregates_enabled=True)
+    dal_handler.add_product_deployment(PORTFOLIO_ID, _stack_id(0), ROLE_PRODUCT, '1.0.0', '111111111111', 'consumer', 'us-east-1')
+    read_current = dal_handler._read_current
+    reads = {'count': 0}
+
+    def racing_read(portfolio_id: str, product_stack_id: str):
+        key, item = read_current(portfolio_id, product_stack_id)
+        reads['count'] += 1
+        if reads['count'] == 1:
+            stored = next(iter(local_aws.dynamodb.table(TABLE_NAME).items.values()))
+            stored.update({'version': {'S': '1.5.0'}, 'created_at': {'N': '42'}, 'rev': {'N': '42'}})
+        return key, item
+
+    monkeypatch.setattr(dal_handler, '_read_current', racing_read)
+
+    # When: updating the product
+    dal_handler.update_product_deployment(PORTFOLIO_ID, _stack_id(0), ROLE_PRODUCT, '2.0.0', '111111111111', 'consumer', 'us-east-1')
+
+    # Then: the cancelled transaction is retried against the fresh item
+    assert reads['count'] == 2
+    assert dal_handler.get_deployment_counts(PORTFOLIO_ID).total == 1
+
+
+@pytest.mark.parametrize('dal_handler_cls', [DynamoDalHandler, DynamoClientDalHandler])
+def test_writes_within_the_same_second_conflict(local_aws, monkeypatch, dal_handler_cls):
+    # Given: a counted product written before items had revisions, and a clock that doesn't move, so every write happens in the same millisecond
+    dal_handler = dal_handler_cls(TABLE_NAME, aggregates_enabled=True)
+    dal_handler.add_product_deployment(PORTFOLIO_ID, _stack_id(0), ROLE_PRODUCT, '1.0.0', '111111111111', 'consumer', 'us-east-1')
+    stored = local_aws.dynamodb.table(TABLE_NAME).items
+    del next(item for item in stored.values() if 'rev' in item)['rev']
+    monkeypatch.setattr(dal_handler, '_get_unix_time_ms', lambda: 1_700_000_000_000)
+    read_current = dal_handler._read_current
+    reads = {'count': 0}
+
+    def racing_read(portfolio_id: str, product_stack_id: str):
+        key, item = read_current(portfolio_id, product_stack_id)
+        reads['count'] += 1
+        if reads['count'] in (1, 3):
+            # another writer upgrades the product between this writer's read and its write
+            version = {1: '2.0.0', 3: '3.0.0'}[reads['count']]
+            dal_handler.update_product_deployment(PORTFOLIO_ID, _stack_id(0), ROLE_PRODUCT, version, '111111111111', 'consumer', 'us-east-1')
+        return key, item
+
+    monkeypatch.setattr(dal_handler, '_read_current', racing_read)
+
+    # When: updating the product, once while it has no revision yet and once after it got one
+    dal_handler.update_product_deployment(PORTFOLIO_ID, _stack_id(0), ROLE_PRODUCT, '4.0.0', '111111111111', 'consumer', 'us-east-1')
+
+    # Then: both stale writes are retried, the counters only hold the final version
+    assert dal_handler.get_deployment_counts(PORTFOLIO_ID).versions == {ROLE_PRODUCT: {'4.0.0': 1}}
+
+
+def test_concurrent_writers_back_off_from_conflicting_counters(local_aws):
+    # Given: more concurrent writers than counter copies, every transaction holds its items long enough for the others to conflict with it
+    dal_handler = DynamoDalHandler(TABLE_NAME, history_retention_days=30, aggregates_enabled=True)
+    local_aws.dynamodb.transaction_hold_seconds = 0.05
+    writers = COUNTER_SHARDS + 4
+    barrier = threading.Barrier(writers)
+
+    def provision(index: int) -> None:
+        barrier.wait()
+        dal_handler.add_product_deployment(PORTFOLIO_ID, _stack_id(index), ROLE_PRODUCT, '1.0.0', '111111111111', 'consumer', 'us-east-1')
+
+    # When: they all provision a product at once
+    with track_api_calls() as ledger, ThreadPoolExecutor(max_workers=writers) as executor:
+        list(executor.map(provision, range(writers)))
+
+    # Then: the cancelled transactions were retried until every product was written and counted exactly once
+    assert ledger.operations['DynamoDB.TransactWriteItems']['errors'] > 0
+    assert ledger.calls('DynamoDB.TransactWriteItems') - ledger.operations['DynamoDB.TransactWriteItems']['errors'] == writers
+    assert dal_handler.get_deployment_counts(PORTFOLIO_ID) == DeploymentCounts(
+        total=writers,
+        products={ROLE_PRODUCT: writers},
+        versions={ROLE_PRODUCT: {'1.0.0': writers}},
+        accounts={'111111111111': writers},
+        regions={'us-east-1': writers},
+    )
+
+
+def test_counted_update_migrates_legacy_item(local_aws):
+    # Given: a product written in the legacy layout
+    dal_handler = DynamoDalHandler(TABLE_NAME, aggregates_enabled=True)
+    dal_handler.add_product_deployment(PORTFOLIO_ID, _stack_id(0), ROLE_PRODUCT, '1.0.0', '111111111111', 'consumer', 'us-east-1')
+
+    # When: updating it after compact items were enabled
+    dal_handler.compact_items = True
+    dal_handler.update_product_deployment(PORTFOLIO_ID, _stack_id(0), ROLE_PRODUCT, '2.0.0', '111111111111', 'consumer', 'us-east-1')
+
+    # Then: the product is stored and counted once
+    entries, _ = dal_handler.list_product_deployments(PORTFOLIO_ID)
+    assert [entry.version for entry in entries] == ['2.0.0']
+    assert dal_handler.get_deployment_counts(PORTFOLIO_ID).versions == {ROLE_PRODUCT: {'2.0.0': 1}}
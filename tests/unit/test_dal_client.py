@@ -0,0 +1,80 @@
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import TypeSerializer
+
+from catalog_backend.dal.dynamo_client_dal_handler import DynamoClientDalHandler, entry_to_wire, from_wire, to_wire
+from catalog_backend.dal.dynamo_dal_handler import DynamoDalHandler
+from catalog_backend.dal.models.db import ProductEntry
+from tests.local_aws import LocalAws, reset_caches
+
+TABLE_NAME = 'governance'
+PORTFOLIO_ID = 'port-abcdefghijklm'
+
+ENTRY = ProductEntry(
+    portfolio_id=PORTFOLIO_ID,
+    product_stack_id='arn:aws:cloudformation:us-east-1:123456789012:stack/SC-123456789012-pp-abc/1dbb0a20-14e8-11ef-a95c-0eaa9ec0a8b1',
+    name='CI/CD IAM Role Product',
+    version='1.0.0',
+    account_id='123456789012',
+    consumer_name='Ran isenberg',
+    region='us-east-1',
+    created_at=1716017284,
+)
+
+
+def test_entry_to_wire_matches_type_serializer():
+    # Given/When/Then: the cached field serializers produce what boto3's TypeSerializer produces from model_dump
+    serializer = TypeSerializer()
+    assert entry_to_wire(ENTRY) == {name: serializer.serialize(value) for name, value in ENTRY.model_dump().items()}
+
+
+def test_wire_round_trip():
+    # Given/When/Then: plain values survive the wire format
+    item = {'s': 'value', 'n': 7, 'd': Decimal('1.5'), 'b': True, 'neg': -3}
+    assert from_wire(to_wire(item)) == item
+
+
+@pytest.fixture
+def local_aws():
+    with LocalAws() as aws:
+        aws.dynamodb.create_table(TABLE_NAME, partition_key='portfolio_id', sort_key='product_stack_id')
+        yield aws
+
+
+def _exercise(dal_handler: DynamoDalHandler) -> list[ProductEntry]:
+    stack_ids = [f'arn:aws:cloudformation:us-east-1:123456789012:stack/SC-123456789012-pp-{index}/uuid-{index}' for index in range(12)]
+    for stack_id in stack_ids:
+        dal_handler.add_product_deployment(PORTFOLIO_ID, stack_id, 'CI/CD IAM Role Product', '1.0.0', '123456789012', 'consumer', 'us-east-1')
+    dal_handler.update_product_deployment(PORTFOLIO_ID, stack_ids[0], 'CI/CD IAM Role Product', '2.0.0', '123456789012', 'consumer', 'us-east-1')
+    dal_handler.delete_product_deployment(PORTFOLIO_ID, stack_ids[1])
+    entries, next_token = [], None
+    while True:
+        page, next_token = dal_handler.list_product_deployments(PORTFOLIO_ID, limit=5, next_token=next_token)
+        entries.extend(page)
+        if not next_token:
+            break
+    return entries
+
+
+@pytest.mark.parametrize('compact_items', [False, True])
+def test_client_path_matches_resource_path(local_aws, compact_items):
+    # Given: the same operations on the resource based and the low-level client DAL
+    results = {}
+    for dal_handler_cls in (DynamoDalHandler, DynamoClientDalHandler):
+        local_aws.dynamodb.create_table(TABLE_NAME, partition_key='portfolio_id', sort_key='product_stack_id')
+        reset_caches()
+        dal_handler = dal_handler_cls(TABLE_NAME, shard_count=3, compact_items=compact_items)
+
+        # When: writing, updating, deleting and paging through products
+        entries = _exercise(dal_handler)
+        items = local_aws.dynamodb.table(TABLE_NAME).items
+        results[dal_handler_cls] = ({key: {**item, 't': None, 'created_at': None} for key, item in items.items()}, entries)
+
+    # Then: both paths store the same items and return the same entries
+    (resource_items, resource_entries), (client_items, client_entries) = results.values()
+    assert client_items == resource_items
+    assert [entry.model_dump(exclude={'created_at'}) for entry in client_entries] == [
+        entry.model_dump(exclude={'created_at'}) for entry in resource_entries
+    ]
+    assert len(client_entries) == 11
@@ -0,0 +1,104 @@
+import pytest
+
+from catalog_backend.dal import codec
+from catalog_backend.dal.dynamo_dal_handler import DynamoDalHandler
+from catalog_backend.dal.models.db import ProductEntry
+from tests.local_aws import LocalAws
+
+TABLE_NAME = 'governance'
+PORTFOLIO_ID = 'port-abcdefghijklm'
+STACK_ID = 'arn:aws:cloudformation:us-east-1:123456789012:stack/SC-123456789012-pp-yuqxzldfdagkq/1dbb0a20-14e8-11ef-a95c-0eaa9ec0a8b1'
+
+
+def _entry(**overrides) -> ProductEntry:
+    fields = {
+        'portfolio_id': PORTFOLIO_ID,
+        'product_stack_id': STACK_ID,
+        'name': 'CI/CD IAM Role Product',
+        'version': '1.0.0',
+        'account_id': '123456789012',
+        'consumer_name': 'Ran isenberg',
+        'region': 'us-east-1',
+        'created_at': 1716017284,
+    }
+    return ProductEntry(**{**fields, **overrides})
+
+
+@pytest.mark.parametrize(
+    'overrides',
+    [
+        {},
+        {'name': 'Unknown Product', 'region': 'xx-mars-1'},
+        {'account_id': '210987654321', 'region': 'eu-west-1'},
+        {'product_stack_id': 'arn:aws-cn:cloudformation:cn-north-1:123456789012:stack/my-stack/1dbb0a20-14e8-11ef-a95c-0eaa9ec0a8b1'},
+    ],
+)
+def test_codec_round_trip(overrides):
+    # Given: a product entry
+    entry = _entry(**overrides)
+
+    # When: encoding and decoding it
+    item = codec.encode(entry)
+
+    # Then: the entry is restored unchanged
+    assert codec.decode(item) == entry
+
+
+def test_codec_compacts_keys_and_dictionary_fields():
+    # Given/When: encoding a product entry of a Service Catalog provisioned stack
+    item = codec.encode(_entry())
+
+    # Then: the sort key is the account and stack uuid, and dictionary fields are indexes
+    assert item['product_stack_id'] == '123456789012/1dbb0a20-14e8-11ef-a95c-0eaa9ec0a8b1'
+    assert item['s'] == '~pp-yuqxzldfdagkq'
+    assert item['n'] == 0 and item['r'] == 0
+    assert 'a' not in item and 'sr' not in item
+
+
+def test_codec_keeps_legacy_layout_for_non_arn_stack_ids():
+    # Given/When/Then: stack ids that are not stack ARNs are stored and decoded in the legacy layout
+    entry = _entry(product_stack_id='unique-stack-id')
+    assert codec.encode(entry) == entry.model_dump()
+    assert codec.decode(entry.model_dump()) == entry
+
+
+def test_codec_rejects_unknown_version():
+    # Given/When/Then: items written by a newer codec are not silently misread
+    with pytest.raises(ValueError):
+        codec.decode({**codec.encode(_entry()), 'v': codec.CODEC_VERSION + 1})
+
+
+@pytest.fixture
+def local_aws():
+    with LocalAws() as aws:
+        aws.dynamodb.create_table(TABLE_NAME, partition_key='portfolio_id', sort_key='product_stack_id')
+        yield aws
+
+
+def test_compact_items_migrate_legacy_entries(local_aws):
+    # Given: a legacy item and a DAL handler that writes compact items
+    table = local_aws.dynamodb.table(TABLE_NAME)
+    dal_handler = DynamoDalHandler(TABLE_NAME)
+    dal_handler.add_product_deployment(PORTFOLIO_ID, STACK_ID, 'CI/CD IAM Role Product', '1.0.0', '123456789012', 'consumer', 'us-east-1')
+    dal_handler.compact_items = True  # DAL handlers are singletons, flip the layout of the same instance
+
+    # When: updating the product
+    dal_handler.update_product_deployment(PORTFOLIO_ID, STACK_ID, 'CI/CD IAM Role Product', '2.0.0', '123456789012', 'consumer', 'us-east-1')
+
+    # Then: only the compact item remains, and it is listed transparently
+    assert [key[1] for key in table.items] == ['123456789012/1dbb0a20-14e8-11ef-a95c-0eaa9ec0a8b1']
+    entries, _ = dal_handler.list_product_deployments(PORTFOLIO_ID)
+    assert [(entry.product_stack_id, entry.version) for entry in entries] == [(STACK_ID, '2.0.0')]
+
+
+def test_compact_delete_falls_back_to_legacy_key(local_aws):
+    # Given: a legacy item
+    dal_handler = DynamoDalHandler(TABLE_NAME)
+    dal_handler.add_product_deployment(PORTFOLIO_ID, STACK_ID, 'CI/CD IAM Role Product', '1.0.0', '123456789012', 'consumer', 'us-east-1')
+    dal_handler.compact_items = True
+
+    # When: deleting it with compact items enabled
+    dal_handler.delete_product_deployment(PORTFOLIO_ID, STACK_ID)
+
+    # Then: the legacy item is deleted
+    assert not local_aws.dynamodb.table(TABLE_NAME).items
@@ -0,0 +1,160 @@
+import pytest
+
+from catalog_backend.dal.dynamo_client_dal_handler import DynamoClientDalHandler
+from catalog_backend.dal.dynamo_dal_handler import DynamoDalHandler
+from catalog_backend.dal.history import RECENT_CHANGES_INDEX, RECENT_PARTITION_KEY, RECENT_SORT_KEY, hour_buckets
+from tests.local_aws import LocalAws
+
+TABLE_NAME = 'governance'
+PORTFOLIO_ID = 'port-abcdefghijklm'
+STACK_ID = 'arn:aws:cloudformation:us-east-1:123456789012:stack/SC-123456789012-pp-abc/1dbb0a20-14e8-11ef-a95c-0eaa9ec0a8b1'
+NOW_MS = 1_716_017_284_000
+HOUR_MS = 3600 * 1000
+
+
+@pytest.fixture
+def local_aws():
+    with LocalAws() as aws:
+        aws.dynamodb.create_table(
+            TABLE_NAME,
+            partition_key='portfolio_id',
+            sort_key='product_stack_id',
+            indexes={RECENT_CHANGES_INDEX: (RECENT_PARTITION_KEY, RECENT_SORT_KEY)},
+        )
+        yield aws
+
+
+class _Clock:
+    def __init__(self, now_ms: int) -> None:
+        self.now_ms = now_ms
+
+    def __call__(self) -> int:
+        return self.now_ms
+
+
+def _dal_handler(dal_handler_cls: type[DynamoDalHandler], monkeypatch, clock: _Clock, **kwargs) -> DynamoDalHandler:
+    dal_handler = dal_handler_cls(TABLE_NAME, history_retention_days=30, **kwargs)
+    monkeypatch.setattr(dal_handler, '_get_unix_time_ms', clock)
+    return dal_handler
+
+
+def _add(dal_handler: DynamoDalHandler, stack_id: str, version: str = '1.0.0') -> None:
+    dal_handler.add_product_deployment(PORTFOLIO_ID, stack_id, 'CI/CD IAM Role Product', version, '123456789012', 'consumer', 'us-east-1')
+
+
+def _update(dal_handler: DynamoDalHandler, stack_id: str, version: str) -> None:
+    dal_handler.update_product_deployment(PORTFOLIO_ID, stack_id, 'CI/CD IAM Role Product', version, '123456789012', 'consumer', 'us-east-1')
+
+
+def test_hour_buckets_cover_the_range():
+    # Given/When/Then: every started hour between both points in time has a bucket
+    assert hour_buckets(NOW_MS - 2 * HOUR_MS, NOW_MS) == ['2024051805', '2024051806', '2024051807']
+
+
+@pytest.mark.parametrize('dal_handler_cls', [DynamoDalHandler, DynamoClientDalHandler])
+def test_lifecycle_transitions_are_kept_as_history(local_aws, monkeypatch, dal_handler_cls):
+    # Given: a DAL handler that keeps history
+    clock = _Clock(NOW_MS)
+    dal_handler = _dal_handler(dal_handler_cls, monkeypatch, clock)
+
+    # When: a product is created, updated and deleted
+    _add(dal_handler, STACK_ID)
+    clock.now_ms += 1000
+    _update(dal_handler, STACK_ID, '2.0.0')
+    clock.now_ms += 1000
+    dal_handler.delete_product_deployment(PORTFOLIO_ID, STACK_ID)
+
+    # Then: the current item is gone and every transition is listed, newest first
+    entries, _ = dal_handler.list_product_deployments(PORTFOLIO_ID)
+    assert entries == []
+    history = dal_handler.list_product_history(PORTFOLIO_ID, STACK_ID)
+    assert [(change.event, change.version, change.changed_at) for change in history] == [
+        ('Delete', None, NOW_MS + 2000),
+        ('Update', '2.0.0', NOW_MS + 1000),
+        ('Create', '1.0.0', NOW_MS),
+    ]
+    assert {change.product_stack_id for change in history} == {STACK_ID}
+
+    # And: history events expire through the table's TTL
+    items = local_aws.dynamodb.table(TABLE_NAME).items.values()
+    assert {int(item['expires_at']['N']) for item in items} == {(NOW_MS + delay) // 1000 + 30 * 24 * 3600 for delay in (0, 1000, 2000)}
+
+
+@pytest.mark.parametrize('dal_handler_cls', [DynamoDalHandler, DynamoClientDalHandler])
+def test_current_item_is_read_in_one_query(local_aws, monkeypatch, dal_handler_cls):
+    # Given: a product with several updates
+    clock = _Clock(NOW_MS)
+    dal_handler = _dal_handler(dal_handler_cls, monkeypatch, clock)
+    _add(dal_handler, STACK_ID)
+    for version in ('2.0.0', '3.0.0'):
+        clock.now_ms += 1000
+        _update(dal_handler, STACK_ID, version)
+
+    # When: listing the portfolio
+    entries, next_token = dal_handler.list_product_deployments(PORTFOLIO_ID)
+
+    # Then: only the compacted current state is returned
+    assert [entry.version for entry in entries] == ['3.0.0']
+    assert next_token is None
+
+
+@pytest.mark.parametrize('dal_handler_cls', [DynamoDalHandler, DynamoClientDalHandler])
+def test_recent_changes_are_merged_across_shards_and_hours(local_aws, monkeypatch, dal_handler_cls):
+    # Given: products of a sharded portfolio changed over 5 hours
+    clock = _Clock(NOW_MS - 5 * HOUR_MS)
+    dal_handler = _dal_handler(dal_handler_cls, monkeypatch, clock, shard_count=4)
+    stack_ids = [f'arn:aws:cloudformation:us-east-1:123456789012:stack/SC-123456789012-pp-{index}/uuid-{index}' for index in range(10)]
+    for stack_id in stack_ids:
+        clock.now_ms += HOUR_MS // 2
+        _add(dal_handler, stack_id)
+
+    # When: listing the changes of the last 2 hours
+    clock.now_ms = NOW_MS
+    changes = dal_handler.list_recent_changes(PORTFOLIO_ID, since_ms=NOW_MS - 2 * HOUR_MS)
+
+    # Then: only the changes since then are returned, newest first, including the one at the start of the window
+    assert [change.product_stack_id for change in changes] == stack_ids[:-6:-1]
+    assert [change.changed_at for change in changes] == sorted((change.changed_at for change in changes), reverse=True)
+
+    # And: the limit applies to the merged result
+    limited = dal_handler.list_recent_changes(PORTFOLIO_ID, since_ms=NOW_MS - 5 * HOUR_MS, limit=3)
+    assert [change.product_stack_id for change in limited] == stack_ids[:-4:-1]
+
+
+def test_compact_update_removes_legacy_copy(local_aws, monkeypatch):
+    # Given: a product written in the legacy layout
+    clock = _Clock(NOW_MS)
+    dal_handler = _dal_handler(DynamoDalHandler, monkeypatch, clock)
+    _add(dal_handler, STACK_ID)
+
+    # When: updating it after compact items were enabled
+    dal_handler.compact_items = True
+    clock.now_ms += 1000
+    _update(dal_handler, STACK_ID, '2.0.0')
+
+    # Then: the product is listed once, in its new version
+    entries, _ = dal_handler.list_product_deployments(PORTFOLIO_ID)
+    assert [entry.version for entry in entries] == ['2.0.0']
+    assert [change.event for change in dal_handler.list_product_history(PORTFOLIO_ID, STACK_ID)] == ['Update', 'Create']
+
+
+def test_recent_changes_lookback_is_bounded(local_aws, monkeypatch):
+    # Given: a DAL handler that keeps history
+    dal_handler = _dal_handler(DynamoDalHandler, monkeypatch, _Clock(NOW_MS))
+
+    # When/Then: a lookback beyond a week is rejected
+    with pytest.raises(ValueError):
+        dal_handler.list_recent_changes(PORTFOLIO_ID, since_ms=NOW_MS - 8 * 24 * HOUR_MS)
+
+
+def test_history_disabled_keeps_current_items_only(local_aws):
+    # Given: a DAL handler without history retention
+    dal_handler = DynamoDalHandler(TABLE_NAME)
+
+    # When: a product is created and updated
+    _add(dal_handler, STACK_ID)
+    _update(dal_handler, STACK_ID, '2.0.0')
+
+    # Then: no history is written
+    assert len(local_aws.dynamodb.table(TABLE_NAME).items) == 1
+    assert dal_handler.list_product_history(PORTFOLIO_ID, STACK_ID) == []
@@ -0,0 +1,88 @@
+import pytest
+
+from catalog_backend.dal.dynamo_dal_handler import DynamoDalHandler
+from catalog_backend.dal.sharding import partition_key, partition_keys, shard_of
+from tests.local_aws import LocalAws
+
+TABLE_NAME = 'governance'
+PORTFOLIO_ID = 'port-abcdefghijklm'
+
+
+@pytest.fixture
+def local_aws():
+    with LocalAws() as aws:
+        aws.dynamodb.create_table(TABLE_NAME, partition_key='portfolio_id', sort_key='product_stack_id')
+        yield aws
+
+
+def _add_products(dal_handler: DynamoDalHandler, count: int) -> list[str]:
+    stack_ids = [f'arn:aws:cloudformation:us-east-1:123456789012:stack/SC-pp-{index:03}/id' for index in range(count)]
+    for stack_id in stack_ids:
+        dal_handler.add_product_deployment(PORTFOLIO_ID, stack_id, 'product', '1.0.0', '123456789012', 'consumer', 'us-east-1')
+    return stack_ids
+
+
+def test_single_shard_keeps_unsharded_key():
+    # Given/When/Then: a single shard uses the portfolio id as is
+    assert partition_key(PORTFOLIO_ID, 'stack', shard_count=1) == PORTFOLIO_ID
+    assert partition_keys(PORTFOLIO_ID, shard_count=1) == [PORTFOLIO_ID]
+
+
+def test_shard_of_is_stable_and_spread():
+    # Given: many product stacks
+    shards = [shard_of(f'stack-{index}', shard_count=8) for index in range(400)]
+
+    # When/Then: shards are deterministic and every shard receives items
+    assert shards == [shard_of(f'stack-{index}', shard_count=8) for index in range(400)]
+    assert set(shards) == set(range(8))
+
+
+def test_sharded_writes_spread_over_partitions(local_aws):
+    # Given: a DAL handler with 4 shards
+    dal_handler = DynamoDalHandler(TABLE_NAME, shard_count=4)
+
+    # When: adding products
+    _add_products(dal_handler, count=40)
+
+    # Then: items are written to all 4 shard partitions
+    partitions = {key[0] for key in local_aws.dynamodb.table(TABLE_NAME).items}
+    assert partitions == set(partition_keys(PORTFOLIO_ID, shard_count=4))
+
+
+def test_scatter_gather_pages_are_merged_in_order(local_aws):
+    # Given: 25 products spread over 4 shards
+    dal_handler = DynamoDalHandler(TABLE_NAME, shard_count=4)
+    stack_ids = _add_products(dal_handler, count=25)
+
+    # When: paging through the portfolio 7 items at a time
+    pages, next_token = [], None
+    while True:
+        entries, next_token = dal_handler.list_product_deployments(PORTFOLIO_ID, limit=7, next_token=next_token)
+        pages.append(entries)
+        if not next_token:
+            break
+
+    # Then: every product is returned once, ordered, with the logical portfolio id
+    assert [len(page) for page in pages] == [7, 7, 7, 4]
+    assert [entry.product_stack_id for page in pages for entry in page] == sorted(stack_ids)
+    assert all(entry.portfolio_id == PORTFOLIO_ID for page in pages for entry in page)
+
+
+def test_sharded_delete(local_aws):
+    # Given: products spread over 4 shards
+    dal_handler = DynamoDalHandler(TABLE_NAME, shard_count=4)
+    stack_ids = _add_products(dal_handler, count=5)
+
+    # When: deleting one of them
+    dal_handler.delete_product_deployment(PORTFOLIO_ID, stack_ids[2])
+
+    # Then: it is no longer listed
+    entries, next_token = dal_handler.list_product_deployments(PORTFOLIO_ID)
+    assert [entry.product_stack_id for entry in entries] == stack_ids[:2] + stack_ids[3:]
+    assert next_token is None
+
+
+def test_invalid_pagination_token(local_aws):
+    # Given/When/Then: a malformed token is rejected
+    with pytest.raises(ValueError):
+        DynamoDalHandler(TABLE_NAME, shard_count=4).list_product_deployments(PORTFOLIO_ID, next_token='not-a-token')
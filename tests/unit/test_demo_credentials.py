@@ -0,0 +1,120 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from demo.handlers import credentials
+from demo.handlers.credentials import Credentials, CredentialStats, RefreshingCredentials, get_orders_credentials
+
+NOW = datetime(2024, 5, 18, 7, 0, 0, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = NOW
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class CountingFetch:
+    def __init__(self, clock: FakeClock, lifetime: timedelta = timedelta(hours=1)) -> None:
+        self.clock = clock
+        self.lifetime = lifetime
+        self.calls = 0
+        self.issued = 0
+        self.failing = False
+
+    def __call__(self) -> Credentials:
+        self.calls += 1
+        if self.failing:
+            raise ConnectionError('STS unreachable')
+        self.issued += 1
+        return Credentials(f'key-{self.issued}', 'secret', 'token', self.clock() + self.lifetime)
+
+
+def test_credentials_are_cached_until_the_refresh_window():
+    # Given: a cache of credentials that live for an hour
+    clock = FakeClock()
+    fetch = CountingFetch(clock)
+    credential_stats = CredentialStats()
+    cache = RefreshingCredentials(fetch, clock=clock, credential_stats=credential_stats)
+
+    # When: getting them repeatedly until 15 minutes before they expire
+    first = cache.get()
+    clock.now += timedelta(minutes=44)
+    second = cache.get()
+
+    # Then: the role chain is assumed once and the second get is counted as a cache hit
+    assert first == second
+    assert fetch.calls == 1
+    assert credential_stats.take() == (1, 0)
+    assert credential_stats.take() == (0, 0)
+
+
+def test_credentials_are_refreshed_on_the_request_path_ahead_of_expiry():
+    # Given: cached credentials that expire within 15 minutes
+    clock = FakeClock()
+    fetch = CountingFetch(clock)
+    cache = RefreshingCredentials(fetch, clock=clock, credential_stats=CredentialStats())
+    cache.get()
+    clock.now += timedelta(minutes=47)
+
+    # When: getting them
+    current = cache.get()
+
+    # Then: the caller gets fresh credentials before returning, nothing is left to run while the environment is frozen
+    assert current.access_key == 'key-2'
+    assert fetch.calls == 2
+
+
+def test_failed_advisory_refresh_keeps_the_cached_credentials():
+    # Given: cached credentials that expire within 15 minutes and STS failing
+    clock = FakeClock()
+    fetch = CountingFetch(clock)
+    cache = RefreshingCredentials(fetch, clock=clock, credential_stats=CredentialStats())
+    cache.get()
+    clock.now += timedelta(minutes=47)
+    fetch.failing = True
+
+    # When/Then: the cached credentials are handed out and the next caller retries the refresh
+    assert cache.get().access_key == 'key-1'
+    fetch.failing = False
+    assert cache.get().access_key == 'key-2'
+
+
+def test_expiring_credentials_are_refreshed_or_fail():
+    # Given: cached credentials that expire within 10 minutes
+    clock = FakeClock()
+    fetch = CountingFetch(clock)
+    cache = RefreshingCredentials(fetch, clock=clock, credential_stats=CredentialStats())
+    cache.get()
+    clock.now += timedelta(minutes=55)
+    fetch.failing = True
+
+    # When/Then: a failed refresh is raised instead of handing out the expiring credentials
+    with pytest.raises(ConnectionError):
+        cache.get()
+    fetch.failing = False
+    assert cache.get().access_key == 'key-2'
+
+
+def test_role_chain_cache_survives_invocations(mocker):
+    # Given: an SSM parameter with the role chain and a stubbed STS role chain
+    get_parameter = mocker.patch.object(
+        credentials.parameters,
+        'get_parameter',
+        return_value=json.dumps({'mediatorRoleArn': 'mediator', 'ordersAssumeRoleArn': 'orders', 'ordersExternalId': 'external-id'}),
+    )
+    assume_role_chain = mocker.patch.object(
+        credentials, 'assume_role_chain', return_value=Credentials('key', 'secret', 'token', datetime.now(timezone.utc) + timedelta(hours=1))
+    )
+    mocker.patch.dict(credentials._role_chains, clear=True)
+
+    # When: three invocations ask for the orders role credentials
+    for _ in range(3):
+        get_orders_credentials('consumer', '1.0.0')
+
+    # Then: the chain is assumed once and the SSM parameter is read through the powertools cache
+    assume_role_chain.assert_called_once_with('mediator', 'orders', 'external-id')
+    get_parameter.assert_called_with('/orders/consumer/1.0.0', max_age=credentials.SSM_MAX_AGE_SECONDS)
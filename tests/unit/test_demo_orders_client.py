@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from botocore import auth
+from botocore.auth import SigV4Auth as BotocoreSigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials as BotocoreCredentials
+
+from demo.handlers.credentials import Credentials
+from demo.handlers.orders_client import OrdersClient, SigV4Auth, _CachedKeySigner, _signing_key, region_of
+from tests.local_aws.orders_api import LocalOrdersApi
+
+CREDENTIALS = Credentials('AKIDEXAMPLE', 'wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY', 'token', datetime.now(timezone.utc) + timedelta(hours=1))
+URL = 'https://abc123.execute-api.eu-west-1.amazonaws.com/prod/api/orders?b=2&a=1'
+# reserved and percent-encoded characters in a path segment, API Gateway expects every segment encoded twice in the canonical request
+ENCODED_URL = 'https://abc123.execute-api.eu-west-1.amazonaws.com/prod/api/orders/order%20%2F1%3Aa?b=2&a=1'
+SIGNED_AT = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def _botocore_headers(url: str, body: bytes) -> dict[str, str]:
+    request = AWSRequest(method='POST', url=url, data=body)
+    BotocoreSigV4Auth(
+        BotocoreCredentials(CREDENTIALS.access_key, CREDENTIALS.secret_key, CREDENTIALS.session_token), 'execute-api', 'eu-west-1'
+    ).add_auth(request)
+    return dict(request.headers.items())
+
+
+def test_region_is_taken_from_the_url(monkeypatch):
+    # Given: a function running in us-east-1
+    monkeypatch.setenv('AWS_REGION', 'us-east-1')
+
+    # When/Then: execute-api URLs carry their region, custom domains use the function's region
+    assert region_of(URL) == 'eu-west-1'
+    assert region_of('https://orders.example.com/') == 'us-east-1'
+
+
+@pytest.mark.parametrize('url', [URL, ENCODED_URL])
+def test_signature_matches_botocore(monkeypatch, url):
+    # Given: a request signed by botocore at a fixed time
+    monkeypatch.setattr(auth, 'get_current_datetime', lambda: SIGNED_AT.replace(tzinfo=None))
+    body = b'{"order": "my_order"}'
+    expected = _botocore_headers(url, body)
+
+    # When: signing the same request with the cached signing key, twice
+    signer = SigV4Auth(lambda: CREDENTIALS, region_of(url))
+    _signing_key.cache_clear()
+    headers = signer.sign('POST', url, body)
+    signer.sign('POST', url, body)
+
+    # Then: the signature is identical and the signing key was derived once
+    assert headers == expected
+    assert _signing_key.cache_info().misses == 1
+
+
+def test_encoded_path_segments_are_encoded_twice():
+    # Given: a request to a path with reserved and percent-encoded characters
+    request = AWSRequest(method='POST', url=ENCODED_URL, data=b'{}')
+    request.context['timestamp'] = SIGNED_AT.strftime('%Y%m%dT%H%M%SZ')
+
+    # When: building its canonical request
+    signer = _CachedKeySigner(
+        BotocoreCredentials(CREDENTIALS.access_key, CREDENTIALS.secret_key, CREDENTIALS.session_token), 'execute-api', 'eu-west-1'
+    )
+    canonical_uri = signer.canonical_request(request).splitlines()[1]
+
+    # Then: the already encoded segment is encoded once more, like API Gateway verifies it
+    assert canonical_uri == '/prod/api/orders/order%2520%252F1%253Aa'
+
+
+def test_orders_share_pooled_connections():
+    # Given: a local orders API and a pooled client
+    with LocalOrdersApi() as api:
+        client = OrdersClient(api.url, credentials=lambda: CREDENTIALS, region='us-east-1', pool_size=4)
+
+        # When: posting an unsigned order, then a concurrent batch of signed orders
+        unsigned = client.post_order({'order': 'unsigned'}, signed=False)
+        responses = client.post_orders([{'order': f'order-{index}'} for index in range(20)], max_workers=4)
+
+        # Then: the IAM authorizer is emulated and all orders reuse at most one connection per worker
+        assert unsigned.status_code == 403
+        assert [response.status_code for response in responses] == [200] * 20
+        assert api.connections <= 4
+        assert all('Credential=AKIDEXAMPLE/' in request['authorization'] for request in api.requests[1:])
+
+
+def test_throttled_orders_are_retried_with_backoff():
+    # Given: an API that throttles, then fails, then accepts an order
+    delays: list[float] = []
+    with LocalOrdersApi(forced_statuses=[429, 503]) as api:
+        client = OrdersClient(api.url, credentials=lambda: CREDENTIALS, region='us-east-1', sleep=delays.append)
+
+        # When: posting the order
+        response = client.post_order({'order': 'my_order'})
+
+    # Then: it succeeds on the third attempt after jittered, growing delays and the throttle is counted
+    assert response.status_code == 200
+    assert 0 <= delays[0] <= 0.1 and 0 <= delays[1] <= 0.2
+    stats = client.stats.snapshot()
+    assert (stats['requests'], stats['succeeded'], stats['throttled'], stats['server_errors'], stats['retries']) == (3, 1, 1, 1, 2)
+
+
+def test_retries_are_bounded():
+    # Given: an API that keeps throttling
+    with LocalOrdersApi(forced_statuses=[429] * 5) as api:
+        client = OrdersClient(api.url, credentials=lambda: CREDENTIALS, region='us-east-1', max_retries=2, sleep=lambda seconds: None)
+
+        # When/Then: the last throttled response is returned once the retries are used up
+        assert client.post_order({'order': 'my_order'}).status_code == 429
+        assert client.stats.snapshot()['requests'] == 3
+
+
+def test_paced_client_stays_under_the_stage_limit():
+    # Given: a stage that allows 50 requests per second with a burst of 5
+    orders = [{'order': f'order-{index}'} for index in range(15)]
+
+    # When: sending a burst without pacing, then with the stage's limits modeled on the client
+    with LocalOrdersApi(rate_limit=50, burst_limit=5) as api:
+        unpaced = OrdersClient(api.url, credentials=lambda: CREDENTIALS, region='us-east-1', max_retries=0)
+        unpaced_statuses = [unpaced.post_order(order).status_code for order in orders]
+    with LocalOrdersApi(rate_limit=50, burst_limit=5) as api:
+        paced = OrdersClient(api.url, credentials=lambda: CREDENTIALS, region='us-east-1', rate_limit=40, burst_limit=1)
+        paced_statuses = [response.status_code for response in paced.post_orders(orders)]
+
+    # Then: only the unpaced burst was throttled
+    assert 429 in unpaced_statuses
+    assert paced_statuses == [200] * 15
+    assert api.throttled == 0
+    assert paced.stats.snapshot()['paced_seconds'] > 0
@@ -0,0 +1,135 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from catalog_backend.logic.dlq_redrive import get_response_url_expiry, is_response_url_expired, redrive_dlq
+from catalog_backend.logic.rate_limiter import TokenBucket
+from catalog_backend.models.input import RedriveRequestModel
+
+DLQ_URL = 'https://sqs.us-east-1.amazonaws.com/123456789012/dlq'
+TARGET_URL = 'https://sqs.us-east-1.amazonaws.com/123456789012/queue'
+
+
+def _response_url(signed_at: datetime, expires_seconds: int = 7200) -> str:
+    return (
+        'https://cloudformation-custom-resource-response-useast1.s3.amazonaws.com/stack?X-Amz-Algorithm=AWS4-HMAC-SHA256'
+        f'&X-Amz-Date={signed_at.strftime("%Y%m%dT%H%M%SZ")}&X-Amz-Expires={expires_seconds}&X-Amz-Signature=abc'
+    )
+
+
+def _message(message_id: str, signed_at: datetime) -> dict:
+    body = json.dumps({'RequestType': 'Delete', 'ResponseURL': _response_url(signed_at)})
+    return {'MessageId': message_id, 'ReceiptHandle': f'handle-{message_id}', 'Body': body}
+
+
+class FakeSqsClient:
+    def __init__(self, messages: list[dict], receive_limit: int = 10) -> None:
+        self.dlq = list(messages)
+        self.receive_limit = receive_limit  # SQS can return fewer messages than asked for even when the queue holds more
+        self.sent: list[str] = []
+        self.deleted: list[str] = []
+
+    def receive_message(self, QueueUrl: str, MaxNumberOfMessages: int, WaitTimeSeconds: int) -> dict:
+        count = min(MaxNumberOfMessages, self.receive_limit)
+        batch, self.dlq = self.dlq[:count], self.dlq[count:]
+        return {'Messages': batch} if batch else {}
+
+    def send_message_batch(self, QueueUrl: str, Entries: list[dict]) -> dict:
+        assert QueueUrl == TARGET_URL
+        self.sent.extend(entry['MessageBody'] for entry in Entries)
+        return {'Successful': [{'Id': entry['Id']} for entry in Entries], 'Failed': []}
+
+    def delete_message_batch(self, QueueUrl: str, Entries: list[dict]) -> dict:
+        assert QueueUrl == DLQ_URL
+        self.deleted.extend(entry['ReceiptHandle'] for entry in Entries)
+        return {'Successful': [{'Id': entry['Id']} for entry in Entries], 'Failed': []}
+
+
+def test_get_response_url_expiry_sigv4():
+    # Given: a SigV4 pre-signed ResponseURL signed at a known time with a 2 hour lifetime
+    signed_at = datetime(2024, 5, 18, 7, 28, 4, tzinfo=timezone.utc)
+
+    # When/Then: the expiry is the signing time plus X-Amz-Expires
+    assert get_response_url_expiry(_response_url(signed_at)) == signed_at + timedelta(hours=2)
+
+
+def test_get_response_url_expiry_unknown():
+    # Given/When/Then: a URL without signing parameters has no known expiry
+    assert get_response_url_expiry('https://example.com/response') is None
+
+
+def test_is_response_url_expired_respects_margin():
+    # Given: a URL that expires in 30 seconds
+    now = datetime.now(timezone.utc)
+    body = json.dumps({'ResponseURL': _response_url(now - timedelta(seconds=7170))})
+
+    # When/Then: it is still valid without a margin, but expired with a one minute margin
+    assert not is_response_url_expired(body, now, margin_seconds=0)
+    assert is_response_url_expired(body, now, margin_seconds=60)
+
+
+def test_redrive_dlq_replays_valid_and_drops_expired(mocker):
+    # Given: a DLQ with fresh and expired custom resource requests
+    now = datetime.now(timezone.utc)
+    fresh = [_message(f'fresh-{index}', now) for index in range(12)]
+    expired = [_message(f'expired-{index}', now - timedelta(hours=3)) for index in range(3)]
+    sqs_client = FakeSqsClient(fresh + expired)
+    mocker.patch('catalog_backend.logic.dlq_redrive.boto3.client', return_value=sqs_client)
+    request = RedriveRequestModel(dlq_url=DLQ_URL, target_queue_url=TARGET_URL, rate_per_second=1000, max_workers=2)
+
+    # When: redriving the DLQ
+    report = redrive_dlq(request, remaining_time_ms=lambda: 60_000)
+
+    # Then: fresh requests are replayed, expired ones are dropped and every handled message leaves the DLQ
+    assert report.replayed == 12
+    assert report.expired == 3
+    assert report.failed == 0
+    assert sorted(sqs_client.sent) == sorted(message['Body'] for message in fresh)
+    assert len(sqs_client.deleted) == 15
+    assert not sqs_client.dlq
+
+
+def test_redrive_dlq_stops_at_max_messages(mocker):
+    # Given: more messages in the DLQ than the requested maximum
+    now = datetime.now(timezone.utc)
+    sqs_client = FakeSqsClient([_message(str(index), now) for index in range(30)])
+    mocker.patch('catalog_backend.logic.dlq_redrive.boto3.client', return_value=sqs_client)
+    request = RedriveRequestModel(dlq_url=DLQ_URL, target_queue_url=TARGET_URL, max_messages=15, rate_per_second=1000, max_workers=3)
+
+    # When: redriving the DLQ
+    report = redrive_dlq(request, remaining_time_ms=lambda: 60_000)
+
+    # Then: only the budgeted amount of messages is replayed, the rest stays in the DLQ
+    assert report.replayed == 15
+    assert len(sqs_client.dlq) == 15
+
+
+def test_redrive_dlq_releases_budget_of_short_batches(mocker):
+    # Given: a DLQ that returns at most 4 messages per receive, and a maximum that isn't a multiple of the batch size
+    now = datetime.now(timezone.utc)
+    sqs_client = FakeSqsClient([_message(str(index), now) for index in range(30)], receive_limit=4)
+    mocker.patch('catalog_backend.logic.dlq_redrive.boto3.client', return_value=sqs_client)
+    request = RedriveRequestModel(dlq_url=DLQ_URL, target_queue_url=TARGET_URL, max_messages=15, rate_per_second=1000, max_workers=1)
+
+    # When: redriving the DLQ
+    report = redrive_dlq(request, remaining_time_ms=lambda: 60_000)
+
+    # Then: the unused part of every short batch is given back, so the run still replays the full maximum
+    assert report.replayed == 15
+    assert len(sqs_client.dlq) == 15
+
+
+def test_token_bucket_paces_acquires():
+    # Given: a bucket of 2 tokens per second with a burst of 2, driven by a fake clock
+    clock = {'now': 0.0}
+
+    def sleep(seconds: float) -> None:
+        clock['now'] += seconds
+
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: clock['now'], sleep=sleep)
+
+    # When: acquiring 10 tokens one by one
+    for _ in range(10):
+        bucket.acquire()
+
+    # Then: the burst is served immediately and the remaining 8 tokens take 4 seconds
+    assert clock['now'] == 4.0
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from catalog_backend.dal import get_dal_handler
+from catalog_backend.handlers.utils.init_phase import refresh_after_restore, register_snapstart_hooks, warm_up
+from catalog_backend.logic.iam.helpers import get_iam_client
+from catalog_backend.logic.iam.iam_manager import create_iam_trust
+from tests.local_aws import SERVICE_ROLE_NAME, TABLE_NAME, LocalAws
+
+PRODUCT_ROLE_ARN = 'arn:aws:iam::123456789012:role/product-role'
+
+
+@pytest.fixture
+def local_aws(monkeypatch):
+    with LocalAws() as aws:
+        for name, value in aws.setup_governance_service().items():
+            monkeypatch.setenv(name, value)
+        monkeypatch.setenv('PREWARM_ON_INIT', 'true')
+        yield aws
+
+
+def _count_requests(local_aws: LocalAws) -> list[str]:
+    requests: list[str] = []
+    local_aws.session.events.register_first('before-send', lambda request, **kwargs: requests.append(request.url))
+    return requests
+
+
+def test_warm_up_opens_clients_without_calling_aws(local_aws):
+    # Given: a new execution environment
+    requests = _count_requests(local_aws)
+
+    # When: its init phase warms up
+    warmed = warm_up()
+
+    # Then: the clients are opened and reused by the first request, no request was sent during the init phase
+    assert warmed
+    assert requests == []
+    iam_client = get_iam_client()
+    assert create_iam_trust(SERVICE_ROLE_NAME, PRODUCT_ROLE_ARN)
+    assert get_iam_client() is iam_client
+    assert len(requests) == 2  # get and update of the trust policy
+
+
+def test_warm_up_is_opt_in_and_never_fails_the_init_phase(local_aws, monkeypatch):
+    # Given: warm up disabled, then enabled with a broken environment
+    monkeypatch.setenv('PREWARM_ON_INIT', 'false')
+    disabled = warm_up()
+    monkeypatch.setenv('PREWARM_ON_INIT', 'true')
+    monkeypatch.delenv('TABLE_NAME')
+    monkeypatch.setenv('LAMBDA_ENV_MODELER_DISABLE_CACHE', 'true')
+
+    # When: warming up
+    failed = warm_up()
+
+    # Then: nothing is warmed and the init phase goes on, the invocation reports the broken environment
+    assert not disabled
+    assert not failed
+
+
+def test_restore_reopens_clients_and_reseeds_random(local_aws):
+    # Given: a snapshot taken after the init phase warmed up
+    warm_up()
+    snapshot_clients = get_iam_client(), get_dal_handler(TABLE_NAME)
+    random.seed(42)
+    snapshot_sample = random.random()
+    random.seed(42)
+
+    # When: an execution environment is restored from it
+    refresh_after_restore()
+
+    # Then: it opens new clients and draws its own random sequence
+    assert get_iam_client() is not snapshot_clients[0]
+    assert get_dal_handler(TABLE_NAME) is not snapshot_clients[1]
+    assert random.random() != snapshot_sample
+    assert create_iam_trust(SERVICE_ROLE_NAME, PRODUCT_ROLE_ARN)
+
+
+def test_snapstart_hooks_need_the_lambda_runtime():
+    # When: registering the restore hook outside the Lambda runtime
+    registered = register_snapstart_hooks()
+
+    # Then: it's skipped, the runtime's snapshot_restore_py module isn't installed
+    assert not registered
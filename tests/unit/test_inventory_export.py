@@ -0,0 +1,130 @@
+import json
+from pathlib import Path
+
+import boto3
+import pytest
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from catalog_backend.dal.dynamo_dal_handler import DynamoDalHandler
+from catalog_backend.dal.history import RECENT_CHANGES_INDEX, RECENT_PARTITION_KEY, RECENT_SORT_KEY
+from catalog_backend.logic.inventory_export import CHECKPOINT_FILE, InventoryExporter
+from tests.local_aws import LocalAws, LocalAwsError
+
+TABLE_NAME = 'governance'
+PORTFOLIO_ID = 'port-abcdefghijklm'
+PRODUCTS = 23
+
+
+@pytest.fixture
+def local_aws():
+    with LocalAws() as aws:
+        aws.dynamodb.create_table(
+            TABLE_NAME,
+            partition_key='portfolio_id',
+            sort_key='product_stack_id',
+            indexes={RECENT_CHANGES_INDEX: (RECENT_PARTITION_KEY, RECENT_SORT_KEY)},
+        )
+        # products in both item layouts, spread over shards and with history events
+        dal_handler = DynamoDalHandler(TABLE_NAME, shard_count=4, history_retention_days=30)
+        for index in range(PRODUCTS):
+            dal_handler.compact_items = index % 2 == 0
+            stack_id = f'arn:aws:cloudformation:us-east-1:123456789012:stack/SC-123456789012-pp-{index:03}/uuid-{index}'
+            dal_handler.add_product_deployment(PORTFOLIO_ID, stack_id, 'CI/CD IAM Role Product', '1.0.0', '123456789012', 'consumer', 'us-east-1')
+        yield aws
+
+
+def _client():
+    # botocore retries disabled, throttling is left to the exporter's backoff
+    return boto3.client('dynamodb', config=Config(retries={'mode': 'standard', 'total_max_attempts': 1}))
+
+
+def _read_jsonl(output_dir: Path) -> list[dict]:
+    return [json.loads(line) for path in sorted(output_dir.glob('*.jsonl')) for line in path.read_text().splitlines()]
+
+
+def test_export_streams_every_product_once(local_aws, tmp_path):
+    # Given: an exporter with small pages and part files
+    exporter = InventoryExporter(TABLE_NAME, tmp_path, total_segments=4, page_size=3, chunk_items=5, client=_client())
+
+    # When: exporting the table
+    report = exporter.run()
+
+    # Then: every current product is exported once with its unsharded portfolio id, history events are skipped
+    rows = _read_jsonl(tmp_path)
+    assert len(rows) == PRODUCTS == report.items == report.total_items
+    assert len({row['product_stack_id'] for row in rows}) == PRODUCTS
+    assert {row['portfolio_id'] for row in rows} == {PORTFOLIO_ID}
+    assert all(len(path.read_text().splitlines()) <= 5 + 3 for path in tmp_path.glob('*.jsonl'))
+    assert report.parts == len(list(tmp_path.glob('*.jsonl')))
+
+
+def test_export_resumes_from_checkpoint(local_aws, tmp_path, monkeypatch):
+    # Given: a scan that fails after a few pages
+    scan = local_aws.dynamodb._Scan
+    calls = {'count': 0}
+
+    def failing_scan(params: dict) -> dict:
+        calls['count'] += 1
+        if calls['count'] == 6:
+            raise LocalAwsError('ValidationException', 'connection lost')
+        return scan(params)
+
+    monkeypatch.setattr(local_aws.dynamodb, '_Scan', failing_scan)
+    with pytest.raises(ClientError):
+        InventoryExporter(TABLE_NAME, tmp_path, total_segments=2, page_size=2, chunk_items=2, client=_client()).run()
+    checkpoint = json.loads((tmp_path / CHECKPOINT_FILE).read_text())
+    assert not all(progress['done'] for progress in checkpoint['segments'].values())
+
+    # When: rerunning the export into the same directory
+    report = InventoryExporter(TABLE_NAME, tmp_path, total_segments=2, page_size=2, chunk_items=2, client=_client()).run()
+
+    # Then: the export completes without duplicates
+    rows = _read_jsonl(tmp_path)
+    assert len(rows) == len({row['product_stack_id'] for row in rows}) == PRODUCTS == report.total_items
+    assert report.items < PRODUCTS
+
+
+def test_export_backs_off_when_throttled(local_aws, tmp_path, monkeypatch):
+    # Given: a scan that is throttled twice
+    scan = local_aws.dynamodb._Scan
+    throttles = {'left': 2}
+
+    def throttled_scan(params: dict) -> dict:
+        if throttles['left']:
+            throttles['left'] -= 1
+            raise LocalAwsError('ProvisionedThroughputExceededException', 'throughput exceeded')
+        return scan(params)
+
+    monkeypatch.setattr(local_aws.dynamodb, '_Scan', throttled_scan)
+    delays: list[float] = []
+
+    # When: exporting the table
+    report = InventoryExporter(TABLE_NAME, tmp_path, total_segments=1, client=_client(), sleep=delays.append).run()
+
+    # Then: the throttled pages are retried after a jittered, growing backoff
+    assert report.throttled == 2
+    assert report.total_items == PRODUCTS
+    assert 0 <= delays[0] <= 0.1 and 0 <= delays[1] <= 0.2
+
+
+def test_checkpoint_of_another_export_is_rejected(local_aws, tmp_path):
+    # Given: a finished export with 2 segments
+    InventoryExporter(TABLE_NAME, tmp_path, total_segments=2, client=_client()).run()
+
+    # When/Then: resuming it with a different segment count is rejected
+    with pytest.raises(ValueError):
+        InventoryExporter(TABLE_NAME, tmp_path, total_segments=4, client=_client())
+
+
+def test_parquet_export(local_aws, tmp_path):
+    # Given: pyarrow is installed
+    parquet = pytest.importorskip('pyarrow.parquet')
+
+    # When: exporting to parquet
+    InventoryExporter(TABLE_NAME, tmp_path, output_format='parquet', total_segments=2, client=_client()).run()
+
+    # Then: the part files hold every product in typed columns
+    tables = [parquet.read_table(path) for path in tmp_path.glob('*.parquet')]
+    assert sum(table.num_rows for table in tables) == PRODUCTS
+    assert str(tables[0].schema.field('created_at').type) == 'int64'
@@ -0,0 +1,34 @@
+import json
+from datetime import timedelta
+
+from aws_lambda_powertools.utilities.parser.models import SqsModel
+
+from catalog_backend.handlers.utils.latency import record_end_to_end_latency
+from tests.benchmark.traffic import product_event
+
+
+def _emitted_metrics(output: str) -> dict[str, dict]:
+    blobs = [json.loads(line) for line in output.splitlines() if '_aws' in line]
+    return {blob['_aws']['CloudWatchMetrics'][0]['Metrics'][0]['Name']: blob for blob in blobs}
+
+
+def test_end_to_end_latency_is_emitted_per_request_type(capsys):
+    # Given: a delete request that spent 9ms in the queue, answered 2.5 seconds after it was sent
+    record = SqsModel.model_validate(product_event('Delete', 0)).Records[0]
+    responded_at = record.attributes.SentTimestamp + timedelta(milliseconds=2500)
+
+    # When: recording its latency
+    latency_ms = record_end_to_end_latency(record, 'Delete', responded_at=responded_at)
+
+    # Then: both latencies are emitted as high resolution metrics with a request type dimension
+    assert latency_ms == 2500
+    emitted = _emitted_metrics(capsys.readouterr().out)
+    end_to_end, queue = emitted['EndToEndLatency'], emitted['QueueLatency']
+    assert end_to_end['EndToEndLatency'] == [2500]
+    assert queue['QueueLatency'] == [9]
+    for blob in (end_to_end, queue):
+        definition = blob['_aws']['CloudWatchMetrics'][0]
+        assert definition['Metrics'][0]['StorageResolution'] == 1
+        assert definition['Metrics'][0]['Unit'] == 'Milliseconds'
+        assert sorted(definition['Dimensions'][0]) == ['RequestType', 'service']
+        assert blob['RequestType'] == 'Delete'
@@ -0,0 +1,35 @@
+from catalog_backend.handlers.utils.memory import track_memory
+from tests.utils import generate_context
+
+_retained: list = []
+
+
+@track_memory
+def _handler(event: dict, context) -> int:
+    _retained.append(bytearray(event['size']))
+    return len(_retained)
+
+
+def test_memory_tracking_off_by_default(env_vars, mocker):
+    # Given: memory tracking is not enabled
+    logger_mock = mocker.patch('catalog_backend.handlers.utils.memory.logger')
+
+    # When/Then: the handler runs and nothing is reported
+    assert _handler({'size': 10}, generate_context())
+    logger_mock.info.assert_not_called()
+
+
+def test_memory_tracking_reports_peak_and_hotspots(env_vars, mocker):
+    # Given: memory tracking is enabled
+    env_vars.setenv('MEMORY_TRACKING_ENABLED', 'true')
+    logger_mock = mocker.patch('catalog_backend.handlers.utils.memory.logger')
+
+    # When: an invocation retains a 1MB buffer
+    _handler({'size': 1024 * 1024}, generate_context())
+
+    # Then: the peak covers the buffer and the allocating line tops the hotspots
+    report = logger_mock.info.call_args.kwargs
+    assert report['memory_peak_kb'] >= 1024
+    assert report['memory_limit_mb'] == 128
+    assert 'test_memory.py' in report['allocation_hotspots'][0]['location']
+    assert report['allocation_hotspots'][0]['size_diff_kb'] >= 1024
@@ -0,0 +1,47 @@
+from catalog_backend.handlers.utils.profiler import profile_invocations
+from tests.utils import generate_context
+
+
+@profile_invocations
+def _handler(event: dict, context) -> int:
+    return sum(range(event['n']))
+
+
+def test_profiler_off_by_default(env_vars, mocker):
+    # Given: no profiler sample rate configured
+    profile_mock = mocker.patch('catalog_backend.handlers.utils.profiler.cProfile.Profile')
+
+    # When: invoking the handler
+    result = _handler({'n': 10}, generate_context())
+
+    # Then: the handler ran without a profiler
+    assert result == 45
+    profile_mock.assert_not_called()
+
+
+def test_profiler_logs_top_functions_and_dumps_profile(env_vars, mocker, tmp_path):
+    # Given: every invocation is sampled and full profiles are saved
+    env_vars.setenv('PROFILER_SAMPLE_RATE', '1')
+    env_vars.setenv('PROFILER_TOP_N', '3')
+    env_vars.setenv('PROFILER_DUMP_DIR', str(tmp_path))
+    logger_mock = mocker.patch('catalog_backend.handlers.utils.profiler.logger')
+
+    # When: invoking the handler
+    result = _handler({'n': 10}, generate_context())
+
+    # Then: the result is untouched, a top-N summary is logged and the full profile is saved
+    assert result == 45
+    summary = logger_mock.info.call_args.kwargs
+    assert len(summary['profile_top']) <= 3
+    assert any('_handler' in row['function'] for row in summary['profile_top'])
+    assert summary['profile_dump_path'] == str(tmp_path / '888888.prof')
+    assert (tmp_path / '888888.prof').exists()
+
+
+def test_profiler_report_failure_does_not_fail_invocation(env_vars, mocker):
+    # Given: a sampled invocation whose profile report fails
+    env_vars.setenv('PROFILER_SAMPLE_RATE', '1')
+    env_vars.setenv('PROFILER_DUMP_DIR', '/non/existing/dir')
+
+    # When/Then: the handler result is still returned
+    assert _handler({'n': 3}, generate_context()) == 3
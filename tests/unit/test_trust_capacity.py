@@ -0,0 +1,63 @@
+import pytest
+from botocore.exceptions import ClientError
+
+from catalog_backend.handlers.utils.observability import metrics
+from catalog_backend.logic.iam.capacity import forecast_capacity, policy_size
+from catalog_backend.logic.iam.helpers import get_iam_client, get_trust_policy
+from catalog_backend.logic.iam.iam_manager import create_iam_trust, delete_iam_trust
+from tests.local_aws import LocalAws
+
+SERVICE_ROLE_NAME = 'service-role'
+QUOTA = 1024
+
+
+def _role_arn(index: int) -> str:
+    # the length of the planner's default consumer role ARN
+    return f'arn:aws:iam::123456789012:role/SC-123456789012-pp-consumer-role-{index:04d}'
+
+
+@pytest.fixture
+def local_aws():
+    metrics.clear_metrics()
+    with LocalAws() as aws:
+        aws.iam.trust_policy_quota = QUOTA
+        aws.iam.create_role(SERVICE_ROLE_NAME)
+        yield aws
+    metrics.clear_metrics()
+
+
+def test_trust_mutations_report_capacity(local_aws):
+    # Given: a product role added to the trust policy
+    create_iam_trust(SERVICE_ROLE_NAME, _role_arn(0), trust_policy_quota=QUOTA)
+    after_create = metrics.metric_set['TrustPolicyHeadroom']['Value'][-1]
+
+    # When: it's deleted again
+    delete_iam_trust(SERVICE_ROLE_NAME, _role_arn(0), trust_policy_quota=QUOTA)
+
+    # Then: every mutation reports the statements, size and headroom of the trust policy it wrote
+    assert metrics.metric_set['TrustPolicyStatements']['Value'] == [2, 1]
+    size = policy_size(local_aws.iam.trust_policies[SERVICE_ROLE_NAME])
+    assert metrics.metric_set['TrustPolicySize']['Value'][-1] == size
+    assert metrics.metric_set['TrustPolicyHeadroom']['Value'][-1] == round(100 * (QUOTA - size) / QUOTA, 2)
+    assert after_create < metrics.metric_set['TrustPolicyHeadroom']['Value'][-1]
+
+
+def test_forecast_matches_the_quota(local_aws):
+    # Given: the forecast of the current trust policy
+    forecast = forecast_capacity(get_trust_policy(get_iam_client(), SERVICE_ROLE_NAME), consumers=3, quota=QUOTA)
+    assert forecast.fits
+    assert forecast.simulated.statements == forecast.current.statements + 3
+    assert forecast.simulated.size_bytes == forecast.current.size_bytes + 3 * forecast.consumer_statement_bytes
+
+    # When: onboarding consumers until IAM rejects the trust policy
+    onboarded = 0
+    with pytest.raises(ClientError, match='LimitExceeded'):
+        while True:
+            create_iam_trust(SERVICE_ROLE_NAME, _role_arn(onboarded), trust_policy_quota=QUOTA)
+            onboarded += 1
+
+    # Then: the forecast predicted how many would fit, and one more doesn't
+    assert onboarded == forecast.consumers_remaining
+    policy_document = get_trust_policy(get_iam_client(), SERVICE_ROLE_NAME)
+    assert forecast_capacity(policy_document, consumers=0, quota=QUOTA).consumers_remaining == 0
+    assert not forecast_capacity(policy_document, consumers=1, quota=QUOTA).fits
@@ -0,0 +1,139 @@
+import pytest
+
+from catalog_backend.dal.dynamo_dal_handler import DynamoDalHandler
+from catalog_backend.dal.models.db import AccountSummary, VersionAdoption
+from catalog_backend.handlers.views_stream_handler import handle_table_stream
+from catalog_backend.logic.views import get_account_summary, get_version_adoption, list_consumer_deployments
+from tests.local_aws import LocalAws, LocalAwsError, LocalLambdaContext
+
+TABLE_NAME = 'governance'
+VIEWS_TABLE_NAME = 'views'
+PORTFOLIO_ID = 'port-abcdefghijklm'
+ROLE_PRODUCT = 'CI/CD IAM Role Product'
+WAF_PRODUCT = 'WAF Rules Product'
+
+
+@pytest.fixture
+def local_aws(monkeypatch):
+    with LocalAws() as aws:
+        aws.dynamodb.create_table(TABLE_NAME, partition_key='portfolio_id', sort_key='product_stack_id')
+        monkeypatch.setenv('LAMBDA_ENV_MODELER_DISABLE_CACHE', 'true')
+        for name, value in aws.setup_views_service(TABLE_NAME, VIEWS_TABLE_NAME).items():
+            monkeypatch.setenv(name, value)
+        yield aws
+
+
+def _stack_id(index: int) -> str:
+    return f'arn:aws:cloudformation:us-east-1:123456789012:stack/SC-123456789012-pp-{index}/uuid-{index}'
+
+
+def _replay(events: list[dict]) -> list[dict]:
+    return [handle_table_stream(event, LocalLambdaContext()) for event in events]
+
+
+def _write_products(dal_handler: DynamoDalHandler) -> None:
+    dal_handler.add_product_deployment(PORTFOLIO_ID, _stack_id(0), ROLE_PRODUCT, '1.0.0', '111111111111', 'team-a', 'us-east-1')
+    dal_handler.add_product_deployment(PORTFOLIO_ID, _stack_id(1), ROLE_PRODUCT, '1.0.0', '111111111111', 'team-b', 'eu-west-1')
+    dal_handler.add_product_deployment(PORTFOLIO_ID, _stack_id(2), WAF_PRODUCT, '3.1.0', '222222222222', 'team-a', 'us-east-1')
+    dal_handler.update_product_deployment(PORTFOLIO_ID, _stack_id(0), ROLE_PRODUCT, '2.0.0', '111111111111', 'team-a', 'us-east-1')
+    dal_handler.delete_product_deployment(PORTFOLIO_ID, _stack_id(1))
+
+
+def _assert_views() -> None:
+    assert get_account_summary(VIEWS_TABLE_NAME, PORTFOLIO_ID, '111111111111') == AccountSummary(
+        account_id='111111111111', total=1, products={ROLE_PRODUCT: {'2.0.0': 1}}, regions={'us-east-1': 1}
+    )
+    assert sorted(entry.product_stack_id for entry in list_consumer_deployments(VIEWS_TABLE_NAME, PORTFOLIO_ID, 'team-a')) == [
+        _stack_id(0),
+        _stack_id(2),
+    ]
+    assert list_consumer_deployments(VIEWS_TABLE_NAME, PORTFOLIO_ID, 'team-b') == []
+    assert get_version_adoption(VIEWS_TABLE_NAME, PORTFOLIO_ID, ROLE_PRODUCT) == VersionAdoption(
+        product_name=ROLE_PRODUCT, total=1, versions={'2.0.0': 1}
+    )
+
+
+@pytest.mark.parametrize('dal_options', [{}, {'shard_count': 3, 'compact_items': True, 'history_retention_days': 30, 'aggregates_enabled': True}])
+def test_views_follow_the_table_stream(local_aws, dal_options):
+    # Given: product lifecycle changes written to the governance table, in any item layout
+    _write_products(DynamoDalHandler(TABLE_NAME, **dal_options))
+
+    # When: replaying the recorded stream in small batches
+    responses = _replay(local_aws.dynamodb.table(TABLE_NAME).stream_events(batch_size=2))
+
+    # Then: every record is processed and the views match the live deployments
+    assert all(response == {'batchItemFailures': []} for response in responses)
+    _assert_views()
+
+
+def test_replayed_records_are_idempotent(local_aws):
+    # Given: views built from the stream
+    _write_products(DynamoDalHandler(TABLE_NAME))
+    events = local_aws.dynamodb.table(TABLE_NAME).stream_events()
+    _replay(events)
+
+    # When: the whole stream is delivered again, newest batch first
+    _replay(events[::-1])
+
+    # Then: older records don't move the views back
+    _assert_views()
+
+
+def test_late_records_do_not_recreate_deleted_products(local_aws):
+    # Given: views built from the stream, one record per batch
+    _write_products(DynamoDalHandler(TABLE_NAME))
+    events = local_aws.dynamodb.table(TABLE_NAME).stream_events(batch_size=1)
+    _replay(events)
+
+    # When: the records written before the deleted product was removed are delivered again, after its removal
+    removed = [event for event in events if event['Records'][0]['dynamodb']['Keys']['product_stack_id']['S'] == _stack_id(1)]
+    assert [event['Records'][0]['eventName'] for event in removed] == ['INSERT', 'REMOVE']
+    _replay(removed[:1])
+    _replay([event for event in events if event not in removed])
+
+    # Then: the deleted markers keep the product out of the views, and expire after the stream retry window
+    _assert_views()
+    markers = [item for item in local_aws.dynamodb.table(VIEWS_TABLE_NAME).items.values() if 'deleted' in item]
+    assert {marker['item_id']['S'].rpartition('#')[2] for marker in markers} == {_stack_id(0), _stack_id(1)}
+    removed_at = int(removed[1]['Records'][0]['dynamodb']['ApproximateCreationDateTime'])
+    assert all(int(marker['expires_at']['N']) > int(marker['changed_at']['N']) for marker in markers)
+    assert {int(marker['changed_at']['N']) for marker in markers if _stack_id(1) in marker['item_id']['S']} == {removed_at}
+
+
+def test_long_sequence_numbers_keep_their_order(local_aws):
+    # Given: a stream whose sequence numbers grow from 21 to 40 digits, longer than a DynamoDB number holds
+    _write_products(DynamoDalHandler(TABLE_NAME))
+    events = local_aws.dynamodb.table(TABLE_NAME).stream_events(batch_size=1)
+    for index, event in enumerate(events):
+        digits = 21 if index < len(events) // 2 else 40
+        event['Records'][0]['dynamodb']['SequenceNumber'] = str(10 ** (digits - 1) + index)
+
+    # When: the stream is delivered, then delivered again newest record first
+    _replay(events)
+    _replay(events[::-1])
+
+    # Then: older records don't move the views back, sequence numbers are stored as strings that sort like the numbers
+    _assert_views()
+    assert all('S' in item['sequence'] for item in local_aws.dynamodb.table(VIEWS_TABLE_NAME).items.values())
+
+
+def test_failed_record_is_reported(local_aws, monkeypatch):
+    # Given: a views table that rejects writes of one product
+    dal_handler = DynamoDalHandler(TABLE_NAME)
+    _write_products(dal_handler)
+    put_item = local_aws.dynamodb._PutItem
+
+    def failing_put(params: dict) -> dict:
+        if params['Item']['item_id']['S'] == _stack_id(2):
+            raise LocalAwsError('ValidationException', 'item size has exceeded the maximum allowed size')
+        return put_item(params)
+
+    monkeypatch.setattr(local_aws.dynamodb, '_PutItem', failing_put)
+
+    # When: processing the stream
+    events = local_aws.dynamodb.table(TABLE_NAME).stream_events()
+    response = handle_table_stream(events[0], LocalLambdaContext())
+
+    # Then: only the failed record is reported, the event source checkpoints before it and retries it
+    failed_record = next(record for record in events[0]['Records'] if record['dynamodb']['Keys']['product_stack_id']['S'] == _stack_id(2))
+    assert response == {'batchItemFailures': [{'itemIdentifier': failed_record['dynamodb']['SequenceNumber']}]}